@@ -0,0 +1,180 @@
+"""
+Concurrency benchmark of the read endpoints under WSGI and ASGI.
+
+The same requests (book list and detail, own borrowing list and
+user detail of `--users` token-authenticated users) are served
+in-process by Django's WSGI handler from `--concurrency` threads
+and by its ASGI handler from as many concurrent tasks: once with
+the sync views run in a thread and once with AsyncReadMiddleware
+routing them to the native async actions.
+
+Both run on the same file-backed SQLite dataset with DEBUG off.
+Django 5.0 runs async ORM queries in a thread too, so the numbers
+show the overhead of the async path rather than I/O overlap; the
+gap closes on a networked database (Postgres).
+
+Usage: python -m benchmarks.bench_asgi [--requests 2000] [--concurrency 16]
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from benchmarks.utils import setup_django, benchmark_database, timer
+
+
+def seed(num_users, num_books):
+    from django.contrib.auth import get_user_model
+    from rest_framework.authtoken.models import Token
+
+    from books.models import Book
+    from borrowings.models import Borrowing
+
+    users = get_user_model().objects.bulk_create(
+        get_user_model()(username=f"user{i}", email=f"user{i}@example.com")
+        for i in range(num_users)
+    )
+    tokens = Token.objects.bulk_create(
+        Token(user=user, key=Token.generate_key()) for user in users
+    )
+    books = Book.objects.bulk_create(
+        Book(
+            title=f"Sample book {i}",
+            author="Name Surname",
+            cover="H",
+            total_amount=10,
+            inventory=5,
+            daily_fee="0.10",
+        )
+        for i in range(num_books)
+    )
+
+    for i, user in enumerate(users):
+        for book in books[i % num_books : i % num_books + 5]:
+            Borrowing.objects.create(user=user, book=book)
+
+    return [token.key for token in tokens], [book.id for book in books]
+
+
+def get_requests(keys, book_ids, num_requests):
+    paths = itertools.cycle(
+        [
+            "/api/books/books/",
+            *(f"/api/books/books/{book_id}/" for book_id in book_ids[:5]),
+            "/api/borrowings/borrowings/",
+            "/api/borrowings/borrowings/?is_active=true",
+            "/api/users/users/me/",
+        ]
+    )
+    return [
+        (path, {"Authorization": f"Token {key}"})
+        for path, key in zip(
+            itertools.islice(paths, num_requests), itertools.cycle(keys)
+        )
+    ]
+
+
+def run_wsgi(requests, concurrency):
+    from django.db import connection
+    from django.test import Client
+
+    local = threading.local()
+    statuses = []
+
+    def get(request):
+        if not hasattr(local, "client"):
+            local.client = Client()
+
+        path, headers = request
+        return local.client.get(path, headers=headers).status_code
+
+    def close_connection(_):
+        connection.close()
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        with timer() as elapsed:
+            statuses = list(executor.map(get, requests))
+
+        list(executor.map(close_connection, range(concurrency)))
+
+    return elapsed["seconds"], statuses
+
+
+def run_asgi(requests, concurrency, async_views=True):
+    from django.conf import settings
+    from django.test import AsyncClient, override_settings
+
+    middleware = settings.MIDDLEWARE
+    if not async_views:
+        middleware = [
+            path
+            for path in middleware
+            if path != "library_api.middleware.AsyncReadMiddleware"
+        ]
+
+    async def main():
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def get(request):
+            path, headers = request
+
+            async with semaphore:
+                response = await client.get(path, headers=headers)
+
+            return response.status_code
+
+        return await asyncio.gather(*(get(request) for request in requests))
+
+    with override_settings(MIDDLEWARE=middleware):
+        with timer() as elapsed:
+            statuses = asyncio.run(main())
+
+    return elapsed["seconds"], statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--books", type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ["DJANGO_DEBUG"] = "False"
+    setup_django()
+
+    from django.core.cache import cache
+    from django.test.utils import setup_test_environment
+
+    from library_api.throttling import throttle_store
+
+    # Allows the "testserver" host of the test clients
+    setup_test_environment()
+
+    with benchmark_database():
+        keys, book_ids = seed(args.users, args.books)
+        requests = get_requests(keys, book_ids, args.requests)
+
+        for name, run in (
+            ("WSGI", run_wsgi),
+            ("ASGI, sync views", partial(run_asgi, async_views=False)),
+            ("ASGI, async views", run_asgi),
+        ):
+            cache.clear()
+            throttle_store.clear()
+            seconds, statuses = run(requests, args.concurrency)
+
+            assert set(statuses) == {200}, set(statuses)
+            print(
+                f"{name:>17}: {len(requests) / seconds:8.1f} requests/sec "
+                f"with {args.concurrency} concurrent requests"
+            )
+
+
+if __name__ == "__main__":
+    main()
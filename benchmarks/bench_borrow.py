@@ -0,0 +1,150 @@
+"""
+Multi-threaded stress benchmark of the borrow path.
+
+Several threads try to borrow copies of the same book at once.
+The legacy path (read inventory in Python, create borrowing, recount
+in Book.save()) is compared to borrowings.services.borrow_book().
+After each run the invariants are checked: inventory never goes negative
+and never more copies are borrowed than exist.
+
+Usage: python -m benchmarks.bench_borrow [--threads 8] [--copies 200]
+"""
+
+import argparse
+import threading
+
+from benchmarks.utils import setup_django, benchmark_database, timer
+
+
+def legacy_borrow(user, book_id):
+    from books.models import Book
+    from borrowings.models import Borrowing
+
+    book = Book.objects.get(id=book_id)
+
+    if book.inventory > 0:
+        Borrowing.objects.create(user=user, book=book)
+        book.save()
+        return True
+
+    return False
+
+
+def transactional_borrow(user, book_id):
+    from borrowings.services import borrow_book, BookNotAvailableError
+
+    try:
+        borrow_book(user, book_id)
+    except BookNotAvailableError:
+        return False
+
+    return True
+
+
+def run(borrow, users, book_id, attempts_per_thread):
+    from django.db import connection
+
+    counters = {"borrowed": 0, "rejected": 0, "errors": 0}
+    lock = threading.Lock()
+    barrier = threading.Barrier(len(users))
+
+    def worker(user):
+        barrier.wait()
+        try:
+            for _ in range(attempts_per_thread):
+                try:
+                    result = (
+                        "borrowed" if borrow(user, book_id) else "rejected"
+                    )
+                except Exception:
+                    result = "errors"
+                with lock:
+                    counters[result] += 1
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker, args=(user,)) for user in users]
+
+    with timer() as elapsed:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    counters["seconds"] = elapsed["seconds"]
+    return counters
+
+
+def check_invariants(book_id):
+    from books.models import Book
+
+    book = Book.objects.get(id=book_id)
+    num_active = book.borrowings.filter(is_active=True).count()
+
+    return {
+        "inventory": book.inventory,
+        "active_borrowings": num_active,
+        "ok": (
+            book.inventory >= 0
+            and num_active <= book.total_amount
+            and book.inventory == book.total_amount - num_active
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--copies", type=int, default=200)
+    parser.add_argument(
+        "--attempts",
+        type=int,
+        default=None,
+        help="Borrow attempts per thread (default: enough to exhaust copies twice).",
+    )
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.contrib.auth import get_user_model
+
+    from books.models import Book
+    from borrowings.models import Borrowing
+
+    attempts = args.attempts or (2 * args.copies) // args.threads + 1
+
+    with benchmark_database():
+        users = [
+            get_user_model().objects.create_user(
+                username=f"bench{i}", email=f"bench{i}@example.com"
+            )
+            for i in range(args.threads)
+        ]
+        book = Book.objects.create(
+            title="Benchmark",
+            author="Bench",
+            cover="H",
+            total_amount=args.copies,
+        )
+
+        for name, borrow in (
+            ("legacy", legacy_borrow),
+            ("transactional", transactional_borrow),
+        ):
+            Borrowing.objects.all().delete()
+            Book.objects.filter(id=book.id).update(inventory=args.copies)
+
+            result = run(borrow, users, book.id, attempts)
+            result.update(check_invariants(book.id))
+
+            print(
+                f"{name:>13}: {result['borrowed'] / result['seconds']:8.1f} borrows/sec "
+                f"(borrowed={result['borrowed']}, rejected={result['rejected']}, "
+                f"errors={result['errors']}, inventory={result['inventory']}, "
+                f"active={result['active_borrowings']}, "
+                f"invariants {'OK' if result['ok'] else 'VIOLATED'})"
+            )
+
+
+if __name__ == "__main__":
+    main()
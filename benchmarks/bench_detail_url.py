@@ -0,0 +1,120 @@
+"""
+Microbenchmark of detail_url generation in list serializers.
+
+Compares per-row cost of reverse() + BASE_URL concatenation (legacy)
+with precompiled url templates, both for get_full_absolute_url() alone
+and for serializing a whole page of in-memory instances.
+
+Usage: python -m benchmarks.bench_detail_url [--page-size 100]
+"""
+
+import argparse
+import timeit
+from unittest import mock
+
+from benchmarks.utils import setup_django
+
+
+def legacy_full_absolute_url(viewname):
+    from django.urls import reverse
+
+    from library_api.settings import BASE_URL
+
+    def get_full_absolute_url(self):
+        return f"{BASE_URL}{reverse(viewname, kwargs={'pk': self.id})}"
+
+    return get_full_absolute_url
+
+
+def per_row_microseconds(func, rows, repeat):
+    seconds = min(timeit.repeat(func, number=1, repeat=repeat))
+    return seconds / rows * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from books.models import Book
+    from books.serializers import BookListSerializer
+    from borrowings.models import Borrowing
+    from borrowings.serializers import BorrowingListSerializer
+    from users.models import User
+    from users.serializers import UserListSerializer
+
+    rows = args.page_size
+    book = Book(id=1, title="Title", author="Author", inventory=1)
+    user = User(id=1, first_name="John", last_name="Doe")
+    cases = [
+        (
+            "books",
+            Book,
+            "books:book-detail",
+            BookListSerializer,
+            [
+                Book(id=i, title="Title", author="Author", inventory=1)
+                for i in range(1, rows + 1)
+            ],
+        ),
+        (
+            "borrowings",
+            Borrowing,
+            "borrowings:borrowing-detail",
+            BorrowingListSerializer,
+            [
+                Borrowing(
+                    id=i,
+                    book=book,
+                    user=user,
+                    borrow_date="2024-03-01",
+                    expected_return_date="2024-03-15",
+                )
+                for i in range(1, rows + 1)
+            ],
+        ),
+        (
+            "users",
+            User,
+            "users:user-detail",
+            UserListSerializer,
+            [User(id=i, first_name="John") for i in range(1, rows + 1)],
+        ),
+    ]
+
+    for instance in cases[1][4]:
+        instance.is_overdue = False
+
+    print(f"per-row cost in microseconds at page_size={rows}")
+
+    for name, model, viewname, serializer_class, instances in cases:
+
+        def urls_only():
+            for instance in instances:
+                instance.get_full_absolute_url()
+
+        def serialize():
+            return serializer_class(instances, many=True).data
+
+        after_url = per_row_microseconds(urls_only, rows, args.repeat)
+        after_page = per_row_microseconds(serialize, rows, args.repeat)
+
+        with mock.patch.object(
+            model,
+            "get_full_absolute_url",
+            legacy_full_absolute_url(viewname),
+        ):
+            before_url = per_row_microseconds(urls_only, rows, args.repeat)
+            before_page = per_row_microseconds(serialize, rows, args.repeat)
+
+        print(
+            f"{name:>10}: detail_url {before_url:6.2f} -> {after_url:6.2f}, "
+            f"serializer row {before_page:6.2f} -> {after_page:6.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
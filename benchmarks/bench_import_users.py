@@ -0,0 +1,53 @@
+"""
+Throughput benchmark of the bulk user import.
+
+Imports `--users` generated rows once per number of password hashing
+processes. PBKDF2 hashing dominates, so the import should scale with
+the number of CPUs.
+
+Usage: python -m benchmarks.bench_import_users [--users 200] [--workers 1 4]
+"""
+
+import argparse
+import os
+
+from benchmarks.utils import setup_django, benchmark_database, timer
+
+
+def get_rows(prefix, num_users):
+    for i in range(num_users):
+        yield i + 1, {
+            "username": f"{prefix}{i}",
+            "email": f"{prefix}{i}@example.com",
+            "password": f"password{i}",
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, os.cpu_count()]
+    )
+    args = parser.parse_args()
+
+    setup_django()
+
+    from users.importers import import_users
+
+    with benchmark_database():
+        for workers in args.workers:
+            rows = get_rows(f"workers{workers}_", args.users)
+
+            with timer() as elapsed:
+                result = import_users(rows, batch_size=100, workers=workers)
+
+            assert result.created == args.users
+            print(
+                f"{workers:>3} workers: "
+                f"{result.created / elapsed['seconds']:8.1f} users/sec"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark of list serialization: ModelSerializer over model instances
+vs ValuesListSerializer over values_list() tuples.
+
+Both paths include fetching the rows from the database.
+
+Usage: python -m benchmarks.bench_list_serialization [--rows 5000]
+"""
+
+import argparse
+import datetime
+
+from benchmarks.utils import setup_django, benchmark_database, timer
+
+
+def seed(num_rows):
+    from django.contrib.auth import get_user_model
+
+    from books.models import Book
+    from borrowings.models import Borrowing
+
+    users = get_user_model().objects.bulk_create(
+        get_user_model()(
+            username=f"user{i}",
+            email=f"user{i}@example.com",
+            first_name="John",
+            last_name=f"Doe {i}",
+        )
+        for i in range(num_rows)
+    )
+    books = Book.objects.bulk_create(
+        Book(
+            title=f"Book {i}",
+            author=f"Author {i}",
+            cover="H",
+            total_amount=10,
+            inventory=10,
+            daily_fee="0.25",
+        )
+        for i in range(num_rows)
+    )
+    today = datetime.date.today()
+    Borrowing.objects.bulk_create(
+        Borrowing(
+            book=book,
+            user=user,
+            borrow_date=today,
+            expected_return_date=today + datetime.timedelta(weeks=2),
+        )
+        for book, user in zip(books, users)
+    )
+
+
+def rows_per_second(serialize, num_rows, repeat):
+    best = None
+
+    for _ in range(repeat):
+        with timer() as elapsed:
+            data = serialize()
+        assert len(data) == num_rows
+        best = min(best or elapsed["seconds"], elapsed["seconds"])
+
+    return num_rows / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.contrib.auth import get_user_model
+
+    from books.models import Book
+    from books.serializers import BookListSerializer, BookListValuesSerializer
+    from borrowings.models import Borrowing
+    from borrowings.serializers import (
+        BorrowingListSerializer,
+        BorrowingListValuesSerializer,
+    )
+    from borrowings.views import annotate_borrowing_is_overdue
+    from users.serializers import UserListSerializer, UserListValuesSerializer
+
+    with benchmark_database():
+        seed(args.rows)
+
+        borrowings = annotate_borrowing_is_overdue(Borrowing.objects.all())
+        cases = [
+            (
+                "books",
+                Book.objects.all(),
+                BookListSerializer,
+                BookListValuesSerializer,
+            ),
+            (
+                "borrowings",
+                borrowings.select_related("book", "user"),
+                BorrowingListSerializer,
+                BorrowingListValuesSerializer,
+            ),
+            (
+                "users",
+                get_user_model().objects.all(),
+                UserListSerializer,
+                UserListValuesSerializer,
+            ),
+        ]
+
+        print(f"rows/sec over {args.rows} rows")
+
+        for name, queryset, serializer_class, values_class in cases:
+            model_path = rows_per_second(
+                lambda: serializer_class(queryset.all(), many=True).data,
+                args.rows,
+                args.repeat,
+            )
+            values_path = rows_per_second(
+                lambda: values_class(values_class.get_queryset(queryset)).data,
+                args.rows,
+                args.repeat,
+            )
+            print(
+                f"{name:>10}: ModelSerializer {model_path:10.0f}, "
+                f"values_list() {values_path:10.0f} "
+                f"(x{values_path / model_path:.1f})"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Throughput benchmark of the return path.
+
+The legacy path (fetch borrowing, save it, lazy fetch of the book,
+recount of active borrowings in Book.save(), fee computed in Python)
+is compared to borrowings.services.return_borrowing(). Both paths
+write the outbox notification.
+
+SQLite runs in process, so its numbers mostly show ORM overhead;
+the saved round trips weigh more on a networked database (Postgres).
+
+Usage: python -m benchmarks.bench_return [--returns 2000]
+"""
+
+import argparse
+import datetime
+
+from benchmarks.utils import setup_django, benchmark_database, timer
+
+
+def legacy_return(borrowing_id):
+    from django.db import transaction
+    from django.utils.timezone import now
+
+    from borrowings.models import Borrowing
+    from borrowings.notifications import notify
+
+    borrowing = Borrowing.objects.get(id=borrowing_id)
+
+    with transaction.atomic():
+        borrowing.is_active = False
+        borrowing.actual_return_date = now().date()
+        borrowing.save()
+
+        book = borrowing.book
+        book.save()
+
+        days_overdue = max(
+            0,
+            (
+                borrowing.actual_return_date - borrowing.expected_return_date
+            ).days,
+        )
+        money_to_pay = book.daily_fee * days_overdue
+        notify(
+            f"Borrowing №{borrowing.id} is returned.\n\n"
+            f"Book: {book}\n"
+            f"Copies left: {book.inventory}\n\n"
+            f"Days overdue: {days_overdue}\n"
+            f"Money to pay overdue: ${money_to_pay}\n",
+            kind="borrowing_returned",
+            payload={
+                "book_id": book.id,
+                "book": str(book),
+                "inventory_change": 1,
+                "overdue_fee": str(money_to_pay),
+            },
+        )
+
+
+def service_return(borrowing_id):
+    from borrowings.models import Borrowing
+    from borrowings.services import return_borrowing
+
+    Borrowing.objects.get(id=borrowing_id)
+    return_borrowing(borrowing_id)
+
+
+def seed(num_returns, num_books):
+    from django.contrib.auth import get_user_model
+
+    from books.models import Book
+    from borrowings.models import Borrowing
+
+    user = get_user_model().objects.create_user(
+        username="bench", email="bench@example.com"
+    )
+    books = Book.objects.bulk_create(
+        Book(
+            title=f"Book {i}",
+            author="Bench",
+            cover="H",
+            total_amount=num_returns,
+            inventory=0,
+            daily_fee="0.25",
+        )
+        for i in range(num_books)
+    )
+    borrow_date = datetime.date.today() - datetime.timedelta(weeks=3)
+    borrowings = Borrowing.objects.bulk_create(
+        Borrowing(
+            user=user,
+            book=books[i % num_books],
+            borrow_date=borrow_date,
+            expected_return_date=borrow_date + datetime.timedelta(weeks=2),
+        )
+        for i in range(num_returns)
+    )
+    return [borrowing.id for borrowing in borrowings]
+
+
+def run(return_borrowing, borrowing_ids):
+    from django.db import connection, transaction
+
+    num_queries = 0
+
+    def count_queries(execute, sql, params, many, context):
+        nonlocal num_queries
+        num_queries += 1
+        return execute(sql, params, many, context)
+
+    # One outer transaction, so that the fsync of every commit
+    # on SQLite does not hide the cost of the queries themselves
+    with connection.execute_wrapper(count_queries), transaction.atomic():
+        with timer() as elapsed:
+            for borrowing_id in borrowing_ids:
+                return_borrowing(borrowing_id)
+
+    return {
+        "per_second": len(borrowing_ids) / elapsed["seconds"],
+        "queries": num_queries / len(borrowing_ids),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--returns", type=int, default=2000)
+    parser.add_argument("--books", type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.contrib.auth import get_user_model
+
+    from books.models import Book
+    from borrowings.models import Notification
+
+    with benchmark_database():
+        for name, return_borrowing in (
+            ("legacy", legacy_return),
+            ("service", service_return),
+        ):
+            get_user_model().objects.all().delete()
+            Book.objects.all().delete()
+            Notification.objects.all().delete()
+            borrowing_ids = seed(args.returns, args.books)
+
+            result = run(return_borrowing, borrowing_ids)
+
+            print(
+                f"{name:>8}: {result['per_second']:8.1f} returns/sec, "
+                f"{result['queries']:.1f} queries per return"
+            )
+
+
+if __name__ == "__main__":
+    main()
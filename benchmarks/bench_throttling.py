@@ -0,0 +1,71 @@
+"""
+Overhead benchmark of a throttle check.
+
+Runs `--requests` checks of one user through DRF UserRateThrottle
+(timestamp history in the per-process LocMemCache) and through
+library_api.throttling.UserRateThrottle (sliding window counters in
+a SQLite file shared by processes). The history grows with every
+allowed request, so its checks slow down as the rate is used up.
+
+Usage: python -m benchmarks.bench_throttling [--requests 5000]
+"""
+
+import argparse
+import os
+import tempfile
+
+from benchmarks.utils import setup_django, timer
+
+
+def run(throttle_class, num_requests):
+    from django.contrib.auth.models import AnonymousUser
+    from rest_framework.test import APIRequestFactory
+
+    request = APIRequestFactory().get("/")
+    request.user = AnonymousUser()
+    throttle = throttle_class()
+    # Leave the cache and the database setup out of the timing
+    throttle.allow_request(request, None)
+    num_allowed = 0
+
+    with timer() as elapsed:
+        for _ in range(num_requests):
+            num_allowed += throttle.allow_request(request, None)
+
+    return {
+        "microseconds": elapsed["seconds"] / num_requests * 1e6,
+        "allowed": num_allowed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    os.environ["THROTTLE_DATABASE"] = os.path.join(
+        tempfile.mkdtemp(), "throttle.sqlite3"
+    )
+    setup_django()
+
+    from rest_framework import throttling as drf_throttling
+
+    from library_api import throttling
+
+    rate = f"{args.requests + 1}/day"
+
+    for name, base_class in (
+        ("history", drf_throttling.UserRateThrottle),
+        ("sliding", throttling.UserRateThrottle),
+    ):
+        throttle_class = type("Throttle", (base_class,), {"rate": rate})
+        result = run(throttle_class, args.requests)
+
+        print(
+            f"{name:>8}: {result['microseconds']:8.1f} us per check, "
+            f"{result['allowed']} allowed"
+        )
+
+
+if __name__ == "__main__":
+    main()
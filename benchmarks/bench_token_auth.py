@@ -0,0 +1,104 @@
+"""
+Throughput benchmark of token authentication.
+
+Authenticated requests to the API root (which runs no queries itself)
+go through DRF TokenAuthentication and through
+library_api.authentication.CachedTokenAuthentication.
+Requests are spread over `--users` tokens.
+
+SQLite runs in process, so its numbers mostly show ORM overhead;
+the saved round trips weigh more on a networked database (Postgres).
+
+Usage: python -m benchmarks.bench_token_auth [--requests 5000] [--users 100]
+"""
+
+import argparse
+import itertools
+
+from benchmarks.utils import setup_django, benchmark_database, timer
+
+
+def seed(num_users):
+    from django.contrib.auth import get_user_model
+    from rest_framework.authtoken.models import Token
+
+    users = get_user_model().objects.bulk_create(
+        get_user_model()(username=f"user{i}", email=f"user{i}@example.com")
+        for i in range(num_users)
+    )
+    tokens = Token.objects.bulk_create(
+        Token(user=user, key=Token.generate_key()) for user in users
+    )
+    return [token.key for token in tokens]
+
+
+def run(authentication_class, keys, num_requests):
+    from django.db import connection
+    from rest_framework.test import APIRequestFactory
+
+    from library_api.views import ApiRootView
+
+    view = ApiRootView.as_view(
+        authentication_classes=(authentication_class,), throttle_classes=()
+    )
+    factory = APIRequestFactory()
+    requests = [
+        factory.get("/", HTTP_AUTHORIZATION=f"Token {key}")
+        for key in itertools.islice(itertools.cycle(keys), num_requests)
+    ]
+    num_queries = 0
+
+    def count_queries(execute, sql, params, many, context):
+        nonlocal num_queries
+        num_queries += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count_queries):
+        with timer() as elapsed:
+            for request in requests:
+                response = view(request)
+                assert response.status_code == 200
+
+    return {
+        "per_second": num_requests / elapsed["seconds"],
+        "queries": num_queries / num_requests,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=100)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.test.utils import setup_test_environment
+    from rest_framework.authentication import TokenAuthentication
+
+    from library_api.authentication import (
+        CachedTokenAuthentication,
+        token_cache,
+    )
+
+    # Allows the "testserver" host of APIRequestFactory
+    setup_test_environment()
+
+    with benchmark_database():
+        keys = seed(args.users)
+
+        for name, authentication_class in (
+            ("database", TokenAuthentication),
+            ("cached", CachedTokenAuthentication),
+        ):
+            token_cache.clear()
+            result = run(authentication_class, keys, args.requests)
+
+            print(
+                f"{name:>8}: {result['per_second']:8.1f} requests/sec, "
+                f"{result['queries']:.2f} queries per request"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django():
+    """Configure Django for running a benchmark script from the repo root."""
+    import django
+
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library_api.settings")
+    os.environ.setdefault("DJANGO_SECRET_KEY", "benchmark")
+    os.environ.setdefault("BASE_URL", "http://testserver")
+    django.setup()
+
+
+@contextmanager
+def benchmark_database():
+    """
+    Create a throwaway database for the benchmark and drop it afterwards.
+
+    SQLite gets a file-backed database (instead of the in-memory test one),
+    so that it can be shared by several threads.
+    """
+    from django.db import connection
+
+    if connection.vendor == "sqlite":
+        tmp_dir = tempfile.mkdtemp()
+        connection.settings_dict["TEST"]["NAME"] = os.path.join(
+            tmp_dir, "benchmark.sqlite3"
+        )
+        connection.settings_dict["OPTIONS"]["timeout"] = 60
+
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True
+    )
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+@contextmanager
+def timer():
+    """Yield a dict whose "seconds" key is filled in on exit."""
+    result = {}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["seconds"] = time.perf_counter() - start
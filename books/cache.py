@@ -0,0 +1,153 @@
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from library_api.settings import BOOK_RESPONSE_CACHE_TIMEOUT
+
+CATALOG_VERSION_KEY = "books:catalog_version"
+
+
+def get_catalog_version() -> int:
+    version = cache.get(CATALOG_VERSION_KEY)
+
+    if version is None:
+        # Start from the current time, so that a counter evicted from
+        # the cache never comes back to a version used before.
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+
+    return version
+
+
+async def aget_catalog_version() -> int:
+    version = await cache.aget(CATALOG_VERSION_KEY)
+
+    if version is None:
+        await cache.aadd(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        version = await cache.aget(CATALOG_VERSION_KEY)
+
+    return version
+
+
+def _increment_catalog_version():
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        get_catalog_version()
+
+
+def bump_catalog_version():
+    """
+    Invalidate all cached book responses.
+
+    The version is bumped once more after the commit, so that responses
+    cached by concurrent requests before the commit are not reused.
+    """
+    _increment_catalog_version()
+    transaction.on_commit(_increment_catalog_version)
+
+
+def get_request_digest(request) -> str:
+    request_key = json.dumps(
+        [
+            request.accepted_media_type,
+            request.build_absolute_uri(request.path),
+            sorted(request.query_params.lists()),
+        ]
+    )
+    return hashlib.sha1(request_key.encode("utf-8")).hexdigest()
+
+
+def get_response_cache_key(request) -> str:
+    digest = get_request_digest(request)
+    return f"books:response:{get_catalog_version()}:{digest}"
+
+
+async def aget_response_cache_key(request) -> str:
+    digest = get_request_digest(request)
+    return f"books:response:{await aget_catalog_version()}:{digest}"
+
+
+def get_etag(data) -> str:
+    content = json.dumps(data, cls=JSONEncoder).encode("utf-8")
+    return quote_etag(hashlib.sha1(content).hexdigest())
+
+
+def get_conditional_response(request, etag, data):
+    if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+
+    if etag in if_none_match or if_none_match == ["*"]:
+        return Response(
+            status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+
+    return Response(data, headers={"ETag": etag})
+
+
+class CatalogResponseCacheMixin:
+    """
+    Cache list and retrieve responses until the catalog version changes.
+
+    Responses carry a strong ETag, a matching `If-None-Match`
+    is answered with 304 straight from the cache. The async actions
+    of AsyncReadModelMixin are cached the same way.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.aget_cached_response(
+            super().alist, request, *args, **kwargs
+        )
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.aget_cached_response(
+            super().aretrieve, request, *args, **kwargs
+        )
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        key = get_response_cache_key(request)
+        cached = cache.get(key)
+
+        if cached is not None:
+            etag, data = cached
+        else:
+            response = handler(request, *args, **kwargs)
+
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+            etag, data = get_etag(response.data), response.data
+            cache.set(key, (etag, data), BOOK_RESPONSE_CACHE_TIMEOUT)
+
+        return get_conditional_response(request, etag, data)
+
+    async def aget_cached_response(self, handler, request, *args, **kwargs):
+        key = await aget_response_cache_key(request)
+        cached = await cache.aget(key)
+
+        if cached is not None:
+            etag, data = cached
+        else:
+            response = await handler(request, *args, **kwargs)
+
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+            etag, data = get_etag(response.data), response.data
+            await cache.aset(key, (etag, data), BOOK_RESPONSE_CACHE_TIMEOUT)
+
+        return get_conditional_response(request, etag, data)
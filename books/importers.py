@@ -0,0 +1,115 @@
+from dataclasses import dataclass
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from books.cache import bump_catalog_version
+from books.models import Book
+from books.serializers import BookCreateUpdateSerializer
+from library_api.importers import ImportResult
+
+
+@dataclass
+class BookImportResult(ImportResult):
+    updated: int = 0
+
+
+def import_books(rows, batch_size=1000, upsert=False) -> BookImportResult:
+    """
+    Validate rows with BookCreateUpdateSerializer rules and insert them
+    in batches with bulk_create(), bypassing Book.save().
+
+    In upsert mode books with the same (title, author) are updated,
+    keeping their borrowed copies out of inventory.
+    """
+
+    serializer = BookCreateUpdateSerializer()
+    result = BookImportResult()
+    batch = []
+
+    for line, row in rows:
+        if row is None:
+            result.add_error(line, {"non_field_errors": ["Invalid row."]})
+            continue
+
+        try:
+            batch.append((line, serializer.run_validation(row)))
+        except ValidationError as error:
+            result.add_error(line, error.detail)
+            continue
+
+        if len(batch) >= batch_size:
+            save_batch(batch, upsert, result)
+            batch = []
+
+    if batch:
+        save_batch(batch, upsert, result)
+
+    if result.created or result.updated:
+        bump_catalog_version()
+
+    return result
+
+
+def save_batch(batch, upsert, result):
+    if not upsert:
+        Book.objects.bulk_create(
+            [Book(**data, inventory=data["total_amount"]) for _, data in batch]
+        )
+        result.created += len(batch)
+        return
+
+    # The last row wins when a key repeats within the batch
+    rows_by_key = {}
+    for line, data in batch:
+        rows_by_key[(data["title"], data["author"])] = (line, data)
+
+    result.updated += len(batch) - len(rows_by_key)
+
+    with transaction.atomic():
+        existing_books = {}
+        for book in Book.objects.select_for_update().filter(
+            title__in={title for title, _ in rows_by_key},
+            author__in={author for _, author in rows_by_key},
+        ):
+            existing_books.setdefault((book.title, book.author), book)
+
+        books_to_create = []
+        books_to_update = []
+
+        for key, (line, data) in rows_by_key.items():
+            book = existing_books.get(key)
+
+            if book is None:
+                books_to_create.append(
+                    Book(**data, inventory=data["total_amount"])
+                )
+                continue
+
+            num_borrowed_books = book.total_amount - book.inventory
+
+            if data["total_amount"] < num_borrowed_books:
+                result.add_error(
+                    line,
+                    {
+                        "total_amount": [
+                            f"{num_borrowed_books} copies "
+                            f"of this book are borrowed."
+                        ]
+                    },
+                )
+                continue
+
+            for field_name, value in data.items():
+                setattr(book, field_name, value)
+            book.inventory = book.total_amount - num_borrowed_books
+            books_to_update.append(book)
+
+        Book.objects.bulk_create(books_to_create)
+        Book.objects.bulk_update(
+            books_to_update,
+            fields=["cover", "total_amount", "inventory", "daily_fee"],
+        )
+
+    result.created += len(books_to_create)
+    result.updated += len(books_to_update)
@@ -0,0 +1,72 @@
+import sys
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from books.importers import import_books
+from library_api.importers import (
+    IMPORT_FORMATS,
+    get_import_format,
+    open_text,
+    read_rows,
+)
+
+
+class Command(BaseCommand):
+    """Django command to stream books from a CSV or JSONL file into db"""
+
+    help = "Import books from a CSV or JSONL file ('-' for stdin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            help="File format, detected by the file extension by default.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--upsert",
+            action="store_true",
+            help="Update books with the same title and author.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or get_import_format(path)
+
+        if file_format is None:
+            raise CommandError(
+                "Can not detect file format, use --format option."
+            )
+
+        start = time.perf_counter()
+
+        if path == "-":
+            stream = open_text(sys.stdin.buffer)
+            result = self.import_stream(stream, file_format, options)
+        else:
+            with open(path, "rb") as file:
+                result = self.import_stream(
+                    open_text(file), file_format, options
+                )
+
+        elapsed = time.perf_counter() - start
+
+        for error in result.errors:
+            self.stderr.write(f"Line {error['line']}: {error['errors']}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created: {result.created}, updated: {result.updated}, "
+                f"rejected: {result.rejected} in {elapsed:.1f}s"
+            )
+        )
+
+    @staticmethod
+    def import_stream(stream, file_format, options):
+        return import_books(
+            read_rows(stream, file_format),
+            batch_size=options["batch_size"],
+            upsert=options["upsert"],
+        )
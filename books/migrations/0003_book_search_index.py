@@ -0,0 +1,99 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models.functions import Upper
+
+POSTGRES_INDEXES = [
+    GinIndex(
+        SearchVector("title", "author", config="simple"),
+        name="book_search_vector_idx",
+    ),
+    # Serve `title__icontains` / `author__icontains` lookups,
+    # which are compiled to UPPER(...) LIKE UPPER(...).
+    GinIndex(
+        OpClass(Upper("title"), name="gin_trgm_ops"),
+        name="book_title_trgm_idx",
+    ),
+    GinIndex(
+        OpClass(Upper("author"), name="gin_trgm_ops"),
+        name="book_author_trgm_idx",
+    ),
+]
+
+SQLITE_CREATE_FTS = [
+    """
+    CREATE VIRTUAL TABLE books_book_fts USING fts5(
+        title, author,
+        content='books_book', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER books_book_fts_insert AFTER INSERT ON books_book BEGIN
+        INSERT INTO books_book_fts(rowid, title, author)
+        VALUES (new.id, new.title, new.author);
+    END
+    """,
+    """
+    CREATE TRIGGER books_book_fts_delete AFTER DELETE ON books_book BEGIN
+        INSERT INTO books_book_fts(books_book_fts, rowid, title, author)
+        VALUES ('delete', old.id, old.title, old.author);
+    END
+    """,
+    """
+    CREATE TRIGGER books_book_fts_update AFTER UPDATE OF title, author
+    ON books_book BEGIN
+        INSERT INTO books_book_fts(books_book_fts, rowid, title, author)
+        VALUES ('delete', old.id, old.title, old.author);
+        INSERT INTO books_book_fts(rowid, title, author)
+        VALUES (new.id, new.title, new.author);
+    END
+    """,
+    "INSERT INTO books_book_fts(books_book_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP_FTS = [
+    "DROP TRIGGER IF EXISTS books_book_fts_insert",
+    "DROP TRIGGER IF EXISTS books_book_fts_delete",
+    "DROP TRIGGER IF EXISTS books_book_fts_update",
+    "DROP TABLE IF EXISTS books_book_fts",
+]
+
+
+def create_search_index(apps, schema_editor):
+    Book = apps.get_model("books", "Book")
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "postgresql":
+        for index in POSTGRES_INDEXES:
+            schema_editor.add_index(Book, index)
+
+    elif vendor == "sqlite":
+        for statement in SQLITE_CREATE_FTS:
+            schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    Book = apps.get_model("books", "Book")
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "postgresql":
+        for index in POSTGRES_INDEXES:
+            schema_editor.remove_index(Book, index)
+
+    elif vendor == "sqlite":
+        for statement in SQLITE_DROP_FTS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0002_book_inventory"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
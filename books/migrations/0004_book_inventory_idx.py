@@ -0,0 +1,19 @@
+# Generated by Django 5.0.2 on 2026-10-18 04:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0003_book_search_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["inventory"], name="book_inventory_idx"
+            ),
+        ),
+    ]
@@ -1,7 +1,7 @@
 from django.db import models
-from django.urls import reverse
 
-from library_api.settings import BASE_URL
+from books.cache import bump_catalog_version
+from library_api.url_templates import get_url_template
 
 BOOK_COVER_CHOICES = [
     ("H", "Hard"),
@@ -17,6 +17,11 @@ class Book(models.Model):
     inventory = models.PositiveIntegerField()
     daily_fee = models.DecimalField(default=0, decimal_places=2, max_digits=4)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["inventory"], name="book_inventory_idx"),
+        ]
+
     def __str__(self):
         return f"{self.title} ({self.author})"
 
@@ -25,12 +30,21 @@ class Book(models.Model):
             self.inventory = self.total_amount
         else:
             num_borrowed_books = self.borrowings.filter(is_active=True).count()
-            self.inventory = self.total_amount - num_borrowed_books
+            num_held_books = self.reservations.filter(status="held").count()
+            self.inventory = (
+                self.total_amount - num_borrowed_books - num_held_books
+            )
 
         super().save(*args, **kwargs)
+        bump_catalog_version()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        bump_catalog_version()
+        return result
 
     def get_absolute_url(self):
-        return reverse("books:book-detail", kwargs={"pk": self.id})
+        return get_url_template("books:book-detail", "pk").path(pk=self.id)
 
     def get_full_absolute_url(self):
-        return f"{BASE_URL}{self.get_absolute_url()}"
+        return get_url_template("books:book-detail", "pk").url(pk=self.id)
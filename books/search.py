@@ -0,0 +1,77 @@
+import re
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+)
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+# Must match the expression of "book_search_vector_idx" GIN index
+# (books/migrations/0003_book_search_index.py) to be served by it.
+BOOK_SEARCH_VECTOR = SearchVector("title", "author", config="simple")
+
+SQLITE_FTS_TABLE = "books_book_fts"
+
+
+def get_search_terms(query: str) -> list[str]:
+    return re.findall(r"\w+", query)
+
+
+def search_books(queryset, query: str):
+    """
+    Filter books by every word of the query (as a word prefix)
+    in title or author and order them by relevance.
+
+    Uses tsvector GIN index on PostgreSQL and FTS5 shadow table on SQLite.
+    """
+
+    terms = get_search_terms(query)
+
+    if not terms:
+        return queryset.none()
+
+    vendor = connections[queryset.db].vendor
+
+    if vendor == "postgresql":
+        search_query = SearchQuery(
+            " & ".join(f"{term}:*" for term in terms),
+            config="simple",
+            search_type="raw",
+        )
+        return (
+            queryset.alias(search=BOOK_SEARCH_VECTOR)
+            .annotate(rank=SearchRank(BOOK_SEARCH_VECTOR, search_query))
+            .filter(search=search_query)
+            .order_by("-rank", "id")
+        )
+
+    if vendor == "sqlite":
+        fts_query = " ".join(f'"{term}"*' for term in terms)
+        return (
+            queryset.filter(
+                id__in=RawSQL(
+                    f"SELECT rowid FROM {SQLITE_FTS_TABLE} "
+                    f"WHERE {SQLITE_FTS_TABLE} MATCH %s",
+                    (fts_query,),
+                )
+            )
+            .annotate(
+                rank=RawSQL(
+                    f"SELECT bm25({SQLITE_FTS_TABLE}) FROM {SQLITE_FTS_TABLE} "
+                    f"WHERE {SQLITE_FTS_TABLE} MATCH %s "
+                    f"AND rowid = books_book.id",
+                    (fts_query,),
+                )
+            )
+            .order_by("rank", "id")
+        )
+
+    for term in terms:
+        queryset = queryset.filter(
+            Q(title__icontains=term) | Q(author__icontains=term)
+        )
+
+    return queryset
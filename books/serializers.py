@@ -3,6 +3,8 @@ from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
 from books.models import Book
+from library_api.serializers import ValuesListSerializer
+from library_api.url_templates import get_url_template
 
 
 class BookDetailSerializer(serializers.ModelSerializer):
@@ -52,3 +54,21 @@ class BookListSerializer(serializers.ModelSerializer):
     @extend_schema_field(OpenApiTypes.URI_TPL)
     def get_detail_url(instance):
         return instance.get_full_absolute_url()
+
+
+class BookListValuesSerializer(ValuesListSerializer):
+    """Same output as BookListSerializer, built from values_list()"""
+
+    values = ("id", "title", "author", "inventory", "daily_fee")
+
+    def to_representation(self, row):
+        return {
+            "id": row.id,
+            "title": row.title,
+            "author": row.author,
+            "inventory": row.inventory,
+            "daily_fee": f"{row.daily_fee:f}",
+            "detail_url": get_url_template("books:book-detail", "pk").url(
+                pk=row.id
+            ),
+        }
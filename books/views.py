@@ -1,33 +1,75 @@
+from django.http import Http404
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 
+from books.cache import CatalogResponseCacheMixin
+from books.importers import import_books
 from books.models import Book
+from books.search import search_books
 from books.serializers import (
     BookListSerializer,
+    BookListValuesSerializer,
     BookDetailSerializer,
     BookCreateUpdateSerializer,
 )
-from borrowings.models import Borrowing
-from borrowings.serializers import BorrowingSerializer
-from borrowings.telegram_bot import send_telegram_notification
+from borrowings.models import Reservation
+from borrowings.reservations import (
+    annotate_reservation_position,
+    reserve_book,
+    AlreadyReservedError,
+    BookAvailableError,
+)
+from borrowings.serializers import (
+    BorrowingSerializer,
+    BulkBorrowSerializer,
+    BulkResponseSerializer,
+    ReservationSerializer,
+)
+from borrowings.services import (
+    borrow_book,
+    borrow_books,
+    BookNotAvailableError,
+)
+from library_api.importers import (
+    IMPORT_FORMATS,
+    get_import_format,
+    open_text,
+    read_rows,
+)
 from library_api.paginators import Pagination
 from library_api.permissions import IsAdminUserOrReadOnly
+from library_api.query_budget import query_budget
+from library_api.views import (
+    AsyncReadModelMixin,
+    ExportModelMixin,
+    ValuesListModelMixin,
+)
 
 
-class BookViewSet(viewsets.ModelViewSet):
+class BookViewSet(
+    CatalogResponseCacheMixin,
+    AsyncReadModelMixin,
+    ExportModelMixin,
+    ValuesListModelMixin,
+    viewsets.ModelViewSet,
+):
     permission_classes = (IsAdminUserOrReadOnly,)
+    list_values_serializer_class = BookListValuesSerializer
     pagination_class = Pagination
+    keyset_ordering = ("id",)
 
     def get_queryset(self):
         queryset = Book.objects.all()
 
-        if self.action == "list":
+        if self.action in ("list", "export"):
             title = self.request.query_params.get("title", None)
             author = self.request.query_params.get("author", None)
+            search_query = self.request.query_params.get("q", None)
             is_available = self.request.query_params.get("is_available", None)
 
             if title:
@@ -42,6 +84,9 @@ class BookViewSet(viewsets.ModelViewSet):
                 elif is_available == "false":
                     queryset = queryset.filter(inventory__exact=0)
 
+            if search_query:
+                queryset = search_books(queryset, search_query)
+
         return queryset
 
     def get_serializer_class(self):
@@ -66,34 +111,173 @@ class BookViewSet(viewsets.ModelViewSet):
         assigned to the current user.
         """
 
-        book = Book.objects.get(id=pk)
+        try:
+            borrowing = borrow_book(request.user, pk)
+        except Book.DoesNotExist:
+            raise Http404
+        except BookNotAvailableError:
+            return Response(
+                {
+                    "error": "There are no copies of this book available for borrowing."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = BorrowingSerializer(borrowing, many=False)
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @extend_schema(request=None, responses={201: ReservationSerializer})
+    @action(
+        methods=["POST"],
+        detail=True,
+        url_path="reserve",
+        permission_classes=(IsAuthenticated,),
+    )
+    def reserve(self, request, pk=None):
+        """
+        Endpoint for joining the queue of a book with no copies left.
+        The next returned copy is held for the first reservation
+        in the queue, so there is no need to poll the book.
+        """
+
+        try:
+            reservation = reserve_book(request.user, pk)
+        except Book.DoesNotExist:
+            raise Http404
+        except BookAvailableError:
+            return Response(
+                {"error": "This book is available for borrowing."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except AlreadyReservedError:
+            return Response(
+                {"error": "You have already reserved this book."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        reservation = annotate_reservation_position(
+            Reservation.objects.select_related("book", "user")
+        ).get(id=reservation.id)
+        serializer = ReservationSerializer(reservation)
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @extend_schema(
+        request=BulkBorrowSerializer,
+        responses={
+            200: BulkResponseSerializer,
+            400: BulkResponseSerializer,
+        },
+    )
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="borrow",
+        permission_classes=(IsAuthenticated,),
+    )
+    def bulk_borrow(self, request):
+        """
+        Endpoint for borrowing a list of books for the current user
+        in one transaction. In `all_or_nothing` mode (default) nothing
+        is borrowed if any book can not be borrowed, in `best_effort`
+        mode all the available books are borrowed.
+        Responds with 400 when no book is borrowed.
+        """
+
+        serializer = BulkBorrowSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results, borrowings = borrow_books(
+            request.user,
+            serializer.validated_data["books"],
+            best_effort=serializer.validated_data["mode"] == "best_effort",
+        )
+
+        return Response(
+            {"results": results},
+            status=(
+                status.HTTP_200_OK
+                if borrowings
+                else status.HTTP_400_BAD_REQUEST
+            ),
+        )
+
+    @extend_schema(
+        request={
+            "multipart/form-data": {
+                "type": "object",
+                "properties": {"file": {"type": "string", "format": "binary"}},
+            }
+        },
+        parameters=[
+            OpenApiParameter(
+                name="file_format",
+                type=OpenApiTypes.STR,
+                enum=IMPORT_FORMATS,
+                description="Format of the file, detected by the file extension by default (ex. ?file_format=csv)",
+            ),
+            OpenApiParameter(
+                name="upsert",
+                type=OpenApiTypes.BOOL,
+                description="Update books with the same title and author (ex. ?upsert=true)",
+            ),
+        ],
+    )
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="import",
+        permission_classes=(IsAdminUser,),
+        parser_classes=(MultiPartParser,),
+    )
+    def bulk_import(self, request):
+        """
+        Endpoint for bulk import of books from CSV or JSONL file
+        (available to staff users).
+        """
+
+        upload = request.FILES.get("file", None)
 
-        if book.inventory > 0:
-            user = request.user
-            borrowing = Borrowing.objects.create(user=user, book=book)
-            book.save()
-            serializer = BorrowingSerializer(borrowing, many=False)
+        if upload is None:
+            return Response(
+                {"error": "File is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        file_format = request.query_params.get(
+            "file_format", None
+        ) or get_import_format(upload.name)
 
-            text = (
-                f"New borrowing №{borrowing.id} created.\n\n"
-                f"User: {user}\n"
-                f"Book: {book}\n"
-                f"Copies left: {book.inventory}"
+        if file_format not in IMPORT_FORMATS:
+            return Response(
+                {"error": "File format should be one of: csv, jsonl."},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            send_telegram_notification(text)
 
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        result = import_books(
+            read_rows(open_text(upload.file), file_format),
+            upsert=request.query_params.get("upsert", None) == "true",
+        )
 
         return Response(
             {
-                "error": "There are no copies of this book available for borrowing."
+                "created": result.created,
+                "updated": result.updated,
+                "rejected": result.rejected,
+                "errors": result.errors,
             },
-            status=status.HTTP_400_BAD_REQUEST,
+            status=status.HTTP_200_OK,
         )
 
     # Only for documentation purposes
     @extend_schema(
         parameters=[
+            OpenApiParameter(
+                name="q",
+                type=OpenApiTypes.STR,
+                description="Search by words in title or author, results are ordered by relevance (ex. ?q=john new)",
+            ),
             OpenApiParameter(
                 name="title",
                 type=OpenApiTypes.STR,
@@ -111,5 +295,10 @@ class BookViewSet(viewsets.ModelViewSet):
             ),
         ]
     )
+    @query_budget(2)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
+
+    @query_budget(1)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
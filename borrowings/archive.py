@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils.timezone import now
+
+from borrowings.models import ArchivedBorrowing, Borrowing
+
+ARCHIVED_FIELDS = (
+    "id",
+    "borrow_date",
+    "expected_return_date",
+    "actual_return_date",
+    "book_id",
+    "user_id",
+)
+
+
+def get_archivable_borrowings(days):
+    """Borrowings returned more than `days` days ago"""
+
+    cutoff = now().date() - timedelta(days=days)
+    return Borrowing.objects.filter(
+        is_active=False, actual_return_date__lt=cutoff
+    )
+
+
+def archive_batch(queryset, batch_size) -> list:
+    """
+    Move the first `batch_size` borrowings of the queryset (by id)
+    to the archive in one transaction. Returns the moved ids.
+    """
+
+    with transaction.atomic():
+        rows = list(
+            queryset.order_by("id").values(*ARCHIVED_FIELDS)[:batch_size]
+        )
+
+        if not rows:
+            return []
+
+        ids = [row["id"] for row in rows]
+        ArchivedBorrowing.objects.bulk_create(
+            ArchivedBorrowing(**row) for row in rows
+        )
+        Borrowing.objects.filter(id__in=ids).delete()
+
+    return ids
+
+
+def archive_borrowings(days, batch_size=1000):
+    """
+    Move borrowings returned more than `days` days ago to the archive,
+    yielding the number of borrowings moved by every batch.
+
+    Every batch is committed on its own, so an interrupted run loses
+    nothing and the next run goes on with the remaining borrowings.
+    """
+
+    queryset = get_archivable_borrowings(days)
+    last_id = 0
+
+    while True:
+        ids = archive_batch(queryset.filter(id__gt=last_id), batch_size)
+
+        if not ids:
+            return
+
+        last_id = ids[-1]
+        yield len(ids)
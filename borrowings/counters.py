@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from borrowings.models import Borrowing
+
+
+def count_borrowings(**filters):
+    """
+    Subquery counting active borrowings of the outer user, served
+    by the partial index of active borrowings by user.
+    """
+
+    num_borrowings = (
+        Borrowing.objects.filter(
+            user=OuterRef("pk"), is_active=True, **filters
+        )
+        .order_by()
+        .values("user")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    return Coalesce(Subquery(num_borrowings), 0)
+
+
+def reconcile_num_active_borrowings(batch_size=1000):
+    """
+    Fix `User.num_active_borrowings` counters which drifted from
+    the borrowings (e.g. after changes made with QuerySet.update()
+    or in the admin site), yielding the number of users fixed by
+    every batch.
+    """
+
+    drifted_users = (
+        get_user_model()
+        .objects.annotate(actual=count_borrowings())
+        .exclude(num_active_borrowings=F("actual"))
+    )
+    last_id = 0
+
+    while True:
+        ids = list(
+            drifted_users.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+
+        if not ids:
+            return
+
+        get_user_model().objects.filter(id__in=ids).update(
+            num_active_borrowings=count_borrowings()
+        )
+        last_id = ids[-1]
+        yield len(ids)
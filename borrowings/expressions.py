@@ -0,0 +1,30 @@
+from django.db.models import FloatField, Func, IntegerField
+
+
+class DaysBetween(Func):
+    """Number of whole days from the `start` date to the `end` date"""
+
+    arity = 2
+    arg_joiner = " - "
+    template = "(%(expressions)s)"
+    output_field = IntegerField()
+
+    def __init__(self, end, start, **extra):
+        super().__init__(end, start, **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        clone = self.copy()
+        clone.set_source_expressions(
+            [
+                Func(
+                    expression, function="JULIANDAY", output_field=FloatField()
+                )
+                for expression in self.get_source_expressions()
+            ]
+        )
+        return super(DaysBetween, clone).as_sql(
+            compiler,
+            connection,
+            template="CAST(%(expressions)s AS INTEGER)",
+            **extra_context,
+        )
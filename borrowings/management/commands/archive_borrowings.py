@@ -0,0 +1,55 @@
+import time
+
+from django.core.management import BaseCommand
+
+from borrowings.archive import archive_borrowings, get_archivable_borrowings
+from library_api.settings import BORROWING_ARCHIVE_AFTER_DAYS
+
+
+class Command(BaseCommand):
+    """Django command to move old returned borrowings to the archive"""
+
+    help = "Move borrowings returned more than N days ago to the archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=BORROWING_ARCHIVE_AFTER_DAYS,
+            help="Archive borrowings returned more than this many days ago.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0,
+            help="Seconds to wait between batches to spread the load.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the borrowings to archive.",
+        )
+
+    def handle(self, *args, **options):
+        days = options["days"]
+
+        if options["dry_run"]:
+            num_borrowings = get_archivable_borrowings(days).count()
+            self.stdout.write(f"{num_borrowings} borrowings to archive")
+            return
+
+        num_archived = 0
+
+        try:
+            for num_moved in archive_borrowings(days, options["batch_size"]):
+                num_archived += num_moved
+                self.stdout.write(f"Archived {num_archived} borrowings")
+                time.sleep(options["sleep"])
+
+        except KeyboardInterrupt:
+            self.stdout.write("Interrupted, run again to go on")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Archived: {num_archived} borrowings")
+        )
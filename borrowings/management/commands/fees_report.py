@@ -0,0 +1,66 @@
+import datetime
+import json
+
+from django.core.management import BaseCommand, CommandError
+from rest_framework.utils.encoders import JSONEncoder
+
+from borrowings.reports import get_outstanding_fees_report
+
+
+class Command(BaseCommand):
+    """Django command to report outstanding overdue fees"""
+
+    help = "Report outstanding overdue fees in total, per user and per book."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            help="Count fees up to this date (YYYY-MM-DD), today by default.",
+        )
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=10,
+            help="Number of users and books with the highest fees to show.",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Write the full report as JSON.",
+        )
+
+    def handle(self, *args, **options):
+        date = None
+
+        if options["date"]:
+            try:
+                date = datetime.date.fromisoformat(options["date"])
+            except ValueError:
+                raise CommandError("Date must be in YYYY-MM-DD format.")
+
+        report = get_outstanding_fees_report(date)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, cls=JSONEncoder, indent=2))
+            return
+
+        total = report["total"]
+        self.stdout.write(
+            f"Outstanding overdue fees on {report['date']}: "
+            f"${total['money_to_pay']} for {total['borrowings']} borrowings, "
+            f"{total['days_overdue']} days overdue"
+        )
+
+        self.stdout.write("\nUsers:")
+        for user in report["users"][: options["top"]]:
+            self.stdout.write(
+                f"  ${user['money_to_pay']:>10}  {user['email'] or user['id']} "
+                f"({user['borrowings']} borrowings)"
+            )
+
+        self.stdout.write("\nBooks:")
+        for book in report["books"][: options["top"]]:
+            self.stdout.write(
+                f"  ${book['money_to_pay']:>10}  {book['title']} "
+                f"({book['author']}, {book['borrowings']} borrowings)"
+            )
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management import BaseCommand
+
+from borrowings.reservations import expire_holds, hold_available_copies
+
+
+class Command(BaseCommand):
+    """Django command to expire reservation holds and allocate copies"""
+
+    help = (
+        "Expire holds not borrowed in time, passing their copies on, "
+        "and hold copies left in inventory for waiting reservations."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process reservations and exit.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=60,
+            help="Seconds to wait between runs.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                num_expired = expire_holds()
+                num_held = hold_available_copies()
+
+                if num_expired or num_held:
+                    self.stdout.write(
+                        f"Expired: {num_expired}, held: {num_held}"
+                    )
+
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS("Reservations processed"))
@@ -0,0 +1,17 @@
+from django.core.management import BaseCommand
+
+from borrowings.counters import reconcile_num_active_borrowings
+
+
+class Command(BaseCommand):
+    """Django command to recount active borrowings of users"""
+
+    help = "Fix active borrowings counters of users which drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        num_fixed = sum(reconcile_num_active_borrowings(options["batch_size"]))
+
+        self.stdout.write(self.style.SUCCESS(f"Fixed: {num_fixed} users"))
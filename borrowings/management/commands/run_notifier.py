@@ -0,0 +1,51 @@
+import time
+
+import requests
+from django.core.management import BaseCommand
+
+from borrowings.notifications import build_digests, deliver_notifications
+
+
+class Command(BaseCommand):
+    """Django command to deliver notifications from the outbox"""
+
+    help = "Deliver pending notifications to Telegram."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Deliver due notifications and exit.",
+        )
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to wait when there is nothing to deliver.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        # Session keeps connections to the API alive between messages
+        with requests.Session() as session:
+            try:
+                while True:
+                    build_digests()
+                    num_processed = deliver_notifications(session, batch_size)
+
+                    if num_processed:
+                        self.stdout.write(
+                            f"Processed {num_processed} notifications"
+                        )
+
+                    if num_processed < batch_size:
+                        if options["once"]:
+                            break
+                        time.sleep(options["interval"])
+
+            except KeyboardInterrupt:
+                pass
+
+        self.stdout.write(self.style.SUCCESS("Notifier stopped"))
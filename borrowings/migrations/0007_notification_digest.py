@@ -0,0 +1,65 @@
+# Generated by Django 5.0.2 on 2026-10-18 04:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("borrowings", "0006_notification"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="digest",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="events",
+                to="borrowings.notification",
+            ),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="is_buffered",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("message", "Message"),
+                    ("borrowing_created", "Borrowing created"),
+                    ("borrowing_returned", "Borrowing returned"),
+                    ("digest", "Digest"),
+                ],
+                default="message",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="payload",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["created_at"], name="notification_created_at_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(
+                    ("digest__isnull", True), ("is_buffered", True)
+                ),
+                fields=["created_at"],
+                name="notification_buffered_idx",
+            ),
+        ),
+    ]
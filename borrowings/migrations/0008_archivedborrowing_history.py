@@ -0,0 +1,107 @@
+# Generated by Django 5.0.2 on 2026-10-18 04:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+CREATE_HISTORY_VIEW = """
+    CREATE VIEW borrowings_borrowinghistory AS
+    SELECT id, borrow_date, expected_return_date, actual_return_date,
+        book_id, user_id, is_active
+    FROM borrowings_borrowing
+    UNION ALL
+    SELECT id, borrow_date, expected_return_date, actual_return_date,
+        book_id, user_id, false
+    FROM borrowings_archivedborrowing
+"""
+
+DROP_HISTORY_VIEW = "DROP VIEW IF EXISTS borrowings_borrowinghistory"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0004_book_inventory_idx"),
+        ("borrowings", "0007_notification_digest"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedBorrowing",
+            fields=[
+                (
+                    "id",
+                    models.BigIntegerField(primary_key=True, serialize=False),
+                ),
+                ("borrow_date", models.DateField()),
+                ("expected_return_date", models.DateField()),
+                (
+                    "actual_return_date",
+                    models.DateField(blank=True, null=True),
+                ),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "book",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_borrowings",
+                        to="books.book",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_borrowings",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["borrow_date", "id"],
+                        name="archived_borrow_date_id_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="BorrowingHistory",
+            fields=[
+                (
+                    "id",
+                    models.BigIntegerField(primary_key=True, serialize=False),
+                ),
+                ("borrow_date", models.DateField()),
+                ("expected_return_date", models.DateField()),
+                (
+                    "actual_return_date",
+                    models.DateField(blank=True, null=True),
+                ),
+                ("is_active", models.BooleanField()),
+                (
+                    "book",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="books.book",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "borrowings_borrowinghistory",
+                "managed": False,
+            },
+        ),
+        migrations.RunSQL(CREATE_HISTORY_VIEW, DROP_HISTORY_VIEW),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 5.0.2 on 2026-10-18 04:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0004_book_inventory_idx"),
+        ("borrowings", "0008_archivedborrowing_history"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="notification",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("message", "Message"),
+                    ("borrowing_created", "Borrowing created"),
+                    ("borrowing_returned", "Borrowing returned"),
+                    ("reservation_held", "Reservation held"),
+                    ("digest", "Digest"),
+                ],
+                default="message",
+                max_length=20,
+            ),
+        ),
+        migrations.CreateModel(
+            name="Reservation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("waiting", "Waiting"),
+                            ("held", "Held"),
+                            ("fulfilled", "Fulfilled"),
+                            ("expired", "Expired"),
+                            ("cancelled", "Cancelled"),
+                        ],
+                        default="waiting",
+                        max_length=10,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("held_until", models.DateTimeField(blank=True, null=True)),
+                (
+                    "book",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reservations",
+                        to="books.book",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reservations",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("status", "waiting")),
+                        fields=["book", "id"],
+                        name="reservation_queue_idx",
+                    ),
+                    models.Index(
+                        condition=models.Q(
+                            ("status__in", ("waiting", "held"))
+                        ),
+                        fields=["user"],
+                        name="reservation_user_open_idx",
+                    ),
+                    models.Index(
+                        condition=models.Q(("status", "held")),
+                        fields=["held_until"],
+                        name="reservation_held_until_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="reservation",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status__in", ("waiting", "held"))),
+                fields=("book", "user"),
+                name="reservation_open_book_user_unique",
+            ),
+        ),
+    ]
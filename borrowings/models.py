@@ -2,11 +2,11 @@ import datetime
 
 from django.contrib.auth import get_user_model
 from django.db import models
-from django.urls import reverse
 from django.utils.timezone import now
 
 from books.models import Book
-from library_api.settings import BASE_URL
+from library_api.url_templates import get_url_template
+from users.cache import bump_dashboard_version
 
 
 class Borrowing(models.Model):
@@ -21,19 +21,246 @@ class Borrowing(models.Model):
     )
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["borrow_date", "id"],
+                name="borrowing_borrow_date_id_idx",
+            ),
+            # Hot filters only look for active borrowings, partial indexes
+            # stay small as borrowings history grows
+            models.Index(
+                fields=["user"],
+                condition=models.Q(is_active=True),
+                name="borrowing_user_active_idx",
+            ),
+            models.Index(
+                fields=["book"],
+                condition=models.Q(is_active=True),
+                name="borrowing_book_active_idx",
+            ),
+            models.Index(
+                fields=["expected_return_date"],
+                condition=models.Q(is_active=True),
+                name="borrowing_active_due_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.book} - {self.expected_return_date}"
 
     def save(self, *args, **kwargs):
-        if not self.id:
+        is_created = not self.id
+
+        if is_created:
             self.borrow_date = now().date()
             self.expected_return_date = self.borrow_date + datetime.timedelta(
                 weeks=2
             )
         super().save(*args, **kwargs)
 
+        if is_created and self.is_active:
+            get_user_model().objects.filter(id=self.user_id).update(
+                num_active_borrowings=models.F("num_active_borrowings") + 1
+            )
+            bump_dashboard_version(self.user_id)
+
     def get_absolute_url(self):
-        return reverse("borrowings:borrowing-detail", kwargs={"pk": self.id})
+        return get_url_template("borrowings:borrowing-detail", "pk").path(
+            pk=self.id
+        )
 
     def get_full_absolute_url(self):
-        return f"{BASE_URL}{self.get_absolute_url()}"
+        return get_url_template("borrowings:borrowing-detail", "pk").url(
+            pk=self.id
+        )
+
+
+class ArchivedBorrowing(models.Model):
+    """
+    Returned borrowing moved out of the borrowings table
+    by `python manage.py archive_borrowings`, keeping its id.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    borrow_date = models.DateField()
+    expected_return_date = models.DateField()
+    actual_return_date = models.DateField(blank=True, null=True)
+    book = models.ForeignKey(
+        Book, on_delete=models.CASCADE, related_name="archived_borrowings"
+    )
+    user = models.ForeignKey(
+        get_user_model(),
+        on_delete=models.CASCADE,
+        related_name="archived_borrowings",
+    )
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["borrow_date", "id"],
+                name="archived_borrow_date_id_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.book} - {self.expected_return_date}"
+
+
+class BorrowingHistory(models.Model):
+    """
+    Read-only database view of all borrowings: UNION ALL of
+    the borrowings table and the archive. Filters are pushed down
+    to both tables by the database.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    borrow_date = models.DateField()
+    expected_return_date = models.DateField()
+    actual_return_date = models.DateField(blank=True, null=True)
+    book = models.ForeignKey(
+        Book, on_delete=models.DO_NOTHING, related_name="+"
+    )
+    user = models.ForeignKey(
+        get_user_model(), on_delete=models.DO_NOTHING, related_name="+"
+    )
+    is_active = models.BooleanField()
+
+    class Meta:
+        managed = False
+        db_table = "borrowings_borrowinghistory"
+
+    def __str__(self):
+        return f"{self.book} - {self.expected_return_date}"
+
+    def get_absolute_url(self):
+        return get_url_template("borrowings:borrowing-detail", "pk").path(
+            pk=self.id
+        )
+
+    def get_full_absolute_url(self):
+        return get_url_template("borrowings:borrowing-detail", "pk").url(
+            pk=self.id
+        )
+
+
+RESERVATION_STATUS_CHOICES = [
+    ("waiting", "Waiting"),
+    ("held", "Held"),
+    ("fulfilled", "Fulfilled"),
+    ("expired", "Expired"),
+    ("cancelled", "Cancelled"),
+]
+RESERVATION_OPEN_STATUSES = ("waiting", "held")
+
+
+class Reservation(models.Model):
+    """
+    Place of the user in the FIFO queue of a book, ordered by id.
+
+    A returned copy is held for the first waiting reservation instead
+    of going back to the inventory, until the user borrows it
+    or the hold expires.
+    """
+
+    book = models.ForeignKey(
+        Book, on_delete=models.CASCADE, related_name="reservations"
+    )
+    user = models.ForeignKey(
+        get_user_model(), on_delete=models.CASCADE, related_name="reservations"
+    )
+    status = models.CharField(
+        max_length=10, choices=RESERVATION_STATUS_CHOICES, default="waiting"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    held_until = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            # Also serves lookups of open reservations by book
+            models.UniqueConstraint(
+                fields=["book", "user"],
+                condition=models.Q(status__in=RESERVATION_OPEN_STATUSES),
+                name="reservation_open_book_user_unique",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["book", "id"],
+                condition=models.Q(status="waiting"),
+                name="reservation_queue_idx",
+            ),
+            models.Index(
+                fields=["user"],
+                condition=models.Q(status__in=RESERVATION_OPEN_STATUSES),
+                name="reservation_user_open_idx",
+            ),
+            models.Index(
+                fields=["held_until"],
+                condition=models.Q(status="held"),
+                name="reservation_held_until_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.book} - {self.user} ({self.status})"
+
+
+NOTIFICATION_KIND_CHOICES = [
+    ("message", "Message"),
+    ("borrowing_created", "Borrowing created"),
+    ("borrowing_returned", "Borrowing returned"),
+    ("reservation_held", "Reservation held"),
+    ("digest", "Digest"),
+]
+
+
+class Notification(models.Model):
+    """
+    Outbox of chat notifications, written in the same transaction
+    as the change they describe and delivered by `run_notifier` command.
+
+    `next_attempt_at` is cleared once the notification is sent
+    or the delivery is given up. Buffered events are not sent
+    on their own, but folded into the `digest` of their time window.
+    """
+
+    kind = models.CharField(
+        max_length=20, choices=NOTIFICATION_KIND_CHOICES, default="message"
+    )
+    text = models.TextField()
+    payload = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    next_attempt_at = models.DateTimeField(default=now, null=True)
+    attempts = models.PositiveIntegerField(default=0)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    is_buffered = models.BooleanField(default=False)
+    digest = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name="events",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(next_attempt_at__isnull=False),
+                name="notification_pending_idx",
+            ),
+            models.Index(
+                fields=["created_at"], name="notification_created_at_idx"
+            ),
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(is_buffered=True, digest__isnull=True),
+                name="notification_buffered_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return self.text.split("\n", 1)[0]
@@ -0,0 +1,217 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.utils.timezone import now
+
+from borrowings.models import Notification
+from borrowings.telegram_bot import send_telegram_notification
+
+EVENT_KINDS = ("borrowing_created", "borrowing_returned")
+MAX_DIGEST_BOOKS = 20
+
+
+def get_window_start(moment) -> datetime:
+    window = settings.NOTIFICATION_DIGEST_WINDOW
+    timestamp = moment.timestamp() // window * window
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+
+def is_window_busy() -> bool:
+    """
+    Whether the current window already has as many events
+    as are sent one by one.
+    """
+
+    threshold = settings.NOTIFICATION_DIGEST_THRESHOLD
+    num_events = Notification.objects.filter(
+        kind__in=EVENT_KINDS, created_at__gte=get_window_start(now())
+    )[:threshold].count()
+    return num_events >= threshold
+
+
+def notify(text, kind="message", payload=None) -> Notification:
+    """
+    Put the message to the outbox. Call it inside the transaction
+    making the change, so that the message is stored only on commit.
+
+    Borrowing events over the threshold of the current window
+    are buffered for the window digest instead of being sent.
+    """
+
+    is_buffered = kind in EVENT_KINDS and is_window_busy()
+
+    return Notification.objects.create(
+        kind=kind,
+        text=text,
+        payload=payload or {},
+        is_buffered=is_buffered,
+        next_attempt_at=None if is_buffered else now(),
+    )
+
+
+def get_digest_text(window_start, events) -> str:
+    books = defaultdict(
+        lambda: {"title": "", "borrowed": 0, "returned": 0, "change": 0}
+    )
+    total_fee = Decimal(0)
+
+    # Bulk operations put several items to one event
+    for event in events:
+        for item in event.payload["items"]:
+            book = books[item["book_id"]]
+            book["title"] = item["book"]
+            book["change"] += item["inventory_change"]
+            total_fee += Decimal(item.get("overdue_fee", 0))
+
+            if event.kind == "borrowing_created":
+                book["borrowed"] += 1
+            else:
+                book["returned"] += 1
+
+    window_end = window_start + timedelta(
+        seconds=settings.NOTIFICATION_DIGEST_WINDOW
+    )
+    time_zone = ZoneInfo(settings.TIME_ZONE)
+    lines = [
+        f"Borrowings digest "
+        f"{window_start.astimezone(time_zone):%H:%M:%S}-"
+        f"{window_end.astimezone(time_zone):%H:%M:%S}\n",
+        f"Borrowed: {sum(book['borrowed'] for book in books.values())}",
+        f"Returned: {sum(book['returned'] for book in books.values())}",
+        f"Money to pay overdue: ${total_fee}\n",
+    ]
+
+    busiest_books = sorted(
+        books.values(),
+        key=lambda book: book["borrowed"] + book["returned"],
+        reverse=True,
+    )
+    for book in busiest_books[:MAX_DIGEST_BOOKS]:
+        lines.append(
+            f"{book['title']}: borrowed {book['borrowed']}, "
+            f"returned {book['returned']}, copies {book['change']:+d}"
+        )
+
+    if len(books) > MAX_DIGEST_BOOKS:
+        lines.append(f"...and {len(books) - MAX_DIGEST_BOOKS} more books")
+
+    return "\n".join(lines)
+
+
+def build_digests() -> int:
+    """
+    Fold buffered events of closed windows into one digest
+    notification per window and return the number of digests.
+    """
+
+    with transaction.atomic():
+        events = list(
+            Notification.objects.select_for_update(skip_locked=True)
+            .filter(
+                is_buffered=True,
+                digest__isnull=True,
+                created_at__lt=get_window_start(now()),
+            )
+            .order_by("created_at", "id")
+        )
+
+        events_by_window = defaultdict(list)
+        for event in events:
+            events_by_window[get_window_start(event.created_at)].append(event)
+
+        for window_start, window_events in events_by_window.items():
+            digest = Notification.objects.create(
+                kind="digest",
+                text=get_digest_text(window_start, window_events),
+                payload={
+                    "window_start": window_start.isoformat(),
+                    "num_events": len(window_events),
+                },
+            )
+            for event in window_events:
+                event.digest = digest
+
+        Notification.objects.bulk_update(events, fields=["digest"])
+
+    return len(events_by_window)
+
+
+def get_retry_delay(attempts) -> timedelta:
+    delay = settings.NOTIFICATION_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.NOTIFICATION_MAX_RETRY_DELAY))
+
+
+def claim_notifications(batch_size) -> list:
+    """
+    Take a batch of due notifications oldest first and move their
+    `next_attempt_at` past the claim timeout in a short transaction,
+    so that other workers skip them while they are being sent.
+    Notifications of a worker which crashed are sent again
+    once the claim expires.
+    """
+
+    claimed_at = now()
+
+    with transaction.atomic():
+        notifications = list(
+            Notification.objects.select_for_update(skip_locked=True)
+            .filter(next_attempt_at__lte=claimed_at)
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+
+        for notification in notifications:
+            notification.attempts += 1
+            notification.next_attempt_at = claimed_at + timedelta(
+                seconds=settings.NOTIFICATION_CLAIM_TIMEOUT
+            )
+
+        Notification.objects.bulk_update(
+            notifications, fields=["attempts", "next_attempt_at"]
+        )
+
+    return notifications
+
+
+def deliver_notifications(session, batch_size=50) -> int:
+    """
+    Send a batch of due notifications and return the number
+    of notifications processed.
+
+    Messages are sent with no transaction open and the outcome
+    of every one is saved right after it is sent, failed ones
+    are rescheduled with exponential backoff.
+    """
+
+    notifications = claim_notifications(batch_size)
+
+    for notification in notifications:
+        try:
+            send_telegram_notification(
+                notification.text,
+                created_at=notification.created_at,
+                session=session,
+            )
+        except requests.RequestException as error:
+            notification.last_error = str(error)
+
+            if notification.attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+                notification.next_attempt_at = None
+            else:
+                notification.next_attempt_at = now() + get_retry_delay(
+                    notification.attempts
+                )
+        else:
+            notification.sent_at = now()
+            notification.next_attempt_at = None
+            notification.last_error = ""
+
+        notification.save(
+            update_fields=["sent_at", "next_attempt_at", "last_error"]
+        )
+
+    return len(notifications)
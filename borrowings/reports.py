@@ -0,0 +1,131 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import (
+    Count,
+    DateField,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    Sum,
+    Value,
+)
+from django.utils.timezone import now
+
+from books.cache import get_catalog_version
+from borrowings.expressions import DaysBetween
+from borrowings.models import Borrowing
+from borrowings.services import CENTS
+from library_api.settings import FEES_REPORT_CACHE_TIMEOUT
+
+
+def get_outstanding_fee_rows(date):
+    """
+    Overdue active borrowings on the `date` aggregated per user and book
+    in one grouped query. Fees are counted up to the `date`, as if every
+    overdue book was returned on that day.
+    """
+
+    days_overdue = DaysBetween(
+        Value(date, output_field=DateField()), "expected_return_date"
+    )
+
+    return (
+        Borrowing.objects.filter(is_active=True, expected_return_date__lt=date)
+        .order_by()
+        .values(
+            "user_id",
+            "user__email",
+            "book_id",
+            "book__title",
+            "book__author",
+        )
+        .annotate(
+            borrowings=Count("id"),
+            days_overdue=Sum(days_overdue),
+            money_to_pay=Sum(
+                ExpressionWrapper(
+                    days_overdue * F("book__daily_fee"),
+                    output_field=DecimalField(max_digits=10, decimal_places=2),
+                )
+            ),
+        )
+    )
+
+
+def _add_row(totals, row):
+    totals["borrowings"] += row["borrowings"]
+    totals["days_overdue"] += row["days_overdue"]
+    totals["money_to_pay"] += row["money_to_pay"]
+
+
+def _get_empty_totals(**fields) -> dict:
+    return {
+        **fields,
+        "borrowings": 0,
+        "days_overdue": 0,
+        "money_to_pay": Decimal("0.00"),
+    }
+
+
+def _sorted_by_fee(totals) -> list:
+    return sorted(
+        totals.values(), key=lambda item: item["money_to_pay"], reverse=True
+    )
+
+
+def build_outstanding_fees_report(date) -> dict:
+    """
+    Outstanding overdue fees on the `date` in total, per user and
+    per book. Users and books are sorted by the fee, highest first.
+    """
+
+    total = _get_empty_totals()
+    users = {}
+    books = {}
+
+    for row in get_outstanding_fee_rows(date):
+        # SQLite does not quantize computed decimals
+        row["money_to_pay"] = Decimal(row["money_to_pay"]).quantize(CENTS)
+
+        user = users.setdefault(
+            row["user_id"],
+            _get_empty_totals(id=row["user_id"], email=row["user__email"]),
+        )
+        book = books.setdefault(
+            row["book_id"],
+            _get_empty_totals(
+                id=row["book_id"],
+                title=row["book__title"],
+                author=row["book__author"],
+            ),
+        )
+
+        for totals in (total, user, book):
+            _add_row(totals, row)
+
+    return {
+        "date": date,
+        "total": total,
+        "users": _sorted_by_fee(users),
+        "books": _sorted_by_fee(books),
+    }
+
+
+def get_outstanding_fees_report(date=None) -> dict:
+    """
+    Cached outstanding overdue fees report, today's by default.
+
+    The cache key holds the date and the catalog version, which is
+    bumped by every borrowing, return and book change.
+    """
+
+    date = date or now().date()
+    key = f"borrowings:fees_report:{date.isoformat()}:{get_catalog_version()}"
+    report = cache.get(key)
+
+    if report is None:
+        report = build_outstanding_fees_report(date)
+        cache.set(key, report, FEES_REPORT_CACHE_TIMEOUT)
+
+    return report
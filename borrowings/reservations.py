@@ -0,0 +1,226 @@
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, OuterRef, Subquery, When
+from django.db.models.functions import Least
+from django.utils.timezone import now
+
+from books.cache import bump_catalog_version
+from books.models import Book
+from borrowings.models import RESERVATION_OPEN_STATUSES, Reservation
+from borrowings.notifications import notify
+from library_api.settings import RESERVATION_HOLD_PERIOD
+
+
+class BookAvailableError(Exception):
+    """The book has copies to borrow, there is nothing to wait for."""
+
+
+class AlreadyReservedError(Exception):
+    """The user already waits for the book or has a copy held."""
+
+
+class ReservationClosedError(Exception):
+    """The reservation is not waiting or held anymore."""
+
+
+def annotate_reservation_position(queryset):
+    """Annotate waiting reservations with their place in the book queue"""
+
+    num_ahead = (
+        Reservation.objects.filter(
+            book=OuterRef("book"), status="waiting", id__lte=OuterRef("id")
+        )
+        .order_by()
+        .values("book")
+        .annotate(position=Count("id"))
+        .values("position")
+    )
+    return queryset.annotate(
+        position=Case(When(status="waiting", then=Subquery(num_ahead)))
+    )
+
+
+def get_next_reservation(book_id):
+    """
+    First waiting reservation of the book, locked for the update.
+    Waits for a concurrent transaction holding the row lock instead
+    of skipping it, so that copies go strictly in queue order.
+    """
+
+    return (
+        Reservation.objects.select_for_update(of=("self",))
+        .select_related("book", "user")
+        .filter(book_id=book_id, status="waiting")
+        .order_by("id")
+        .first()
+    )
+
+
+def hold_reservation(reservation):
+    """Hold a copy for the reservation, call it inside a transaction."""
+
+    reservation.status = "held"
+    reservation.held_until = now() + timedelta(seconds=RESERVATION_HOLD_PERIOD)
+    reservation.save(update_fields=["status", "held_until"])
+
+    notify(
+        f"Book {reservation.book} is held for {reservation.user} "
+        f"until {reservation.held_until:%Y-%m-%d %H:%M} UTC.",
+        kind="reservation_held",
+        payload={
+            "reservation_id": reservation.id,
+            "user_id": reservation.user_id,
+            "book_id": reservation.book_id,
+        },
+    )
+
+
+def pass_copy_on(book_id):
+    """
+    Hold a free copy of the book for the next waiting reservation,
+    or put it back to inventory when nobody waits for the book.
+    Call it inside a transaction. Returns the held reservation.
+    """
+
+    reservation = get_next_reservation(book_id)
+
+    if reservation is not None:
+        hold_reservation(reservation)
+        return reservation
+
+    Book.objects.filter(id=book_id).update(
+        inventory=Least(F("inventory") + 1, F("total_amount"))
+    )
+    bump_catalog_version()
+    return None
+
+
+def take_held_copy(user, book_id) -> bool:
+    """
+    Mark the reservation holding a copy of the book for the user
+    as fulfilled, call it inside a transaction.
+    """
+
+    return bool(
+        Reservation.objects.filter(
+            user=user, book_id=book_id, status="held"
+        ).update(status="fulfilled")
+    )
+
+
+def fulfil_waiting_reservation(user, book_id) -> bool:
+    """
+    Take the user out of the queue of the book borrowed without
+    a held copy, call it inside a transaction. Otherwise a copy
+    would later be held for them a second time.
+    """
+
+    return bool(
+        Reservation.objects.filter(
+            user=user, book_id=book_id, status="waiting"
+        ).update(status="fulfilled")
+    )
+
+
+def reserve_book(user, book_id) -> Reservation:
+    """Put the user to the queue of a book with no copies left"""
+
+    with transaction.atomic():
+        book = Book.objects.get(id=book_id)
+
+        if book.inventory > 0:
+            raise BookAvailableError
+
+        try:
+            with transaction.atomic():
+                return Reservation.objects.create(user=user, book=book)
+        except IntegrityError:
+            raise AlreadyReservedError
+
+
+def cancel_reservation(reservation_id, user=None) -> Reservation:
+    """
+    Cancel open reservation, a held copy is passed on to the queue.
+    Only reservations of the `user` are cancelled when it is given.
+    """
+
+    reservations = Reservation.objects.select_for_update()
+    if user is not None:
+        reservations = reservations.filter(user=user)
+
+    with transaction.atomic():
+        reservation = reservations.get(id=reservation_id)
+
+        if reservation.status not in RESERVATION_OPEN_STATUSES:
+            raise ReservationClosedError
+
+        was_held = reservation.status == "held"
+        reservation.status = "cancelled"
+        reservation.save(update_fields=["status"])
+
+        if was_held:
+            pass_copy_on(reservation.book_id)
+
+    return reservation
+
+
+def expire_holds() -> int:
+    """
+    Expire holds not borrowed in time and pass their copies on.
+    Returns the number of expired holds.
+    """
+
+    num_expired = 0
+
+    while True:
+        with transaction.atomic():
+            reservation = (
+                Reservation.objects.select_for_update(skip_locked=True)
+                .filter(status="held", held_until__lt=now())
+                .order_by("held_until")
+                .first()
+            )
+
+            if reservation is None:
+                return num_expired
+
+            reservation.status = "expired"
+            reservation.save(update_fields=["status"])
+            pass_copy_on(reservation.book_id)
+
+        num_expired += 1
+
+
+def hold_available_copies() -> int:
+    """
+    Hold copies left in inventory for waiting reservations, e.g. after
+    the total amount of a book was increased. Returns the number of holds.
+    """
+
+    book_ids = list(
+        Book.objects.filter(inventory__gt=0, reservations__status="waiting")
+        .values_list("id", flat=True)
+        .distinct()
+    )
+    num_held = 0
+
+    for book_id in book_ids:
+        with transaction.atomic():
+            while Book.objects.filter(id=book_id, inventory__gt=0).update(
+                inventory=F("inventory") - 1
+            ):
+                reservation = get_next_reservation(book_id)
+
+                if reservation is None:
+                    Book.objects.filter(id=book_id).update(
+                        inventory=F("inventory") + 1
+                    )
+                    break
+
+                hold_reservation(reservation)
+                num_held += 1
+
+            bump_catalog_version()
+
+    return num_held
@@ -2,7 +2,10 @@ from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
-from borrowings.models import Borrowing
+from books.serializers import BookDetailSerializer
+from borrowings.models import Borrowing, Reservation
+from library_api.serializers import ValuesListSerializer
+from library_api.url_templates import get_url_template
 
 
 class BorrowingSerializer(serializers.ModelSerializer):
@@ -12,6 +15,49 @@ class BorrowingSerializer(serializers.ModelSerializer):
         fields = ("book", "user")
 
 
+BULK_MODE_CHOICES = [
+    ("all_or_nothing", "All or nothing"),
+    ("best_effort", "Best effort"),
+]
+BULK_MAX_ITEMS = 50
+
+
+class BulkBorrowSerializer(serializers.Serializer):
+    books = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=BULK_MAX_ITEMS,
+    )
+    mode = serializers.ChoiceField(
+        choices=BULK_MODE_CHOICES, default="all_or_nothing"
+    )
+
+
+class BulkReturnSerializer(serializers.Serializer):
+    borrowings = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=BULK_MAX_ITEMS,
+    )
+    mode = serializers.ChoiceField(
+        choices=BULK_MODE_CHOICES, default="all_or_nothing"
+    )
+
+
+class BulkResultSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=["ok", "failed", "rolled_back"])
+    borrowing = serializers.IntegerField(required=False)
+    money_to_pay = serializers.DecimalField(
+        max_digits=10, decimal_places=2, required=False
+    )
+    error = serializers.CharField(required=False)
+
+
+class BulkResponseSerializer(serializers.Serializer):
+    results = BulkResultSerializer(many=True)
+
+
 class BorrowingListSerializer(serializers.ModelSerializer):
     is_overdue = serializers.BooleanField()
     book = serializers.StringRelatedField()
@@ -55,3 +101,112 @@ class BorrowingDetailSerializer(serializers.ModelSerializer):
             "expected_return_date",
             "actual_return_date",
         )
+
+
+class DashboardBorrowingSerializer(serializers.ModelSerializer):
+    """Active borrowing annotated by `annotate_borrowing_running_fee`"""
+
+    book = BookDetailSerializer()
+    is_overdue = serializers.BooleanField()
+    days_overdue = serializers.IntegerField()
+    money_to_pay = serializers.DecimalField(max_digits=10, decimal_places=2)
+    detail_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Borrowing
+        fields = (
+            "id",
+            "book",
+            "borrow_date",
+            "expected_return_date",
+            "is_overdue",
+            "days_overdue",
+            "money_to_pay",
+            "detail_url",
+        )
+
+    @staticmethod
+    @extend_schema_field(OpenApiTypes.URI_TPL)
+    def get_detail_url(instance):
+        return instance.get_full_absolute_url()
+
+
+class BorrowingListValuesSerializer(ValuesListSerializer):
+    """Same output as BorrowingListSerializer, built from values_list()"""
+
+    values = (
+        "id",
+        "book__title",
+        "book__author",
+        "user__first_name",
+        "user__last_name",
+        "is_active",
+        "is_overdue",
+        "borrow_date",
+        "expected_return_date",
+        "actual_return_date",
+    )
+
+    def to_representation(self, row):
+        actual_return_date = row.actual_return_date
+
+        return {
+            "id": row.id,
+            # Book.__str__() and User.__str__()
+            "book": f"{row.book__title} ({row.book__author})",
+            "user": f"{row.user__first_name} {row.user__last_name}".strip(),
+            "is_active": row.is_active,
+            "is_overdue": bool(row.is_overdue),
+            "borrow_date": row.borrow_date.isoformat(),
+            "expected_return_date": row.expected_return_date.isoformat(),
+            "actual_return_date": (
+                actual_return_date.isoformat() if actual_return_date else None
+            ),
+            "detail_url": get_url_template(
+                "borrowings:borrowing-detail", "pk"
+            ).url(pk=row.id),
+        }
+
+
+class FeesTotalSerializer(serializers.Serializer):
+    borrowings = serializers.IntegerField()
+    days_overdue = serializers.IntegerField()
+    money_to_pay = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class UserFeesSerializer(FeesTotalSerializer):
+    id = serializers.IntegerField()
+    email = serializers.EmailField()
+
+
+class BookFeesSerializer(FeesTotalSerializer):
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    author = serializers.CharField()
+
+
+class FeesReportSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    total = FeesTotalSerializer()
+    users = UserFeesSerializer(many=True)
+    books = BookFeesSerializer(many=True)
+
+
+class ReservationSerializer(serializers.ModelSerializer):
+    book = serializers.StringRelatedField()
+    user = serializers.StringRelatedField()
+    position = serializers.IntegerField(
+        allow_null=True, help_text="Place in the queue of the book"
+    )
+
+    class Meta:
+        model = Reservation
+        fields = (
+            "id",
+            "book",
+            "user",
+            "status",
+            "position",
+            "created_at",
+            "held_until",
+        )
@@ -0,0 +1,393 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import (
+    DateField,
+    DecimalField,
+    Exists,
+    ExpressionWrapper,
+    F,
+    OuterRef,
+    Value,
+)
+from django.db.models.functions import Greatest, Least
+from django.utils.timezone import now
+
+from books.cache import bump_catalog_version
+from books.models import Book
+from borrowings.expressions import DaysBetween
+from borrowings.models import Borrowing, Reservation
+from borrowings.notifications import notify
+from borrowings.reservations import (
+    fulfil_waiting_reservation,
+    pass_copy_on,
+    take_held_copy,
+)
+from users.cache import bump_dashboard_version
+
+
+class BookNotAvailableError(Exception):
+    """There are no copies of the book left to borrow."""
+
+
+class BorrowingAlreadyReturnedError(Exception):
+    """The borrowing is not active anymore."""
+
+
+CENTS = Decimal("0.01")
+
+BULK_ERROR_MESSAGES = {
+    Book.DoesNotExist: "Book not found.",
+    BookNotAvailableError: "There are no copies of this book available "
+    "for borrowing.",
+    Borrowing.DoesNotExist: "Borrowing not found.",
+    BorrowingAlreadyReturnedError: "This borrowing is already returned.",
+}
+
+
+def annotate_borrowing_overdue_fee(queryset):
+    days_overdue = Greatest(
+        DaysBetween("actual_return_date", "expected_return_date"), Value(0)
+    )
+    queryset = queryset.annotate(
+        days_overdue=days_overdue,
+        money_to_pay=ExpressionWrapper(
+            days_overdue * F("book__daily_fee"),
+            output_field=DecimalField(max_digits=10, decimal_places=2),
+        ),
+    )
+    return queryset
+
+
+def annotate_borrowing_running_fee(queryset, date):
+    """
+    Annotate active borrowings with `days_overdue` and `money_to_pay`
+    as if they were returned on the `date`.
+    """
+
+    days_overdue = Greatest(
+        DaysBetween(
+            Value(date, output_field=DateField()), "expected_return_date"
+        ),
+        Value(0),
+    )
+    queryset = queryset.annotate(
+        days_overdue=days_overdue,
+        money_to_pay=ExpressionWrapper(
+            days_overdue * F("book__daily_fee"),
+            output_field=DecimalField(max_digits=10, decimal_places=2),
+        ),
+    )
+    return queryset
+
+
+def take_copy(user, book_id) -> Borrowing:
+    """
+    Create active borrowing, call it inside a transaction.
+
+    A copy held for the user's reservation is taken first. Otherwise
+    inventory is decremented with a single conditional UPDATE,
+    so concurrent requests can never take more copies than available,
+    and the user's waiting reservation of the book is fulfilled.
+
+    The borrowing tells in `inventory_change` whether the copy
+    was taken from inventory (-1) or from a hold (0).
+    """
+
+    if take_held_copy(user, book_id):
+        book = Book.objects.get(id=book_id)
+        borrowing = Borrowing.objects.create(user=user, book=book)
+        borrowing.inventory_change = 0
+        return borrowing
+
+    updated = Book.objects.filter(id=book_id, inventory__gt=0).update(
+        inventory=F("inventory") - 1
+    )
+
+    if not updated:
+        if not Book.objects.filter(id=book_id).exists():
+            raise Book.DoesNotExist
+        raise BookNotAvailableError
+
+    fulfil_waiting_reservation(user, book_id)
+    book = Book.objects.get(id=book_id)
+    borrowing = Borrowing.objects.create(user=user, book=book)
+    borrowing.inventory_change = -1
+    return borrowing
+
+
+def put_copy_back(borrowing_id, user=None) -> Borrowing:
+    """
+    Mark active borrowing as returned, call it inside a transaction.
+    Only borrowings of the `user` are returned when it is given.
+
+    The borrowing, the book and the active borrowings counter
+    of the user are changed with conditional UPDATEs
+    and the overdue fee is computed by the database when the borrowing
+    is fetched back, annotated with `days_overdue` and `money_to_pay`.
+    `inventory_change` is 0 when the copy is held for a reservation.
+    """
+
+    borrowings = Borrowing.objects.all()
+    if user is not None:
+        borrowings = borrowings.filter(user=user)
+
+    updated = borrowings.filter(id=borrowing_id, is_active=True).update(
+        is_active=False, actual_return_date=now().date()
+    )
+
+    if not updated:
+        if not borrowings.filter(id=borrowing_id).exists():
+            raise Borrowing.DoesNotExist
+        raise BorrowingAlreadyReturnedError
+
+    get_user_model().objects.filter(borrowings__id=borrowing_id).update(
+        num_active_borrowings=Greatest(F("num_active_borrowings") - 1, 0)
+    )
+
+    # The copy goes back to inventory only when nobody waits for it.
+    # Inventory never grows over total amount, even for borrowings
+    # created without taking a copy (e.g. in the admin site)
+    waiting_reservations = Reservation.objects.filter(
+        book=OuterRef("pk"), status="waiting"
+    )
+    updated = (
+        Book.objects.filter(borrowings__id=borrowing_id)
+        .filter(~Exists(waiting_reservations))
+        .update(inventory=Least(F("inventory") + 1, F("total_amount")))
+    )
+
+    inventory_change = 1
+
+    if not updated:
+        reservation = pass_copy_on(
+            Borrowing.objects.values_list("book_id", flat=True).get(
+                id=borrowing_id
+            )
+        )
+
+        if reservation is not None:
+            inventory_change = 0
+
+    borrowing = annotate_borrowing_overdue_fee(
+        Borrowing.objects.select_related("book")
+    ).get(id=borrowing_id)
+    bump_dashboard_version(borrowing.user_id)
+
+    borrowing.inventory_change = inventory_change
+
+    # SQLite does not quantize computed decimals
+    borrowing.money_to_pay = borrowing.money_to_pay.quantize(CENTS)
+    return borrowing
+
+
+def get_hold_note(borrowing) -> str:
+    if borrowing.inventory_change:
+        return ""
+
+    if borrowing.is_active:
+        return " (the copy was held for the user's reservation)"
+    return " (the copy is held for the next reservation)"
+
+
+def get_borrowed_item(borrowing) -> dict:
+    return {
+        "book_id": borrowing.book.id,
+        "book": str(borrowing.book),
+        "inventory_change": borrowing.inventory_change,
+    }
+
+
+def get_returned_item(borrowing) -> dict:
+    return {
+        "book_id": borrowing.book.id,
+        "book": str(borrowing.book),
+        "inventory_change": borrowing.inventory_change,
+        "overdue_fee": str(borrowing.money_to_pay),
+    }
+
+
+def borrow_book(user, book_id) -> Borrowing:
+    """
+    Create active borrowing of the book for the user.
+
+    The notification is put to the outbox in the same transaction.
+    """
+
+    with transaction.atomic():
+        borrowing = take_copy(user, book_id)
+        book = borrowing.book
+        bump_catalog_version()
+
+        notify(
+            f"New borrowing №{borrowing.id} created.\n\n"
+            f"User: {user}\n"
+            f"Book: {book}\n"
+            f"Copies left: {book.inventory}" + get_hold_note(borrowing),
+            kind="borrowing_created",
+            payload={"items": [get_borrowed_item(borrowing)]},
+        )
+
+    return borrowing
+
+
+def return_borrowing(borrowing_id) -> Borrowing:
+    """
+    Mark active borrowing as returned and put the copy back to inventory.
+
+    Runs a fixed number of queries in one transaction, together with
+    putting the notification to the outbox.
+    """
+
+    with transaction.atomic():
+        borrowing = put_copy_back(borrowing_id)
+        book = borrowing.book
+        bump_catalog_version()
+
+        notify(
+            f"Borrowing №{borrowing.id} is returned.\n\n"
+            f"Book: {book}\n"
+            f"Copies left: {book.inventory}"
+            + get_hold_note(borrowing)
+            + "\n\n"
+            f"Days overdue: {borrowing.days_overdue}\n"
+            f"Money to pay overdue: ${borrowing.money_to_pay}\n",
+            kind="borrowing_returned",
+            payload={"items": [get_returned_item(borrowing)]},
+        )
+
+    return borrowing
+
+
+def run_bulk_operation(operation, ids, best_effort):
+    """
+    Apply the operation to every id in one transaction and return
+    (results, borrowings) with a result for every id.
+
+    Every item runs in a savepoint, so a failed item does not break
+    the others. In all-or-nothing mode the transaction is rolled back
+    when any item fails, after all the items are tried.
+    """
+
+    results = []
+    borrowings = []
+
+    with transaction.atomic():
+        for item_id in ids:
+            try:
+                with transaction.atomic():
+                    borrowing = operation(item_id)
+            except tuple(BULK_ERROR_MESSAGES) as error:
+                results.append(
+                    {
+                        "id": item_id,
+                        "status": "failed",
+                        "error": BULK_ERROR_MESSAGES[type(error)],
+                    }
+                )
+            else:
+                results.append(
+                    {"id": item_id, "status": "ok", "borrowing": borrowing.id}
+                )
+                borrowings.append(borrowing)
+
+        is_failed = any(result["status"] == "failed" for result in results)
+
+        if is_failed and not best_effort:
+            transaction.set_rollback(True)
+
+            for result in results:
+                if result["status"] == "ok":
+                    result["status"] = "rolled_back"
+                    del result["borrowing"]
+
+            return results, []
+
+    return results, borrowings
+
+
+def borrow_books(user, book_ids, best_effort=False):
+    """
+    Borrow a copy of every book for the user in one transaction
+    with one combined notification. Returns (results, borrowings).
+    """
+
+    with transaction.atomic():
+        results, borrowings = run_bulk_operation(
+            lambda book_id: take_copy(user, book_id), book_ids, best_effort
+        )
+
+        if borrowings:
+            bump_catalog_version()
+
+            lines = [
+                f"{len(borrowings)} new borrowings created.\n",
+                f"User: {user}",
+            ]
+            lines += [
+                f"Book: {borrowing.book} "
+                f"(№{borrowing.id}, copies left: {borrowing.book.inventory})"
+                + get_hold_note(borrowing)
+                for borrowing in borrowings
+            ]
+            notify(
+                "\n".join(lines),
+                kind="borrowing_created",
+                payload={
+                    "items": [
+                        get_borrowed_item(borrowing)
+                        for borrowing in borrowings
+                    ]
+                },
+            )
+
+    return results, borrowings
+
+
+def return_borrowings(borrowing_ids, user=None, best_effort=False):
+    """
+    Return every borrowing in one transaction with one combined
+    notification. Only borrowings of the `user` are returned
+    when it is given. Returns (results, borrowings).
+    """
+
+    with transaction.atomic():
+        results, borrowings = run_bulk_operation(
+            lambda borrowing_id: put_copy_back(borrowing_id, user),
+            borrowing_ids,
+            best_effort,
+        )
+
+        fees = {
+            borrowing.id: borrowing.money_to_pay for borrowing in borrowings
+        }
+        for result in results:
+            if result["status"] == "ok":
+                result["money_to_pay"] = str(fees[result["borrowing"]])
+
+        if borrowings:
+            bump_catalog_version()
+
+            total_fee = sum(borrowing.money_to_pay for borrowing in borrowings)
+            lines = [f"{len(borrowings)} borrowings are returned.\n"]
+            lines += [
+                f"Book: {borrowing.book} "
+                f"(№{borrowing.id}, copies left: {borrowing.book.inventory}, "
+                f"days overdue: {borrowing.days_overdue})"
+                + get_hold_note(borrowing)
+                for borrowing in borrowings
+            ]
+            lines.append(f"\nMoney to pay overdue: ${total_fee}")
+            notify(
+                "\n".join(lines),
+                kind="borrowing_returned",
+                payload={
+                    "items": [
+                        get_returned_item(borrowing)
+                        for borrowing in borrowings
+                    ]
+                },
+            )
+
+    return results, borrowings
@@ -3,23 +3,36 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 
 import requests
+from django.conf import settings
 from dotenv import load_dotenv
 
-from library_api.settings import TIME_ZONE
-
 load_dotenv()
 
 BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN")
 CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")
-SEND_MESSAGE_URL = (
-    f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage?chat_id={CHAT_ID}"
-)
 
 
-def send_telegram_notification(text):
-    current_time = datetime.now(ZoneInfo(TIME_ZONE))
+def get_send_message_url():
+    return f"{settings.TELEGRAM_API_URL}/bot{BOT_TOKEN}/sendMessage"
+
+
+def send_telegram_notification(text, created_at=None, session=None):
+    """
+    Post the message to the chat, raising requests.RequestException
+    on a network error or an error response.
+
+    Pass a requests.Session to reuse keep-alive connections.
+    """
+
+    current_time = (created_at or datetime.now()).astimezone(
+        ZoneInfo(settings.TIME_ZONE)
+    )
     current_time = current_time.strftime(format="%Y-%m-%d, %H:%M")
     text = f"{current_time}\n\n{text}"
 
-    send_message_url = f"{SEND_MESSAGE_URL}&text={text}"
-    requests.post(send_message_url)
+    response = (session or requests).post(
+        get_send_message_url(),
+        data={"chat_id": CHAT_ID, "text": text},
+        timeout=settings.TELEGRAM_TIMEOUT,
+    )
+    response.raise_for_status()
@@ -1,9 +1,10 @@
 from rest_framework import routers
 
-from borrowings.views import BorrowingViewSet
+from borrowings.views import BorrowingViewSet, ReservationViewSet
 
 router = routers.DefaultRouter()
 router.register("borrowings", BorrowingViewSet, basename="borrowing")
+router.register("reservations", ReservationViewSet, basename="reservation")
 
 
 urlpatterns = router.urls
@@ -1,22 +1,50 @@
 from datetime import timedelta
 
 from django.db.models import Q
+from django.http import Http404
 from django.utils.timezone import now
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
-from borrowings.models import Borrowing
+from borrowings.models import (
+    RESERVATION_STATUS_CHOICES,
+    Borrowing,
+    BorrowingHistory,
+    Reservation,
+)
+from borrowings.reports import get_outstanding_fees_report
+from borrowings.reservations import (
+    annotate_reservation_position,
+    cancel_reservation,
+    ReservationClosedError,
+)
 from borrowings.serializers import (
     BorrowingSerializer,
     BorrowingListSerializer,
+    BorrowingListValuesSerializer,
     BorrowingDetailSerializer,
+    BulkResponseSerializer,
+    BulkReturnSerializer,
+    FeesReportSerializer,
+    ReservationSerializer,
+)
+from borrowings.services import (
+    return_borrowing,
+    return_borrowings,
+    BorrowingAlreadyReturnedError,
 )
-from borrowings.telegram_bot import send_telegram_notification
 from library_api.paginators import Pagination
 from library_api.permissions import IsUserAdminOrOwnInstancesAccessOnly
+from library_api.query_budget import query_budget
+from library_api.views import (
+    AsyncReadModelMixin,
+    ExportModelMixin,
+    ValuesListModelMixin,
+)
 
 
 def annotate_borrowing_is_overdue(queryset):
@@ -28,6 +56,9 @@ def annotate_borrowing_is_overdue(queryset):
 
 
 class BorrowingViewSet(
+    AsyncReadModelMixin,
+    ExportModelMixin,
+    ValuesListModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.CreateModelMixin,
@@ -35,22 +66,48 @@ class BorrowingViewSet(
 ):
     permission_classes = (IsUserAdminOrOwnInstancesAccessOnly,)
     pagination_class = Pagination
+    list_values_serializer_class = BorrowingListValuesSerializer
+    keyset_ordering = ("borrow_date", "id")
+    async_actions = ("list",)
+
+    def is_history_action(self):
+        """
+        Retrieving a single borrowing reads archived borrowings as well.
+        Lists and exports read them only with `?include_archived=true`,
+        so that the default pages keep to the indexed live table.
+        """
+
+        if self.action == "retrieve":
+            return True
+
+        return (
+            self.action in ("list", "export")
+            and self.request.query_params.get("include_archived") == "true"
+            and self.request.query_params.get("is_active") != "true"
+        )
 
     def get_queryset(self):
-        queryset = Borrowing.objects.all()
+        if self.is_history_action():
+            queryset = BorrowingHistory.objects.all()
+        else:
+            queryset = Borrowing.objects.all()
+
         queryset = annotate_borrowing_is_overdue(queryset)
 
         if not self.request.user.is_staff:
             queryset = queryset.filter(user=self.request.user)
 
         else:
-            if self.action == "list":
+            if self.action in ("list", "export"):
                 user_id = self.request.query_params.get("user_id", None)
 
                 if user_id:
                     queryset = queryset.filter(user_id=int(user_id))
 
-        if self.action == "list":
+        if self.action == "retrieve":
+            queryset = queryset.select_related("book", "user")
+
+        if self.action in ("list", "export"):
             is_active = self.request.query_params.get("is_active", None)
 
             if is_active:
@@ -84,35 +141,76 @@ class BorrowingViewSet(
 
         borrowing = self.get_object()
 
-        if borrowing.is_active:
-            borrowing.is_active = False
-            borrowing.actual_return_date = now().date()
-            borrowing.save()
-
-            # Trigger book.save() method to update book.inventory
-            book = borrowing.book
-            book.save()
-
-            serializer = BorrowingSerializer(borrowing, many=False)
-
-            days_overdue = max(0, (borrowing.actual_return_date - borrowing.expected_return_date).days)
-            money_to_pay = borrowing.book.daily_fee * days_overdue
-            text = (
-                f"Borrowing №{borrowing.id} is returned.\n\n"
-                f"Book: {borrowing.book}\n"
-                f"Copies left: {book.inventory}\n\n"
-                f"Days overdue: {days_overdue}\n"
-                f"Money to pay overdue: ${money_to_pay}\n"
+        try:
+            borrowing = return_borrowing(borrowing.id)
+        except BorrowingAlreadyReturnedError:
+            return Response(
+                {"error": "This borrowing is already returned."},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            send_telegram_notification(text)
 
-            return Response(serializer.data, status=status.HTTP_200_OK)
+        serializer = BorrowingSerializer(borrowing, many=False)
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        request=BulkReturnSerializer,
+        responses={
+            200: BulkResponseSerializer,
+            400: BulkResponseSerializer,
+        },
+    )
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="return",
+        permission_classes=(IsAuthenticated,),
+    )
+    def bulk_return(self, request):
+        """
+        Endpoint for returning a list of borrowings in one transaction
+        (only own borrowings for not staff users). In `all_or_nothing`
+        mode (default) nothing is returned if any borrowing can not be
+        returned, in `best_effort` mode all the active ones are returned.
+        Responds with 400 when no borrowing is returned.
+        """
+
+        serializer = BulkReturnSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results, borrowings = return_borrowings(
+            serializer.validated_data["borrowings"],
+            user=None if request.user.is_staff else request.user,
+            best_effort=serializer.validated_data["mode"] == "best_effort",
+        )
 
         return Response(
-            {"error": "This borrowing is already returned."},
-            status=status.HTTP_400_BAD_REQUEST,
+            {"results": results},
+            status=(
+                status.HTTP_200_OK
+                if borrowings
+                else status.HTTP_400_BAD_REQUEST
+            ),
         )
 
+    @extend_schema(responses=FeesReportSerializer)
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="fees-report",
+        permission_classes=(IsAdminUser,),
+    )
+    def fees_report(self, request):
+        """
+        Endpoint for the outstanding overdue fees of all active
+        borrowings on today's date, in total, per user and per book
+        (available to staff users only).
+        """
+
+        serializer = FeesReportSerializer(get_outstanding_fees_report())
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
     # Only for documentation purposes
     @extend_schema(
         parameters=[
@@ -126,7 +224,113 @@ class BorrowingViewSet(
                 type=OpenApiTypes.BOOL,
                 description="Filter by is_active (ex. ?is_active=true)",
             ),
+            OpenApiParameter(
+                name="include_archived",
+                type=OpenApiTypes.BOOL,
+                description="Include archived (long ago returned) borrowings, slower than listing the recent ones only (ex. ?include_archived=true)",
+            ),
         ]
     )
+    @query_budget(2)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
+
+    @query_budget(1)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+
+class ReservationViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    permission_classes = (IsUserAdminOrOwnInstancesAccessOnly,)
+    pagination_class = Pagination
+    serializer_class = ReservationSerializer
+    keyset_ordering = ("id",)
+
+    def get_queryset(self):
+        queryset = Reservation.objects.select_related("book", "user")
+        queryset = annotate_reservation_position(queryset)
+
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(user=self.request.user)
+
+        elif self.action == "list":
+            user_id = self.request.query_params.get("user_id", None)
+
+            if user_id:
+                queryset = queryset.filter(user_id=int(user_id))
+
+        if self.action == "list":
+            book_id = self.request.query_params.get("book_id", None)
+            reservation_status = self.request.query_params.get("status", None)
+
+            if book_id:
+                queryset = queryset.filter(book_id=int(book_id))
+
+            if reservation_status:
+                queryset = queryset.filter(status=reservation_status)
+
+        return queryset.order_by("id")
+
+    @extend_schema(request=None, responses=ReservationSerializer)
+    @action(
+        methods=["POST"],
+        detail=True,
+        url_path="cancel",
+        permission_classes=(IsAuthenticated,),
+    )
+    def cancel(self, request, pk=None):
+        """
+        Endpoint for cancelling waiting or held reservation
+        (only own reservations for not staff users).
+        A held copy is passed on to the next reservation in the queue.
+        """
+
+        try:
+            reservation = cancel_reservation(
+                int(pk), user=None if request.user.is_staff else request.user
+            )
+        except (Reservation.DoesNotExist, ValueError):
+            raise Http404
+        except ReservationClosedError:
+            return Response(
+                {"error": "This reservation is already closed."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        reservation.position = None
+        serializer = ReservationSerializer(reservation)
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    # Only for documentation purposes
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="user_id",
+                type=OpenApiTypes.INT,
+                description="Filter by user_id (available to staff users) (ex. ?user_id=1)",
+            ),
+            OpenApiParameter(
+                name="book_id",
+                type=OpenApiTypes.INT,
+                description="Filter by book_id (ex. ?book_id=1)",
+            ),
+            OpenApiParameter(
+                name="status",
+                type=OpenApiTypes.STR,
+                enum=[choice for choice, _ in RESERVATION_STATUS_CHOICES],
+                description="Filter by status (ex. ?status=waiting)",
+            ),
+        ]
+    )
+    @query_budget(2)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @query_budget(1)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
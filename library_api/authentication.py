@@ -0,0 +1,118 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+
+
+class LRUCache:
+    """
+    Thread-safe mapping keeping up to `maxsize` recently used entries,
+    each entry expires `ttl` seconds after it is set.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key, None)
+
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+token_cache = LRUCache(settings.TOKEN_AUTH_CACHE_SIZE)
+
+
+def get_shared_cache_key(key) -> str:
+    # Do not put raw tokens to a cache shared with other data
+    return "auth:token:" + hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def get_shared_cache():
+    alias = settings.TOKEN_AUTH_SHARED_CACHE
+    return caches[alias] if alias else None
+
+
+def invalidate_token(key):
+    """Drop the token from the local and the shared cache"""
+
+    token_cache.delete(key)
+
+    shared_cache = get_shared_cache()
+    if shared_cache is not None:
+        shared_cache.delete(get_shared_cache_key(key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement of TokenAuthentication, which does not query
+    the database for tokens seen in the last TOKEN_AUTH_CACHE_TTL seconds.
+
+    Tokens are kept in a per-process LRU cache, backed by the cache
+    named by TOKEN_AUTH_SHARED_CACHE when it is set. Cached tokens are
+    dropped when the token is deleted or its user is saved (see
+    `users.signals`). Other processes keep their local copy until the
+    TTL runs out, so changes made with QuerySet.update() or in another
+    process may take up to the TTL to apply.
+    """
+
+    def authenticate_credentials(self, key):
+        credentials = token_cache.get(key)
+        shared_cache = get_shared_cache()
+
+        if credentials is None and shared_cache is not None:
+            credentials = shared_cache.get(get_shared_cache_key(key))
+
+            if credentials is not None:
+                token_cache.set(
+                    key, credentials, settings.TOKEN_AUTH_CACHE_TTL
+                )
+
+        if credentials is None:
+            credentials = super().authenticate_credentials(key)
+            token_cache.set(key, credentials, settings.TOKEN_AUTH_CACHE_TTL)
+
+            if shared_cache is not None:
+                shared_cache.set(
+                    get_shared_cache_key(key),
+                    credentials,
+                    settings.TOKEN_AUTH_CACHE_TTL,
+                )
+
+        # Requests must not share (and change) the same instances
+        user, token = copy.copy(credentials[0]), copy.copy(credentials[1])
+        token.user = user
+        return user, token
@@ -0,0 +1,48 @@
+import csv
+import json
+from itertools import chain
+
+from django.http import StreamingHttpResponse
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_CONTENT_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+class Echo:
+    """File-like object returning written value instead of storing it"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    writer = csv.writer(Echo())
+    rows = iter(rows)
+    first_row = next(rows, None)
+
+    if first_row is None:
+        return
+
+    yield writer.writerow(first_row.keys())
+
+    for row in chain([first_row], rows):
+        yield writer.writerow(row.values())
+
+
+def iter_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + "\n"
+
+
+def get_export_response(rows, export_format, filename):
+    """Stream dicts as NDJSON lines or CSV rows (with header)"""
+
+    content = iter_csv(rows) if export_format == "csv" else iter_ndjson(rows)
+
+    response = StreamingHttpResponse(
+        content, content_type=EXPORT_CONTENT_TYPES[export_format]
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="{filename}.{export_format}"'
+    )
+    return response
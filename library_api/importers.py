@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+import os
+from dataclasses import dataclass, field
+
+IMPORT_FORMATS = ("csv", "jsonl")
+IMPORT_FORMAT_EXTENSIONS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+MAX_REPORTED_ERRORS = 100
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    rejected: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, line, detail):
+        self.rejected += 1
+
+        # Keep memory bounded on feeds with lots of broken rows
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "errors": detail})
+
+
+def get_import_format(filename):
+    extension = os.path.splitext(filename or "")[1].lower()
+    return IMPORT_FORMAT_EXTENSIONS.get(extension)
+
+
+def open_text(binary_stream):
+    """
+    Decode a binary stream as UTF-8, keeping bytes which are not
+    UTF-8 as lone surrogates, so that only their rows are rejected
+    by read_rows() instead of failing the import halfway.
+    """
+
+    return io.TextIOWrapper(
+        binary_stream,
+        encoding="utf-8",
+        errors="surrogateescape",
+        newline="",
+    )
+
+
+def is_undecodable(text) -> bool:
+    try:
+        text.encode("utf-8")
+    except UnicodeEncodeError:
+        return True
+
+    return False
+
+
+def read_rows(stream, file_format):
+    """
+    Lazily yield (line number, row) pairs from a text stream.
+    Row is None for a line which can not be parsed or decoded.
+    """
+
+    if file_format == "csv":
+        reader = csv.DictReader(stream)
+
+        for row in reader:
+            if any(
+                is_undecodable(text)
+                for item in row.items()
+                for text in item
+                if isinstance(text, str)
+            ):
+                yield reader.line_num, None
+                continue
+
+            # Empty cells fall back to model defaults
+            yield reader.line_num, {
+                key: value
+                for key, value in row.items()
+                if key is not None and value != ""
+            }
+
+    else:
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+
+            if is_undecodable(line):
+                yield line_number, None
+                continue
+
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+
+            yield line_number, row if isinstance(row, dict) else None
@@ -0,0 +1,64 @@
+from asgiref.sync import iscoroutinefunction
+from django.utils.deprecation import MiddlewareMixin
+
+from library_api.views import AsyncReadModelMixin
+
+
+def get_async_action(callback, request):
+    """
+    Name of the async action of the viewset routed by `callback`
+    for the request, None when the request goes to a sync view.
+    """
+
+    view_class = getattr(callback, "cls", None)
+    actions = getattr(callback, "actions", None)
+
+    if (
+        request.method != "GET"
+        or not actions
+        or not issubclass(view_class, AsyncReadModelMixin)
+    ):
+        return None
+
+    action = actions.get("get")
+    return action if action in view_class.async_actions else None
+
+
+class AsyncReadMiddleware(MiddlewareMixin):
+    """
+    Under ASGI, serve GET requests of AsyncReadModelMixin viewsets
+    with their native async actions, instead of running the sync
+    viewset in a thread. Does nothing under WSGI.
+
+    Has to be the last middleware, so that it runs in the mode
+    of the handler.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+
+        # The view middleware is only installed in async mode
+        if iscoroutinefunction(get_response):
+            self.process_view = self.aprocess_view
+
+    async def aprocess_view(self, request, callback, args, kwargs):
+        action = get_async_action(callback, request)
+
+        if action is None:
+            return None
+
+        # What ViewSetMixin.as_view() does on every request
+        view = callback.cls(**callback.initkwargs)
+        view.action_map = callback.actions
+
+        for method, method_action in callback.actions.items():
+            setattr(view, method, getattr(view, method_action))
+
+        view.request = request
+        view.args = args
+        view.kwargs = kwargs
+
+        return await view.adispatch(request, *args, **kwargs)
@@ -1,7 +1,532 @@
-from rest_framework.pagination import PageNumberPagination
+import hashlib
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from contextlib import contextmanager
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.core.paginator import (
+    EmptyPage,
+    InvalidPage,
+    Page,
+    PageNotAnInteger,
+    Paginator as DjangoPaginator,
+)
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from library_api.settings import PAGINATION_COUNT_CACHE_TIMEOUT
+
+COUNT_TYPES = ("exact", "none", "estimated", "cached")
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a unique ordering of non-null, indexed fields.
+
+    The next page is fetched with `WHERE (ordering) > (last row values)`
+    instead of OFFSET and no COUNT is made, so any page costs the same.
+    The ordering is taken from `keyset_ordering` attribute of the view.
+    """
+
+    page_size = 25
+    max_page_size = 100
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    ordering = ("id",)
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        return self.get_page_results(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() fetching the page with the async ORM"""
+
+        queryset = self.get_page_queryset(queryset, request, view)
+        return self.get_page_results([row async for row in queryset])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = tuple(getattr(view, "keyset_ordering", self.ordering))
+        self.cursor = self.decode_cursor(request)
+
+        if self.cursor is not None:
+            self.cursor["position"] = self.parse_position(
+                queryset.model, self.cursor["position"]
+            )
+
+        self.is_reversed = self.cursor is not None and self.cursor["reverse"]
+        ordering = self.ordering
+
+        if self.is_reversed:
+            ordering = tuple(
+                field[1:] if field.startswith("-") else f"-{field}"
+                for field in ordering
+            )
+
+        queryset = queryset.order_by(*ordering)
+
+        if self.cursor is not None:
+            queryset = queryset.filter(
+                self.get_keyset_filter(ordering, self.cursor["position"])
+            )
+
+        return queryset[: self.page_size + 1]
+
+    def get_page_results(self, results):
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+
+        if self.is_reversed:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = (
+                has_more,
+                self.cursor is not None,
+            )
+
+        if results:
+            self.first_position = self.get_position(results[0])
+            self.last_position = self.get_position(results[-1])
+        elif self.cursor is not None:
+            self.first_position = self.last_position = self.cursor["position"]
+
+        return results
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        if page_size <= 0:
+            return self.page_size
+
+        return min(page_size, self.max_page_size)
+
+    @staticmethod
+    def get_keyset_filter(ordering, position):
+        """
+        Build `(a, b) > (x, y)` as `a >= x AND (a > x OR (a = x AND b > y))`,
+        the leading range condition lets the index serve the query.
+        """
+
+        def field_lookup(field, strict):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            return f"{name}__{lookup}" if strict else f"{name}__{lookup}e"
+
+        keyset_filter = Q()
+
+        for index, field in enumerate(ordering):
+            condition = Q(
+                **{field_lookup(field, strict=True): position[index]}
+            )
+
+            for previous_field, value in zip(ordering[:index], position):
+                condition &= Q(**{previous_field.lstrip("-"): value})
+
+            keyset_filter |= condition
+
+        return (
+            Q(**{field_lookup(ordering[0], strict=False): position[0]})
+            & keyset_filter
+        )
+
+    def get_position(self, instance):
+        return [
+            getattr(instance, field.lstrip("-")) for field in self.ordering
+        ]
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+
+        if not encoded:
+            return None
+
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            position, is_reversed = cursor["p"], bool(cursor["r"])
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or len(position) != len(
+            self.ordering
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+        return {"position": position, "reverse": is_reversed}
+
+    def parse_position(self, model, position):
+        """
+        Convert cursor values to the types of the ordering fields,
+        so that a tampered cursor does not reach the database.
+        """
+
+        try:
+            position = [
+                model._meta.get_field(field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if None in position:
+            raise NotFound(self.invalid_cursor_message)
+
+        return position
+
+    def encode_cursor(self, position, is_reversed):
+        cursor = json.dumps(
+            {"p": position, "r": int(is_reversed)}, cls=DjangoJSONEncoder
+        )
+        encoded = urlsafe_b64encode(cursor.encode("utf-8")).decode("ascii")
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.last_position, is_reversed=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.first_position, is_reversed=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "results": schema,
+            },
+        }
+
+
+class UncountedPage(Page):
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class UncountedPaginator(DjangoPaginator):
+    """
+    Paginator which never runs COUNT: a page fetches one extra row
+    to find out whether the next page exists.
+
+    `count` is only reported, it may be an estimate or a cached value
+    (or None when unknown).
+    """
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.__dict__["count"] = count
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        return self.build_page(list(self.get_rows(number)), number)
+
+    async def apage(self, number):
+        number = self.validate_number(number)
+        rows = [row async for row in self.get_rows(number)]
+        return self.build_page(rows, number)
+
+    def get_rows(self, number):
+        bottom = (number - 1) * self.per_page
+        return self.object_list[bottom : bottom + self.per_page + 1]
+
+    def build_page(self, rows, number):
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages["no_results"])
+
+        return UncountedPage(
+            rows[: self.per_page],
+            number,
+            self,
+            has_next=len(rows) > self.per_page,
+        )
+
+
+def get_estimated_count(queryset):
+    """
+    Number of rows expected by the query planner, None when
+    the database does not provide an estimate.
+    """
+
+    if connections[queryset.db].vendor != "postgresql":
+        return None
+
+    plan = json.loads(queryset.explain(format="json"))
+    return plan[0]["Plan"]["Plan Rows"]
+
+
+def get_count_cache_key(queryset) -> str:
+    sql = str(queryset.order_by().query).encode("utf-8")
+    return f"pagination:count:{hashlib.sha1(sql).hexdigest()}"
+
+
+def get_cached_count(queryset):
+    key = get_count_cache_key(queryset)
+    count = cache.get(key)
+
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout=PAGINATION_COUNT_CACHE_TIMEOUT)
+
+    return count
+
+
+async def aget_cached_count(queryset):
+    key = get_count_cache_key(queryset)
+    count = await cache.aget(key)
+
+    if count is None:
+        count = await queryset.acount()
+        await cache.aset(key, count, timeout=PAGINATION_COUNT_CACHE_TIMEOUT)
+
+    return count
 
 
 class Pagination(PageNumberPagination):
+    """
+    Page number pagination, switched to keyset pagination
+    with `?pagination=cursor` (or when a `?cursor=` is passed).
+
+    `?count=` selects how the total is counted: `exact` (default),
+    `none` (no count at all), `estimated` (planner estimate)
+    or `cached` (exact count cached for a while). Pages are fetched
+    without COUNT in all modes but `exact`, and the response tells
+    which kind of count was returned in `count_type`.
+    """
+
     page_size = 25
     max_page_size = 100
     page_size_query_param = "page_size"
+    mode_query_param = "pagination"
+    count_query_param = "count"
+    keyset_pagination_class = KeysetPagination
+
+    keyset_paginator = None
+    count_type = "exact"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_paginator = None
+
+        if self.is_keyset_mode(request):
+            self.keyset_paginator = self.keyset_pagination_class()
+            return self.keyset_paginator.paginate_queryset(
+                queryset, request, view
+            )
+
+        self.count_type = self.get_count_type(request)
+
+        if self.count_type == "exact":
+            return super().paginate_queryset(queryset, request, view)
+
+        return self.paginate_queryset_uncounted(queryset, request)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() counting and fetching with the async ORM"""
+
+        self.keyset_paginator = None
+
+        if self.is_keyset_mode(request):
+            self.keyset_paginator = self.keyset_pagination_class()
+            return await self.keyset_paginator.apaginate_queryset(
+                queryset, request, view
+            )
+
+        self.request = request
+        self.count_type = self.get_count_type(request)
+        page_size = self.get_page_size(request)
+
+        if self.count_type == "exact":
+            paginator = self.django_paginator_class(queryset, page_size)
+            paginator.__dict__["count"] = await queryset.acount()
+            page_number = self.get_page_number(request, paginator)
+
+            with self.raise_not_found(page_number):
+                # With the count known the page only slices the queryset
+                self.page = paginator.page(page_number)
+
+            self.page.object_list = [
+                row async for row in self.page.object_list
+            ]
+
+        else:
+            paginator = UncountedPaginator(
+                queryset,
+                page_size,
+                count=await self.aget_uncounted_count(queryset),
+            )
+            page_number = request.query_params.get(self.page_query_param) or 1
+
+            with self.raise_not_found(page_number):
+                self.page = await paginator.apage(page_number)
+
+        return list(self.page)
+
+    def get_count_type(self, request):
+        count_type = request.query_params.get(self.count_query_param, "exact")
+        return count_type if count_type in COUNT_TYPES else "exact"
+
+    @contextmanager
+    def raise_not_found(self, page_number):
+        try:
+            yield
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg)
+
+    def get_uncounted_count(self, queryset):
+        try:
+            if self.count_type == "estimated":
+                count = get_estimated_count(queryset)
+
+                if count is not None:
+                    return count
+
+                # Fall back to the cached count on databases
+                # without estimates
+                self.count_type = "cached"
+
+            if self.count_type == "cached":
+                return get_cached_count(queryset)
+
+        except EmptyResultSet:
+            # Querysets matching nothing (e.g. `.none()`) have no SQL
+            return 0
+
+        return None
+
+    async def aget_uncounted_count(self, queryset):
+        try:
+            if self.count_type == "estimated":
+                # There is no async EXPLAIN
+                count = await sync_to_async(get_estimated_count)(queryset)
+
+                if count is not None:
+                    return count
+
+                self.count_type = "cached"
+
+            if self.count_type == "cached":
+                return await aget_cached_count(queryset)
+
+        except EmptyResultSet:
+            return 0
+
+        return None
+
+    def paginate_queryset_uncounted(self, queryset, request):
+        self.request = request
+        paginator = UncountedPaginator(
+            queryset,
+            self.get_page_size(request),
+            count=self.get_uncounted_count(queryset),
+        )
+        page_number = request.query_params.get(self.page_query_param) or 1
+
+        with self.raise_not_found(page_number):
+            self.page = paginator.page(page_number)
+
+        return list(self.page)
+
+    def is_keyset_mode(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == "cursor"
+            or self.keyset_pagination_class.cursor_query_param
+            in request.query_params
+        )
+
+    def get_paginated_response(self, data):
+        if self.keyset_paginator is not None:
+            return self.keyset_paginator.get_paginated_response(data)
+
+        return Response(
+            {
+                "count": self.page.paginator.count,
+                "count_type": self.count_type,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count"]["nullable"] = True
+        response_schema["properties"]["count_type"] = {
+            "type": "string",
+            "enum": list(COUNT_TYPES),
+        }
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Use `cursor` for keyset pagination, "
+                "which costs the same at any depth but returns no count.",
+                "schema": {"type": "string", "enum": ["page", "cursor"]},
+            },
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "How the total is counted: `none` and "
+                "`estimated` skip the exact COUNT query, `cached` reuses "
+                "a recent count.",
+                "schema": {"type": "string", "enum": list(COUNT_TYPES)},
+            },
+            {
+                "name": self.keyset_pagination_class.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+        ]
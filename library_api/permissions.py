@@ -61,7 +61,8 @@ class IsUserAdminOrOwnInstancesAccessOnly(BasePermission):
         )
 
     def has_object_permission(self, request, view, obj):
+        # Compare ids to avoid fetching the related user
         return bool(
-            obj.user == request.user
+            obj.user_id == request.user.id
             or (request.user and request.user.is_staff)
         )
@@ -0,0 +1,56 @@
+import logging
+from contextlib import contextmanager
+from functools import wraps
+
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def count_queries():
+    """Yield a dict whose "count" key counts queries run inside the block"""
+
+    counter = {"count": 0}
+
+    def execute_wrapper(execute, sql, params, many, context):
+        counter["count"] += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(execute_wrapper):
+        yield counter
+
+
+def query_budget(max_queries):
+    """
+    Declare the maximum number of SQL queries of a viewset action,
+    whatever the page size or the number of related objects.
+
+    The number of queries is set to `response.query_count`, an action
+    going over the budget is logged. Tests check the budgets with
+    `tests.test_query_budgets.QueryBudgetTestCase`.
+    """
+
+    def decorator(view_action):
+        @wraps(view_action)
+        def wrapper(self, request, *args, **kwargs):
+            with count_queries() as counter:
+                response = view_action(self, request, *args, **kwargs)
+
+            response.query_count = counter["count"]
+
+            if counter["count"] > max_queries:
+                logger.warning(
+                    "%s.%s ran %d queries over the budget of %d",
+                    type(self).__name__,
+                    view_action.__name__,
+                    counter["count"],
+                    max_queries,
+                )
+
+            return response
+
+        wrapper.query_budget = max_queries
+        return wrapper
+
+    return decorator
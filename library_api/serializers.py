@@ -0,0 +1,28 @@
+class ValuesListSerializer:
+    """
+    Read-only list serializer building rows straight from values_list()
+    tuples, without model instances and DRF field machinery.
+
+    Subclasses declare fetched `values` and `to_representation()`,
+    which has to produce the same output as the matching ModelSerializer.
+    """
+
+    values = ()
+
+    def __init__(self, rows, many=True):
+        self.rows = rows
+
+    @classmethod
+    def get_queryset(cls, queryset):
+        return queryset.values_list(*cls.values, named=True)
+
+    def to_representation(self, row) -> dict:
+        raise NotImplementedError
+
+    def iter_data(self):
+        for row in self.rows:
+            yield self.to_representation(row)
+
+    @property
+    def data(self):
+        return list(self.iter_data())
@@ -36,6 +36,60 @@ INTERNAL_IPS = ["127.0.0.1"]
 
 BASE_URL = os.environ.get("BASE_URL")
 
+# Book list and detail responses are cached in the default cache
+# until the catalog changes (see CACHES)
+BOOK_RESPONSE_CACHE_TIMEOUT = 60 * 60
+
+# Seconds a list count is reused by `?count=cached` pagination
+PAGINATION_COUNT_CACHE_TIMEOUT = 60
+
+# The outstanding fees report is cached per day and catalog version,
+# so that borrowings, returns and fee changes are reflected at once
+FEES_REPORT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# User dashboards are cached per user until the user's next borrow or
+# return, changes of borrowed books show up after the timeout
+DASHBOARD_CACHE_TIMEOUT = 60 * 60
+
+# Borrowings returned more than a year ago are moved to the archive
+# by `python manage.py archive_borrowings`
+BORROWING_ARCHIVE_AFTER_DAYS = 365
+
+# Seconds a returned copy is held for the next reservation of the book
+RESERVATION_HOLD_PERIOD = 60 * 60 * 48
+
+# Token authentication keeps tokens with their users in a per-process
+# LRU cache for TOKEN_AUTH_CACHE_TTL seconds. Set TOKEN_AUTH_SHARED_CACHE
+# to a cache alias (e.g. "default") to share them between workers too.
+TOKEN_AUTH_CACHE_SIZE = 10000
+TOKEN_AUTH_CACHE_TTL = 60
+TOKEN_AUTH_SHARED_CACHE = None
+
+# Throttle counters are shared by the workers of a host through
+# a SQLite database file, it has to be on a local (not network) disk.
+# The test runner keeps them in memory, so that runs do not share them.
+THROTTLE_DATABASE = os.environ.get(
+    "THROTTLE_DATABASE", str(BASE_DIR / "throttle.sqlite3")
+)
+
+# Notifications are written to the outbox and delivered
+# by `python manage.py run_notifier`
+TELEGRAM_API_URL = os.environ.get(
+    "TELEGRAM_API_URL", "https://api.telegram.org"
+)
+TELEGRAM_TIMEOUT = 10
+# Failed deliveries are retried after 30s, 60s, 120s... up to an hour
+NOTIFICATION_RETRY_DELAY = 30
+NOTIFICATION_MAX_RETRY_DELAY = 60 * 60
+NOTIFICATION_MAX_ATTEMPTS = 10
+# Notifications taken by a worker are not sent by other workers
+# for this many seconds, longer than a batch takes to be sent
+NOTIFICATION_CLAIM_TIMEOUT = 15 * 60
+# Only the first borrow/return events of each window (in seconds)
+# are sent one by one, the rest are sent as one digest per window
+NOTIFICATION_DIGEST_WINDOW = 60
+NOTIFICATION_DIGEST_THRESHOLD = 10
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -63,6 +117,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # Has to be the last one
+    "library_api.middleware.AsyncReadMiddleware",
 ]
 
 ROOT_URLCONF = "library_api.urls"
@@ -110,6 +166,25 @@ else:
     }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/ref/settings/#caches
+
+# The cache has to be shared by the web workers and the commands
+# changing books (`process_reservations`, `import_books`...), so that
+# they invalidate cached responses of each other. Without REDIS_URL
+# every process has its own local memory cache.
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ.get("REDIS_URL"),
+        }
+    }
+
+
+TEST_RUNNER = "library_api.test_runner.TestRunner"
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -155,12 +230,12 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "library_api.authentication.CachedTokenAuthentication",
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "library_api.throttling.AnonRateThrottle",
+        "library_api.throttling.UserRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {"anon": "100/day", "user": "1000/day"},
 }
@@ -0,0 +1,221 @@
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from rest_framework import throttling
+
+logger = logging.getLogger(__name__)
+
+# Share of checks which also delete expired counters
+PRUNE_PROBABILITY = 0.001
+
+
+class SlidingWindowStore:
+    """
+    Sliding window request counters in a SQLite database, shared by
+    all the processes of a host which use the same database file.
+
+    Every key takes one row with the counts of the current and the
+    previous fixed window. The previous count is weighted by the part
+    of the previous window which still overlaps the sliding window.
+
+    The database is THROTTLE_DATABASE setting unless `path` is given.
+    """
+
+    def __init__(self, path=None):
+        self.configured_path = path
+        self.lock = threading.Lock()
+        self.connection = None
+        self.connection_path = None
+        self.pid = None
+
+    @property
+    def path(self):
+        return self.configured_path or settings.THROTTLE_DATABASE
+
+    def get_connection(self):
+        path = self.path
+
+        if self.connection is not None and self.connection_path != path:
+            self.connection.close()
+            self.connection = None
+
+        # SQLite connections must not be shared with forked processes
+        if self.connection is None or self.pid != os.getpid():
+            self.connection = sqlite3.connect(
+                path,
+                timeout=5,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS throttle_counter ("
+                "key TEXT PRIMARY KEY, "
+                "window INTEGER NOT NULL, "
+                "count INTEGER NOT NULL, "
+                "previous_count INTEGER NOT NULL, "
+                "expires_at REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS throttle_counter_expires_idx "
+                "ON throttle_counter (expires_at)"
+            )
+            self.connection_path = path
+            self.pid = os.getpid()
+
+        return self.connection
+
+    def hit(self, key, limit, duration, now):
+        """
+        Count the request if the sliding window has less than `limit`
+        requests. Return (allowed, count, previous count, window start).
+        """
+
+        window = int(now // duration)
+        window_start = window * duration
+
+        with self.lock:
+            connection = self.get_connection()
+            # Takes the write lock at once, so that concurrent
+            # processes can not both read the same count
+            connection.execute("BEGIN IMMEDIATE")
+
+            try:
+                row = connection.execute(
+                    "SELECT window, count, previous_count "
+                    "FROM throttle_counter WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                count, previous_count = get_window_counts(row, window)
+
+                weight = 1 - (now - window_start) / duration
+                allowed = previous_count * weight + count < limit
+
+                if allowed:
+                    count += 1
+                    connection.execute(
+                        "INSERT OR REPLACE INTO throttle_counter "
+                        "(key, window, count, previous_count, expires_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (
+                            key,
+                            window,
+                            count,
+                            previous_count,
+                            window_start + 2 * duration,
+                        ),
+                    )
+
+                if random.random() < PRUNE_PROBABILITY:
+                    connection.execute(
+                        "DELETE FROM throttle_counter WHERE expires_at < ?",
+                        (now,),
+                    )
+
+                connection.execute("COMMIT")
+
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+        return allowed, count, previous_count, window_start
+
+    def clear(self):
+        with self.lock:
+            self.get_connection().execute("DELETE FROM throttle_counter")
+
+
+def get_window_counts(row, window):
+    """Counts of the current and the previous window"""
+
+    if row is None:
+        return 0, 0
+
+    row_window, count, previous_count = row
+
+    if row_window == window:
+        return count, previous_count
+
+    if row_window == window - 1:
+        return 0, count
+
+    return 0, 0
+
+
+throttle_store = SlidingWindowStore()
+
+
+class SlidingWindowThrottleMixin:
+    """
+    Replaces the timestamp history of SimpleRateThrottle, kept in the
+    per-process default cache, with THROTTLE_DATABASE sliding window
+    counters. So the rate applies to all the workers of a host and
+    each check reads and writes one fixed size row.
+
+    Requests are allowed when the counters can not be reached
+    (e.g. the database stays locked), rather than failing the API.
+    """
+
+    store = throttle_store
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+
+        try:
+            allowed, self.count, self.previous_count, self.window_start = (
+                self.store.hit(
+                    self.key, self.num_requests, self.duration, self.now
+                )
+            )
+        except sqlite3.Error:
+            logger.exception("Throttle counters are not available")
+            return True
+
+        if allowed:
+            return self.throttle_success()
+        return self.throttle_failure()
+
+    def throttle_success(self):
+        return True
+
+    def wait(self):
+        """Seconds until the sliding window has room for a request"""
+
+        elapsed = self.now - self.window_start
+
+        if self.count < self.num_requests:
+            # The previous window has to slide out far enough
+            free_share = (self.num_requests - self.count) / max(
+                self.previous_count, 1
+            )
+            return max(self.duration * (1 - free_share) - elapsed, 0)
+
+        # The current window becomes the previous one first
+        free_share = self.num_requests / self.count
+        return self.duration - elapsed + self.duration * (1 - free_share)
+
+
+class AnonRateThrottle(
+    SlidingWindowThrottleMixin, throttling.AnonRateThrottle
+):
+    pass
+
+
+class UserRateThrottle(
+    SlidingWindowThrottleMixin, throttling.UserRateThrottle
+):
+    pass
@@ -0,0 +1,37 @@
+from functools import lru_cache
+
+from django.urls import reverse
+
+from library_api.settings import BASE_URL
+
+
+class UrlTemplate:
+    """
+    URL of a route reversed once, with url kwargs formatted into it.
+
+    Kwarg values are inserted as is, so they should already be URL safe
+    (e.g. ids).
+    """
+
+    def __init__(self, viewname, kwarg_names=()):
+        placeholders = {name: f"__{name}__" for name in kwarg_names}
+        path = reverse(viewname, kwargs=placeholders or None)
+        path = path.replace("{", "{{").replace("}", "}}")
+
+        for name, placeholder in placeholders.items():
+            path = path.replace(placeholder, f"{{{name}}}")
+
+        self.path_template = path
+        self.url_template = f"{BASE_URL}{path}"
+
+    def path(self, **kwargs) -> str:
+        return self.path_template.format(**kwargs)
+
+    def url(self, **kwargs) -> str:
+        """Full URL prefixed with BASE_URL."""
+        return self.url_template.format(**kwargs)
+
+
+@lru_cache(maxsize=None)
+def get_url_template(viewname, *kwarg_names) -> UrlTemplate:
+    return UrlTemplate(viewname, kwarg_names)
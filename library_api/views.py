@@ -1,20 +1,207 @@
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404
 from django.utils.http import urlencode
-from drf_spectacular.utils import extend_schema, inline_serializer
-from rest_framework import serializers
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import (
+    extend_schema,
+    inline_serializer,
+    OpenApiParameter,
+)
+from rest_framework import serializers, status
+from rest_framework.decorators import action
 from rest_framework.generics import GenericAPIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
 
+from library_api.exports import (
+    EXPORT_CONTENT_TYPES,
+    EXPORT_FORMATS,
+    get_export_response,
+)
+from library_api.url_templates import get_url_template
+
+
+def reverse_with_params(
+    viewname, params=None, kwargs=None, request=None, format=None
+):
+    if format is None:
+        kwargs = kwargs or {}
+        url = get_url_template(viewname, *kwargs).path(**kwargs)
+        if request is not None:
+            url = request.build_absolute_uri(url)
+    else:
+        url = reverse(viewname, kwargs=kwargs, request=request, format=format)
 
-def reverse_with_params(*args, **kwargs):
-    params = kwargs.pop("params", {})
-    url = reverse(*args, **kwargs)
     if params:
         url += "?" + urlencode(params)
     return url
 
 
+class ValuesListModelMixin:
+    """
+    List the queryset through `list_values_serializer_class`,
+    fetching tuples with values_list() instead of model instances.
+    """
+
+    list_values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.list_values_serializer_class
+        queryset = serializer_class.get_queryset(
+            self.filter_queryset(self.get_queryset())
+        )
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = serializer_class(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = serializer_class(queryset, many=True)
+        return Response(serializer.data)
+
+
+class AsyncReadModelMixin:
+    """
+    Native async versions of the `async_actions` (`list`, `retrieve`),
+    served to GET requests under ASGI instead of the sync actions
+    by `library_api.middleware.AsyncReadMiddleware`.
+
+    Authentication, permissions and throttles run in one sync_to_async
+    call, the queries go through the async ORM. Responses are the same
+    as the ones of the sync actions.
+    """
+
+    async_actions = ("list", "retrieve")
+
+    async def adispatch(self, request, *args, **kwargs):
+        """`APIView.dispatch()` of an async action"""
+
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = getattr(self, f"a{self.action}")
+            response = await handler(request, *args, **kwargs)
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
+
+    async def aget_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+
+        # Same lookup errors as in `get_object_or_404()`
+        try:
+            instance = await queryset.aget(**filter_kwargs)
+        except (
+            queryset.model.DoesNotExist,
+            TypeError,
+            ValueError,
+            ValidationError,
+        ):
+            raise Http404
+
+        self.check_object_permissions(self.request, instance)
+        return instance
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+
+        return await self.paginator.apaginate_queryset(
+            queryset, self.request, view=self
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        serializer_class = self.list_values_serializer_class
+        queryset = serializer_class.get_queryset(
+            self.filter_queryset(self.get_queryset())
+        )
+
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = serializer_class(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = serializer_class(
+            [row async for row in queryset], many=True
+        )
+        return Response(serializer.data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
+
+class ExportModelMixin:
+    """
+    Stream the whole filtered list queryset as NDJSON or CSV.
+    Rows are fetched with iterator(), so memory use does not depend
+    on the table size. Requires `list_values_serializer_class`.
+    """
+
+    export_chunk_size = 2000
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="export_format",
+                type=OpenApiTypes.STR,
+                enum=EXPORT_FORMATS,
+                description="Format of the export, ndjson by default (ex. ?export_format=csv)",
+            ),
+        ],
+        responses={
+            (200, content_type): OpenApiTypes.STR
+            for content_type in EXPORT_CONTENT_TYPES.values()
+        },
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="export",
+        permission_classes=(IsAdminUser,),
+    )
+    def export(self, request, *args, **kwargs):
+        """
+        Endpoint for exporting all the filtered instances
+        (available to staff users).
+        """
+
+        export_format = request.query_params.get("export_format", "ndjson")
+
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": "Export format should be one of: ndjson, csv."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer_class = self.list_values_serializer_class
+        queryset = serializer_class.get_queryset(
+            self.filter_queryset(self.get_queryset())
+        )
+        serializer = serializer_class(
+            queryset.iterator(chunk_size=self.export_chunk_size)
+        )
+
+        return get_export_response(
+            serializer.iter_data(), export_format, f"{self.basename}s"
+        )
+
+
 class ApiRootView(GenericAPIView):
     permission_classes = (IsAuthenticated,)
 
@@ -52,6 +239,9 @@ class ApiRootView(GenericAPIView):
                     format=format,
                     kwargs={"pk": "me"},
                 ),
+                "My dashboard": reverse(
+                    "users:dashboard", request=request, format=format
+                ),
                 "My active borrowings": reverse_with_params(
                     "borrowings:borrowing-list",
                     request=request,
@@ -0,0 +1,148 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from borrowings.archive import archive_batch, get_archivable_borrowings
+from borrowings.models import ArchivedBorrowing, Borrowing
+from tests.test_borrowing_api import get_sample_borrowing
+
+BORROWING_LIST_URL = reverse("borrowings:borrowing-list")
+
+
+def get_returned_borrowing(days_ago, **params) -> Borrowing:
+    borrowing = get_sample_borrowing(**params)
+    Borrowing.objects.filter(id=borrowing.id).update(
+        is_active=False,
+        actual_return_date=now().date() - timedelta(days=days_ago),
+    )
+    return borrowing
+
+
+class ArchiveBorrowingsCommandTests(TestCase):
+    def test_only_old_returned_borrowings_are_archived(self):
+        old_borrowing = get_returned_borrowing(400)
+        recent_borrowing = get_returned_borrowing(10)
+        active_borrowing = get_sample_borrowing()
+
+        call_command("archive_borrowings", "--days=365", stdout=StringIO())
+
+        self.assertEqual(
+            set(Borrowing.objects.values_list("id", flat=True)),
+            {recent_borrowing.id, active_borrowing.id},
+        )
+        archived = ArchivedBorrowing.objects.get()
+        self.assertEqual(archived.id, old_borrowing.id)
+        self.assertEqual(archived.user_id, old_borrowing.user_id)
+        self.assertEqual(
+            archived.actual_return_date,
+            now().date() - timedelta(days=400),
+        )
+
+    def test_archive_goes_on_after_interrupted_run(self):
+        borrowings = [get_returned_borrowing(400) for _ in range(5)]
+
+        # Run interrupted after the first batch
+        archive_batch(get_archivable_borrowings(365), batch_size=2)
+        self.assertEqual(ArchivedBorrowing.objects.count(), 2)
+
+        out = StringIO()
+        call_command(
+            "archive_borrowings", "--days=365", "--batch-size=2", stdout=out
+        )
+
+        self.assertIn("Archived: 3 borrowings", out.getvalue())
+        self.assertFalse(Borrowing.objects.exists())
+        self.assertEqual(
+            list(ArchivedBorrowing.objects.values_list("id", flat=True)),
+            [borrowing.id for borrowing in borrowings],
+        )
+
+    def test_dry_run(self):
+        get_returned_borrowing(400)
+        out = StringIO()
+
+        call_command("archive_borrowings", "--dry-run", stdout=out)
+
+        self.assertIn("1 borrowings to archive", out.getvalue())
+        self.assertFalse(ArchivedBorrowing.objects.exists())
+
+
+class BorrowingHistoryApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="test_user",
+            password="testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+        self.active_borrowing = get_sample_borrowing(user=self.user)
+        self.archived_borrowing = get_returned_borrowing(400, user=self.user)
+        self.other_archived_borrowing = get_returned_borrowing(400)
+        call_command("archive_borrowings", stdout=StringIO())
+
+    def test_list_excludes_archived_borrowings_by_default(self):
+        res = self.client.get(BORROWING_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [borrowing["id"] for borrowing in res.data["results"]],
+            [self.active_borrowing.id],
+        )
+
+    def test_list_includes_archived_borrowings_on_request(self):
+        res = self.client.get(BORROWING_LIST_URL, {"include_archived": "true"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {borrowing["id"] for borrowing in res.data["results"]},
+            {self.active_borrowing.id, self.archived_borrowing.id},
+        )
+
+    def test_returned_list_includes_archived_borrowings_on_request(self):
+        res = self.client.get(
+            BORROWING_LIST_URL,
+            {"is_active": "false", "include_archived": "true"},
+        )
+
+        self.assertEqual(
+            [borrowing["id"] for borrowing in res.data["results"]],
+            [self.archived_borrowing.id],
+        )
+        self.assertFalse(res.data["results"][0]["is_active"])
+
+    def test_active_list_excludes_archived_borrowings(self):
+        res = self.client.get(BORROWING_LIST_URL, {"is_active": "true"})
+
+        self.assertEqual(
+            [borrowing["id"] for borrowing in res.data["results"]],
+            [self.active_borrowing.id],
+        )
+
+    def test_retrieve_archived_borrowing(self):
+        url = reverse(
+            "borrowings:borrowing-detail", args=[self.archived_borrowing.id]
+        )
+
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["id"], self.archived_borrowing.id)
+        self.assertFalse(res.data["is_active"])
+
+    def test_retrieve_not_own_archived_borrowing_not_found(self):
+        url = reverse(
+            "borrowings:borrowing-detail",
+            args=[self.other_archived_borrowing.id],
+        )
+
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
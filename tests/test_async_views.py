@@ -0,0 +1,183 @@
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import AsyncClient, Client, RequestFactory, TestCase
+from django.urls import resolve, reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from borrowings.models import Borrowing
+from library_api.authentication import token_cache
+from library_api.middleware import AsyncReadMiddleware, get_async_action
+from tests.test_book_api import get_sample_book
+from tests.test_borrowing_api import get_sample_borrowing
+from tests.test_user_api import get_sample_user
+
+BOOK_LIST_URL = reverse("books:book-list")
+BORROWING_LIST_URL = reverse("borrowings:borrowing-list")
+USER_DETAIL_ME_URL = reverse("users:user-detail", kwargs={"pk": "me"})
+
+
+def get_book_detail_url(book_id):
+    return reverse("books:book-detail", args=[book_id])
+
+
+class AsyncReadMiddlewareTests(TestCase):
+    def get_action(self, url, method="get"):
+        request = getattr(RequestFactory(), method)(url)
+        return get_async_action(resolve(url).func, request)
+
+    def test_async_actions(self):
+        self.assertEqual(self.get_action(BOOK_LIST_URL), "list")
+        self.assertEqual(self.get_action(get_book_detail_url(1)), "retrieve")
+        self.assertEqual(self.get_action(BORROWING_LIST_URL), "list")
+        self.assertEqual(self.get_action(USER_DETAIL_ME_URL), "retrieve")
+
+    def test_sync_actions(self):
+        self.assertIsNone(self.get_action(BOOK_LIST_URL, method="post"))
+        self.assertIsNone(self.get_action(reverse("users:user-list")))
+        self.assertIsNone(
+            self.get_action(reverse("borrowings:borrowing-detail", args=[1]))
+        )
+        self.assertIsNone(self.get_action(reverse("users:dashboard")))
+
+    def test_view_hook_installed_only_in_async_mode(self):
+        async def get_response(request):
+            return None
+
+        self.assertFalse(
+            hasattr(AsyncReadMiddleware(lambda request: None), "process_view")
+        )
+        self.assertTrue(
+            hasattr(AsyncReadMiddleware(get_response), "process_view")
+        )
+
+
+class AsyncReadApiTests(TestCase):
+    """Responses served under ASGI are the same as under WSGI"""
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+
+        self.user = get_sample_user()
+        self.other_user = get_sample_user()
+        self.admin = get_sample_user(is_staff=True)
+        self.headers = self.get_auth_headers(self.user)
+
+        self.book = get_sample_book(title="Async book")
+        get_sample_book()
+        get_sample_borrowing(book=self.book, user=self.user)
+        overdue = get_sample_borrowing(user=self.user)
+        Borrowing.objects.filter(id=overdue.id).update(
+            expected_return_date=now().date() - timedelta(days=3)
+        )
+        get_sample_borrowing(user=self.user, is_active=False)
+        get_sample_borrowing(user=self.other_user)
+
+    @staticmethod
+    def get_auth_headers(user):
+        token = Token.objects.create(user=user)
+        return {"Authorization": f"Token {token.key}"}
+
+    async def assertSameResponses(self, url, params=None, headers=None):
+        headers = self.headers if headers is None else headers
+        sync_res = await sync_to_async(Client().get)(
+            url, params, headers=headers
+        )
+        # Do not serve cached book responses made by the sync view
+        await cache.aclear()
+        async_res = await AsyncClient().get(url, params, headers=headers)
+
+        self.assertEqual(async_res.status_code, sync_res.status_code)
+        self.assertEqual(async_res.json(), sync_res.json())
+        return async_res
+
+    async def test_book_list(self):
+        res = await self.assertSameResponses(BOOK_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["count"], 5)
+
+    async def test_book_list_with_filters_and_count_types(self):
+        await self.assertSameResponses(BOOK_LIST_URL, {"title": "async"})
+        await self.assertSameResponses(
+            BOOK_LIST_URL, {"count": "cached", "page_size": 2, "page": 2}
+        )
+        await self.assertSameResponses(BOOK_LIST_URL, {"count": "none"})
+        await self.assertSameResponses(BOOK_LIST_URL, {"page": 9})
+
+    async def test_book_list_empty_search_count_types(self):
+        for count_type in ("estimated", "cached"):
+            res = await self.assertSameResponses(
+                BOOK_LIST_URL, {"q": "!!!", "count": count_type}
+            )
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(res.json()["count"], 0)
+
+    async def test_book_list_cursor_pagination(self):
+        res = await self.assertSameResponses(
+            BOOK_LIST_URL, {"pagination": "cursor", "page_size": 3}
+        )
+
+        await self.assertSameResponses(res.json()["next"])
+
+    async def test_cached_book_list_not_modified(self):
+        client = AsyncClient()
+        res = await client.get(BOOK_LIST_URL, headers=self.headers)
+
+        cached_res = await client.get(
+            BOOK_LIST_URL,
+            headers={**self.headers, "If-None-Match": res["ETag"]},
+        )
+
+        self.assertEqual(cached_res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_book_detail(self):
+        await self.assertSameResponses(get_book_detail_url(self.book.id))
+
+        res = await self.assertSameResponses(get_book_detail_url(999))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_borrowing_list(self):
+        res = await self.assertSameResponses(BORROWING_LIST_URL)
+        await self.assertSameResponses(
+            BORROWING_LIST_URL, {"is_active": "true"}
+        )
+
+        self.assertEqual(res.json()["count"], 3)
+
+    async def test_borrowing_list_of_user_for_admin(self):
+        headers = await self.aget_auth_headers(self.admin)
+
+        res = await self.assertSameResponses(
+            BORROWING_LIST_URL, {"user_id": self.other_user.id}, headers
+        )
+
+        self.assertEqual(res.json()["count"], 1)
+
+    async def test_user_detail(self):
+        res = await self.assertSameResponses(USER_DETAIL_ME_URL)
+
+        self.assertEqual(res.json()["id"], self.user.id)
+        self.assertEqual(res.json()["num_overdue_borrowings"], 1)
+
+    async def test_other_user_detail_forbidden(self):
+        res = await self.assertSameResponses(
+            reverse("users:user-detail", args=[self.other_user.id])
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    async def test_auth_required(self):
+        res = await self.assertSameResponses(BORROWING_LIST_URL, headers={})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def aget_auth_headers(self, user):
+        token = await Token.objects.acreate(user=user)
+        return {"Authorization": f"Token {token.key}"}
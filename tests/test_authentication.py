@@ -0,0 +1,109 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from library_api.authentication import LRUCache, token_cache
+from tests.test_user_api import get_sample_user
+
+API_ROOT_URL = reverse("api_root")
+USER_LIST_URL = reverse("users:user-list")
+
+
+class LRUCacheTests(TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        lru_cache = LRUCache(maxsize=2)
+        lru_cache.set("a", 1, ttl=60)
+        lru_cache.set("b", 2, ttl=60)
+        lru_cache.get("a")
+
+        lru_cache.set("c", 3, ttl=60)
+
+        self.assertEqual(lru_cache.get("a"), 1)
+        self.assertIsNone(lru_cache.get("b"))
+        self.assertEqual(lru_cache.get("c"), 3)
+
+    def test_entry_expires(self):
+        lru_cache = LRUCache(maxsize=2)
+        lru_cache.set("a", 1, ttl=-1)
+
+        self.assertIsNone(lru_cache.get("a"))
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+
+        self.user = get_sample_user()
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_token_is_looked_up_once(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(API_ROOT_URL)
+
+        with self.assertNumQueries(0):
+            cached_res = self.client.get(API_ROOT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached_res.status_code, status.HTTP_200_OK)
+
+    def test_invalid_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token invalid")
+
+        res = self.client.get(API_ROOT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_token_is_invalidated(self):
+        self.client.get(API_ROOT_URL)
+
+        self.token.delete()
+        res = self.client.get(API_ROOT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_invalidated(self):
+        self.client.get(API_ROOT_URL)
+
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(API_ROOT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_staff_status_change_is_applied(self):
+        self.assertEqual(
+            self.client.get(USER_LIST_URL).status_code,
+            status.HTTP_403_FORBIDDEN,
+        )
+
+        self.user.is_staff = True
+        self.user.save()
+
+        self.assertEqual(
+            self.client.get(USER_LIST_URL).status_code, status.HTTP_200_OK
+        )
+
+    @override_settings(TOKEN_AUTH_SHARED_CACHE="default")
+    def test_shared_cache_is_used_after_local_cache_miss(self):
+        self.client.get(API_ROOT_URL)
+        token_cache.clear()
+
+        with self.assertNumQueries(0):
+            res = self.client.get(API_ROOT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @override_settings(TOKEN_AUTH_SHARED_CACHE="default")
+    def test_deleted_token_is_invalidated_in_shared_cache(self):
+        self.client.get(API_ROOT_URL)
+
+        self.token.delete()
+        res = self.client.get(API_ROOT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -1,15 +1,23 @@
+import io
 import json
+import os
+import tempfile
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 
 from books.models import Book
 from books.serializers import (
     BookDetailSerializer,
     BookListSerializer,
+    BookListValuesSerializer,
 )
 from borrowings.models import Borrowing
 from borrowings.serializers import BorrowingSerializer
@@ -17,6 +25,7 @@ from borrowings.serializers import BorrowingSerializer
 BOOK_LIST_URL = reverse("books:book-list")
 BOOK_DETAIL_URL = reverse("books:book-detail", kwargs={"pk": 1})
 BOOK_BORROW_TOGGLE_URL = reverse("books:book-borrow-toggle", kwargs={"pk": 1})
+BOOK_BULK_IMPORT_URL = reverse("books:book-bulk-import")
 
 
 SAMPLE_BOOK_DATA = {
@@ -41,6 +50,23 @@ def get_sample_book(**params) -> Book:
     return Book.objects.create(**defaults)
 
 
+class BookListValuesSerializerTests(TestCase):
+    def test_output_is_identical_to_book_list_serializer(self):
+        get_sample_book(daily_fee="1.5")
+        get_sample_book(title="Ünïcode “title”", daily_fee="0")
+        books = Book.objects.order_by("id")
+
+        values_serializer = BookListValuesSerializer(
+            BookListValuesSerializer.get_queryset(books)
+        )
+        serializer = BookListSerializer(books, many=True)
+
+        self.assertEqual(
+            JSONRenderer().render(values_serializer.data),
+            JSONRenderer().render(serializer.data),
+        )
+
+
 class UnauthenticatedBookApiTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -65,6 +91,49 @@ class UnauthenticatedBookApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
+    def test_search_books_by_title_and_author(self):
+        book1 = get_sample_book(title="Harry Potter", author="Joanne Rowling")
+        book2 = get_sample_book(title="Potter's Field", author="Ellis Peters")
+        get_sample_book(title="The Hobbit", author="John Tolkien")
+
+        res_both_fields = self.client.get(BOOK_LIST_URL, {"q": "potter rowl"})
+        res_prefix = self.client.get(BOOK_LIST_URL, {"q": "pot"})
+
+        self.assertEqual(res_both_fields.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [book["id"] for book in res_both_fields.data["results"]],
+            [book1.id],
+        )
+        self.assertEqual(
+            {book["id"] for book in res_prefix.data["results"]},
+            {book1.id, book2.id},
+        )
+
+    def test_search_books_reflects_updated_title(self):
+        book = get_sample_book(title="Draft title")
+        book.title = "Final title"
+        book.save()
+
+        res_old = self.client.get(BOOK_LIST_URL, {"q": "draft"})
+        res_new = self.client.get(BOOK_LIST_URL, {"q": "final"})
+
+        self.assertEqual(res_old.data["results"], [])
+        self.assertEqual(res_new.data["results"][0]["id"], book.id)
+
+    def test_filter_books_by_title_and_author(self):
+        book1 = get_sample_book(title="Harry Potter", author="Joanne Rowling")
+        book2 = get_sample_book(title="The Hobbit", author="John Tolkien")
+
+        res_title = self.client.get(BOOK_LIST_URL, {"title": "arry"})
+        res_author = self.client.get(BOOK_LIST_URL, {"author": "tolk"})
+
+        self.assertEqual(
+            [book["id"] for book in res_title.data["results"]], [book1.id]
+        )
+        self.assertEqual(
+            [book["id"] for book in res_author.data["results"]], [book2.id]
+        )
+
     def test_post_book_auth_required(self):
         json_data = json.dumps(SAMPLE_BOOK_DATA)
 
@@ -159,6 +228,23 @@ class AuthenticatedBookApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(res.data["error"], expected_error_message)
 
+    def test_book_borrow_toggle_never_makes_inventory_negative(self):
+        book = get_sample_book(total_amount=1)
+
+        res1 = self.client.get(BOOK_BORROW_TOGGLE_URL)
+        res2 = self.client.get(BOOK_BORROW_TOGGLE_URL)
+        book = Book.objects.get(id=book.id)
+
+        self.assertEqual(res1.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res2.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(book.inventory, 0)
+        self.assertEqual(Borrowing.objects.filter(book=book).count(), 1)
+
+    def test_book_borrow_toggle_returns_not_found_for_missing_book(self):
+        res = self.client.get(BOOK_BORROW_TOGGLE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
 
 class AdminBookApiTests(TestCase):
     def setUp(self):
@@ -215,3 +301,174 @@ class AdminBookApiTests(TestCase):
         res = self.client.delete(BOOK_DETAIL_URL)
 
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+
+class BookBulkImportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="test_admin_user",
+            password="testpass",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_import_csv(self):
+        upload = SimpleUploadedFile(
+            "books.csv",
+            b"title,author,cover,total_amount,daily_fee\n"
+            b"First,Author One,H,3,0.50\n"
+            b"Second,Author Two,S,5,\n"
+            b"Broken,Author,X,-1,0.10\n",
+        )
+
+        res = self.client.post(BOOK_BULK_IMPORT_URL, {"file": upload})
+        book = Book.objects.get(title="Second")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["created"], 2)
+        self.assertEqual(res.data["rejected"], 1)
+        self.assertEqual(res.data["errors"][0]["line"], 4)
+        self.assertIn("cover", res.data["errors"][0]["errors"])
+        self.assertEqual(book.inventory, 5)
+
+    def test_bulk_import_jsonl_upsert_keeps_borrowed_copies(self):
+        book = get_sample_book(title="First", author="Author", total_amount=3)
+        Borrowing.objects.create(user=self.user, book=book)
+        Book.objects.filter(id=book.id).update(inventory=2)
+        upload = SimpleUploadedFile(
+            "books.jsonl",
+            b'{"title": "First", "author": "Author", "cover": "H", '
+            b'"total_amount": 10}\n'
+            b'{"title": "Second", "author": "Author", "cover": "S", '
+            b'"total_amount": 1}\n'
+            b"not json\n",
+        )
+
+        res = self.client.post(
+            f"{BOOK_BULK_IMPORT_URL}?upsert=true", {"file": upload}
+        )
+        book = Book.objects.get(id=book.id)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["created"], 1)
+        self.assertEqual(res.data["updated"], 1)
+        self.assertEqual(res.data["rejected"], 1)
+        self.assertEqual(book.total_amount, 10)
+        self.assertEqual(book.inventory, 9)
+        self.assertEqual(Book.objects.count(), 2)
+
+    def test_bulk_import_rejects_rows_not_in_utf8(self):
+        upload = SimpleUploadedFile(
+            "books.csv",
+            b"title,author,cover,total_amount\n"
+            b"First,Author,H,1\n"
+            b"Broken \xff\xfe,Author,H,1\n"
+            b"Third,Author,H,1\n",
+        )
+
+        res = self.client.post(BOOK_BULK_IMPORT_URL, {"file": upload})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["created"], 2)
+        self.assertEqual(res.data["rejected"], 1)
+        self.assertEqual(res.data["errors"][0]["line"], 3)
+
+    def test_bulk_import_forbidden_for_non_admin(self):
+        user = get_user_model().objects.create_user(
+            username="test_user", password="testpass", email="user@user.com"
+        )
+        self.client.force_authenticate(user)
+        upload = SimpleUploadedFile("books.csv", b"title\n")
+
+        res = self.client.post(BOOK_BULK_IMPORT_URL, {"file": upload})
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_import_books_command(self):
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".csv", delete=False
+        ) as file:
+            file.write("title,author,cover,total_amount\n")
+            for i in range(5):
+                file.write(f"Book {i},Author,H,{i + 1}\n")
+
+        call_command(
+            "import_books", file.name, batch_size=2, stdout=io.StringIO()
+        )
+        os.remove(file.name)
+
+        self.assertEqual(Book.objects.count(), 5)
+        self.assertEqual(Book.objects.get(title="Book 4").inventory, 5)
+
+
+class BookResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="test_admin_user",
+            password="testpass",
+            is_staff=True,
+        )
+
+    def test_book_list_not_modified_without_database_queries(self):
+        get_sample_book()
+
+        res = self.client.get(BOOK_LIST_URL)
+
+        with self.assertNumQueries(0):
+            res_not_modified = self.client.get(
+                BOOK_LIST_URL, HTTP_IF_NONE_MATCH=res["ETag"]
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res["ETag"].startswith('"'))
+        self.assertEqual(
+            res_not_modified.status_code, status.HTTP_304_NOT_MODIFIED
+        )
+        self.assertEqual(res_not_modified["ETag"], res["ETag"])
+
+    def test_book_list_cache_is_keyed_on_query_params(self):
+        get_sample_book(title="First")
+        get_sample_book(title="Second")
+
+        res_all = self.client.get(BOOK_LIST_URL)
+        res_filtered = self.client.get(BOOK_LIST_URL, {"title": "sec"})
+
+        self.assertEqual(res_all.data["count"], 2)
+        self.assertEqual(res_filtered.data["count"], 1)
+        self.assertNotEqual(res_all["ETag"], res_filtered["ETag"])
+
+    def test_book_detail_cache_invalidated_on_update(self):
+        book = get_sample_book()
+        res_before = self.client.get(BOOK_DETAIL_URL)
+
+        book.title = "New title"
+        book.save()
+        res_after = self.client.get(
+            BOOK_DETAIL_URL, HTTP_IF_NONE_MATCH=res_before["ETag"]
+        )
+
+        self.assertEqual(res_after.status_code, status.HTTP_200_OK)
+        self.assertEqual(res_after.data["title"], "New title")
+
+    def test_book_detail_cache_invalidated_on_borrow(self):
+        book = get_sample_book()
+        self.client.get(BOOK_DETAIL_URL)
+
+        self.client.force_authenticate(self.user)
+        self.client.get(BOOK_BORROW_TOGGLE_URL)
+        res = self.client.get(BOOK_DETAIL_URL)
+
+        self.assertEqual(res.data["inventory"], book.total_amount - 1)
+
+    def test_book_list_cache_invalidated_on_delete(self):
+        get_sample_book()
+        self.client.get(BOOK_LIST_URL)
+
+        self.client.force_authenticate(self.user)
+        self.client.delete(BOOK_DETAIL_URL)
+        res = self.client.get(BOOK_LIST_URL)
+
+        self.assertEqual(res.data["count"], 0)
@@ -1,16 +1,22 @@
+from datetime import timedelta
+from decimal import Decimal
+
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
 from django.utils.timezone import now
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 
 from books.models import Book
-from borrowings.models import Borrowing
+from borrowings.models import Borrowing, Notification
 from borrowings.serializers import (
     BorrowingListSerializer,
+    BorrowingListValuesSerializer,
     BorrowingDetailSerializer,
 )
+from borrowings.services import return_borrowing
 from borrowings.views import annotate_borrowing_is_overdue
 from tests.test_book_api import get_sample_book
 from tests.test_user_api import get_sample_user
@@ -44,6 +50,56 @@ def get_sample_borrowing(book=None, user=None, **params) -> Borrowing:
     return Borrowing.objects.create(**defaults)
 
 
+class BorrowingListValuesSerializerTests(TestCase):
+    def test_output_is_identical_to_borrowing_list_serializer(self):
+        get_sample_borrowing()
+        returned_borrowing = get_sample_borrowing(
+            user=get_sample_user(first_name="", last_name="")
+        )
+        Borrowing.objects.filter(id=returned_borrowing.id).update(
+            is_active=False, actual_return_date=now().date()
+        )
+        borrowings = annotate_borrowing_is_overdue(
+            Borrowing.objects.order_by("id")
+        )
+
+        values_serializer = BorrowingListValuesSerializer(
+            BorrowingListValuesSerializer.get_queryset(borrowings)
+        )
+        serializer = BorrowingListSerializer(borrowings, many=True)
+
+        self.assertEqual(
+            JSONRenderer().render(values_serializer.data),
+            JSONRenderer().render(serializer.data),
+        )
+
+
+class ReturnBorrowingServiceTests(TestCase):
+    def test_overdue_fee_is_computed(self):
+        borrowing = get_sample_borrowing(
+            book=get_sample_book(daily_fee="0.10")
+        )
+        Borrowing.objects.filter(id=borrowing.id).update(
+            expected_return_date=now().date() - timedelta(days=3)
+        )
+
+        borrowing = return_borrowing(borrowing.id)
+        notification = Notification.objects.get()
+
+        self.assertEqual(borrowing.days_overdue, 3)
+        self.assertEqual(borrowing.money_to_pay, Decimal("0.30"))
+        self.assertIn("Days overdue: 3", notification.text)
+        self.assertIn("Money to pay overdue: $0.30\n", notification.text)
+
+    def test_returned_in_time_fee_is_zero(self):
+        borrowing = get_sample_borrowing()
+
+        borrowing = return_borrowing(borrowing.id)
+
+        self.assertEqual(borrowing.days_overdue, 0)
+        self.assertEqual(str(borrowing.money_to_pay), "0.00")
+
+
 class UnauthenticatedBorrowingApiTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -144,6 +200,27 @@ class AuthenticatedBorrowingApiTests(TestCase):
         self.assertEqual(borrowing.actual_return_date, now().date())
         self.assertEqual(book.inventory, book.total_amount)
 
+    def test_return_borrowing_toggle_runs_fixed_number_of_queries(self):
+        get_sample_borrowing(user=self.user)
+
+        # get_object, savepoint, 3 updates (borrowing, user counter, book),
+        # fetching back with the fee, outbox window check and insert,
+        # savepoint release
+        with self.assertNumQueries(9):
+            res = self.client.get(BORROWING_RETURN_TOGGLE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_return_borrowing_takes_copy_back_to_inventory(self):
+        book = get_sample_book(total_amount=2)
+        borrowing = get_sample_borrowing(book=book, user=self.user)
+        Book.objects.filter(id=book.id).update(inventory=1)
+
+        self.client.get(BORROWING_RETURN_TOGGLE_URL)
+        book = Book.objects.get(id=book.id)
+
+        self.assertEqual(book.inventory, 2)
+
     def test_return_borrowing_toggle_when_is_active_false_returns_bad_request(
         self,
     ):
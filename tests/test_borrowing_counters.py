@@ -0,0 +1,76 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework.test import APIClient
+
+from borrowings.models import Borrowing
+from borrowings.services import borrow_book, return_borrowing
+from tests.test_book_api import get_sample_book
+from tests.test_borrowing_api import get_sample_borrowing
+from tests.test_user_api import get_sample_user
+
+
+def get_num_active_borrowings(user) -> int:
+    user.refresh_from_db()
+    return user.num_active_borrowings
+
+
+class NumActiveBorrowingsCounterTests(TestCase):
+    def setUp(self):
+        self.user = get_sample_user()
+
+    def test_counter_follows_borrow_and_return(self):
+        borrowing = borrow_book(self.user, get_sample_book().id)
+        borrow_book(self.user, get_sample_book().id)
+
+        self.assertEqual(get_num_active_borrowings(self.user), 2)
+
+        return_borrowing(borrowing.id)
+
+        self.assertEqual(get_num_active_borrowings(self.user), 1)
+
+    def test_reconcile_command_fixes_drift(self):
+        get_sample_borrowing(user=self.user)
+        get_sample_borrowing(user=self.user)
+        other_user = get_sample_user()
+        get_sample_borrowing(user=other_user)
+        # Changed without the return path
+        Borrowing.objects.filter(user=self.user).update(is_active=False)
+        out = StringIO()
+
+        call_command("reconcile_borrowing_counters", stdout=out)
+
+        self.assertIn("Fixed: 1 users", out.getvalue())
+        self.assertEqual(get_num_active_borrowings(self.user), 0)
+        self.assertEqual(get_num_active_borrowings(other_user), 1)
+
+
+class UserListBorrowingCountsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                username="test_admin_user", password="testpass", is_staff=True
+            )
+        )
+
+    def test_user_list_shows_borrowing_counts(self):
+        user = get_sample_user()
+        get_sample_borrowing(user=user)
+        overdue_borrowing = get_sample_borrowing(user=user)
+        Borrowing.objects.filter(id=overdue_borrowing.id).update(
+            expected_return_date=now().date() - timedelta(days=1)
+        )
+
+        res = self.client.get(reverse("users:user-list"))
+        user_data = next(
+            row for row in res.data["results"] if row["id"] == user.id
+        )
+
+        self.assertEqual(user_data["num_active_borrowings"], 2)
+        self.assertEqual(user_data["num_overdue_borrowings"], 1)
@@ -0,0 +1,195 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.models import Book
+from borrowings.models import Borrowing, Notification
+from borrowings.services import borrow_book
+from tests.test_book_api import get_sample_book
+from tests.test_borrowing_api import get_sample_borrowing
+
+BULK_BORROW_URL = reverse("books:book-bulk-borrow")
+BULK_RETURN_URL = reverse("borrowings:borrowing-bulk-return")
+
+
+class UnauthenticatedBulkApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_bulk_borrow_auth_required(self):
+        res = self.client.post(BULK_BORROW_URL, {"books": [1]}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bulk_return_auth_required(self):
+        res = self.client.post(
+            BULK_RETURN_URL, {"borrowings": [1]}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AuthenticatedBulkApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="test_user",
+            password="testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_borrow(self):
+        books = [get_sample_book(title=f"Book {i}") for i in range(3)]
+
+        res = self.client.post(
+            BULK_BORROW_URL,
+            {"books": [book.id for book in books]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [result["status"] for result in res.data["results"]], ["ok"] * 3
+        )
+        self.assertEqual(
+            Borrowing.objects.filter(user=self.user, is_active=True).count(),
+            3,
+        )
+        for book in books:
+            book.refresh_from_db()
+            self.assertEqual(book.inventory, book.total_amount - 1)
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_bulk_borrow_all_or_nothing_rolls_back_on_failure(self):
+        available_book = get_sample_book()
+        not_available_book = get_sample_book(total_amount=0)
+
+        res = self.client.post(
+            BULK_BORROW_URL,
+            {"books": [available_book.id, not_available_book.id, 999]},
+            format="json",
+        )
+        available_book.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            [result["status"] for result in res.data["results"]],
+            ["rolled_back", "failed", "failed"],
+        )
+        self.assertEqual(res.data["results"][2]["error"], "Book not found.")
+        self.assertFalse(Borrowing.objects.exists())
+        self.assertEqual(available_book.inventory, available_book.total_amount)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_bulk_borrow_best_effort(self):
+        available_book = get_sample_book()
+        not_available_book = get_sample_book(total_amount=0)
+
+        res = self.client.post(
+            BULK_BORROW_URL,
+            {
+                "books": [available_book.id, not_available_book.id],
+                "mode": "best_effort",
+            },
+            format="json",
+        )
+        borrowing = Borrowing.objects.get()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"][0]["borrowing"], borrowing.id)
+        self.assertEqual(res.data["results"][1]["status"], "failed")
+        self.assertEqual(borrowing.book, available_book)
+
+    def test_bulk_borrow_invalid_payload(self):
+        res = self.client.post(BULK_BORROW_URL, {"books": []}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_return(self):
+        books = [get_sample_book(title=f"Book {i}") for i in range(2)]
+        borrowings = [borrow_book(self.user, book.id) for book in books]
+        Notification.objects.all().delete()
+
+        res = self.client.post(
+            BULK_RETURN_URL,
+            {"borrowings": [borrowing.id for borrowing in borrowings]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"][0]["money_to_pay"], "0.00")
+        self.assertFalse(
+            Borrowing.objects.filter(user=self.user, is_active=True).exists()
+        )
+        for book in books:
+            book.refresh_from_db()
+            self.assertEqual(book.inventory, book.total_amount)
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_bulk_return_only_own_borrowings(self):
+        own_borrowing = get_sample_borrowing(user=self.user)
+        other_borrowing = get_sample_borrowing()
+
+        res = self.client.post(
+            BULK_RETURN_URL,
+            {
+                "borrowings": [own_borrowing.id, other_borrowing.id],
+                "mode": "best_effort",
+            },
+            format="json",
+        )
+        other_borrowing.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"][0]["status"], "ok")
+        self.assertEqual(
+            res.data["results"][1]["error"], "Borrowing not found."
+        )
+        self.assertTrue(other_borrowing.is_active)
+
+    def test_bulk_return_already_returned_rolls_back(self):
+        active_borrowing = get_sample_borrowing(user=self.user)
+        returned_borrowing = get_sample_borrowing(user=self.user)
+        Borrowing.objects.filter(id=returned_borrowing.id).update(
+            is_active=False
+        )
+
+        res = self.client.post(
+            BULK_RETURN_URL,
+            {"borrowings": [active_borrowing.id, returned_borrowing.id]},
+            format="json",
+        )
+        active_borrowing.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["results"][1]["error"],
+            "This borrowing is already returned.",
+        )
+        self.assertTrue(active_borrowing.is_active)
+
+
+class AdminBulkApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="test_admin_user",
+            password="testpass",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_return_not_own_borrowings(self):
+        borrowing = get_sample_borrowing()
+        Book.objects.filter(id=borrowing.book_id).update(inventory=0)
+
+        res = self.client.post(
+            BULK_RETURN_URL, {"borrowings": [borrowing.id]}, format="json"
+        )
+        borrowing.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(borrowing.is_active)
+        self.assertEqual(borrowing.book.inventory, 1)
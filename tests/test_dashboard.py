@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from borrowings.models import Borrowing
+from borrowings.services import borrow_book, return_borrowing
+from tests.test_book_api import get_sample_book
+from tests.test_borrowing_api import get_sample_borrowing
+from tests.test_user_api import get_sample_user
+
+DASHBOARD_URL = reverse("users:dashboard")
+
+
+class UnauthenticatedDashboardApiTests(TestCase):
+    def test_auth_required(self):
+        res = APIClient().get(DASHBOARD_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class DashboardApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_sample_user()
+        self.client.force_authenticate(self.user)
+
+    def test_dashboard_with_overdue_fees(self):
+        today = now().date()
+        overdue = get_sample_borrowing(
+            user=self.user, book=get_sample_book(daily_fee="0.50")
+        )
+        Borrowing.objects.filter(id=overdue.id).update(
+            expected_return_date=today - timedelta(days=3)
+        )
+        on_time = get_sample_borrowing(user=self.user)
+        get_sample_borrowing()
+        get_sample_borrowing(user=self.user, is_active=False)
+
+        res = self.client.get(DASHBOARD_URL)
+        borrowings = res.data["active_borrowings"]
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["user"]["id"], self.user.id)
+        self.assertEqual(res.data["user"]["num_active_borrowings"], 2)
+        self.assertEqual(res.data["user"]["num_overdue_borrowings"], 1)
+        self.assertEqual(
+            [borrowing["id"] for borrowing in borrowings],
+            [overdue.id, on_time.id],
+        )
+        self.assertEqual(borrowings[0]["book"]["daily_fee"], "0.50")
+        self.assertTrue(borrowings[0]["is_overdue"])
+        self.assertEqual(borrowings[0]["days_overdue"], 3)
+        self.assertEqual(borrowings[0]["money_to_pay"], "1.50")
+        self.assertFalse(borrowings[1]["is_overdue"])
+        self.assertEqual(borrowings[1]["money_to_pay"], "0.00")
+        self.assertEqual(res.data["overdue_fee_total"], "1.50")
+
+    def test_dashboard_is_cached_until_borrow_or_return(self):
+        book = get_sample_book()
+        self.client.get(DASHBOARD_URL)
+
+        with self.assertNumQueries(0):
+            cached_res = self.client.get(DASHBOARD_URL)
+
+        borrowing = borrow_book(self.user, book.id)
+        borrowed_res = self.client.get(DASHBOARD_URL)
+        return_borrowing(borrowing.id)
+        returned_res = self.client.get(DASHBOARD_URL)
+
+        self.assertEqual(cached_res.data["active_borrowings"], [])
+        self.assertEqual(len(borrowed_res.data["active_borrowings"]), 1)
+        self.assertEqual(returned_res.data["active_borrowings"], [])
+
+    def test_dashboard_is_not_invalidated_by_other_users(self):
+        self.client.get(DASHBOARD_URL)
+
+        borrow_book(get_sample_user(), get_sample_book().id)
+
+        with self.assertNumQueries(0):
+            self.client.get(DASHBOARD_URL)
+
+    def test_dashboard_reflects_profile_change(self):
+        self.client.get(DASHBOARD_URL)
+        self.user.first_name = "Jane"
+        self.user.save()
+
+        res = self.client.get(DASHBOARD_URL)
+
+        self.assertEqual(res.data["user"]["first_name"], "Jane")
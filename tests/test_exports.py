@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from borrowings.models import Borrowing
+from tests.test_book_api import get_sample_book
+from tests.test_borrowing_api import get_sample_borrowing
+from tests.test_user_api import get_sample_user
+
+BOOK_EXPORT_URL = reverse("books:book-export")
+BORROWING_EXPORT_URL = reverse("borrowings:borrowing-export")
+USER_EXPORT_URL = reverse("users:user-export")
+
+
+def get_streamed_content(response) -> str:
+    return b"".join(response.streaming_content).decode()
+
+
+class NotAdminExportApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_sample_user()
+        self.client.force_authenticate(self.user)
+
+    def test_export_forbidden_for_not_staff_users(self):
+        for url in (BOOK_EXPORT_URL, BORROWING_EXPORT_URL, USER_EXPORT_URL):
+            res = self.client.get(url)
+
+            self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class AdminExportApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_sample_user(is_staff=True)
+        self.client.force_authenticate(self.user)
+
+    def test_export_books_ndjson(self):
+        get_sample_book(title="Sample book 1")
+        get_sample_book(title="Sample book 2")
+
+        res = self.client.get(BOOK_EXPORT_URL)
+        rows = [
+            json.loads(line) for line in get_streamed_content(res).splitlines()
+        ]
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        self.assertEqual(
+            [row["title"] for row in rows], ["Sample book 1", "Sample book 2"]
+        )
+
+    def test_export_books_csv_honors_filters(self):
+        get_sample_book(title="New book")
+        get_sample_book(title="Old book", total_amount=0)
+
+        res = self.client.get(
+            BOOK_EXPORT_URL, {"export_format": "csv", "is_available": "true"}
+        )
+        rows = list(csv.DictReader(io.StringIO(get_streamed_content(res))))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "text/csv")
+        self.assertIn("books.csv", res["Content-Disposition"])
+        self.assertEqual([row["title"] for row in rows], ["New book"])
+        self.assertEqual(rows[0]["daily_fee"], "0.10")
+
+    def test_export_borrowings_honors_filters(self):
+        borrowing = get_sample_borrowing()
+        get_sample_borrowing(user=self.user)
+        Borrowing.objects.filter(id=borrowing.id).update(is_active=False)
+
+        res = self.client.get(
+            BORROWING_EXPORT_URL,
+            {"is_active": "false", "user_id": borrowing.user_id},
+        )
+        rows = [
+            json.loads(line) for line in get_streamed_content(res).splitlines()
+        ]
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["id"] for row in rows], [borrowing.id])
+
+    def test_export_users_honors_search(self):
+        get_sample_user(last_name="Smith")
+
+        res = self.client.get(USER_EXPORT_URL, {"search": "smit"})
+        rows = [
+            json.loads(line) for line in get_streamed_content(res).splitlines()
+        ]
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["last_name"] for row in rows], ["Smith"])
+
+    def test_export_empty_csv(self):
+        res = self.client.get(BOOK_EXPORT_URL, {"export_format": "csv"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(get_streamed_content(res), "")
+
+    def test_export_invalid_format(self):
+        res = self.client.get(BOOK_EXPORT_URL, {"export_format": "xml"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
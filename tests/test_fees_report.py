@@ -0,0 +1,136 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from borrowings.models import Borrowing
+from borrowings.reports import get_outstanding_fees_report
+from borrowings.services import return_borrowing
+from tests.test_book_api import get_sample_book
+from tests.test_borrowing_api import get_sample_borrowing
+from tests.test_user_api import get_sample_user
+
+FEES_REPORT_URL = reverse("borrowings:borrowing-fees-report")
+
+
+def get_overdue_borrowing(days_overdue, **params) -> Borrowing:
+    borrowing = get_sample_borrowing(**params)
+    borrowing.expected_return_date = now().date() - timedelta(
+        days=days_overdue
+    )
+    borrowing.save()
+    return borrowing
+
+
+class OutstandingFeesReportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_report_totals_per_user_and_book(self):
+        user = get_sample_user()
+        book = get_sample_book(daily_fee="0.50")
+        get_overdue_borrowing(3, user=user, book=book)
+        get_overdue_borrowing(1, user=user, book=get_sample_book())
+        other_borrowing = get_overdue_borrowing(4, book=book)
+        # Not overdue yet and due today
+        get_sample_borrowing(user=user, book=book)
+        get_overdue_borrowing(0, user=user, book=book)
+
+        report = get_outstanding_fees_report()
+
+        self.assertEqual(report["date"], now().date())
+        self.assertEqual(
+            report["total"],
+            {
+                "borrowings": 3,
+                "days_overdue": 8,
+                "money_to_pay": Decimal("3.60"),
+            },
+        )
+        self.assertEqual(
+            [
+                (row["id"], row["money_to_pay"], row["borrowings"])
+                for row in report["users"]
+            ],
+            [
+                (other_borrowing.user_id, Decimal("2.00"), 1),
+                (user.id, Decimal("1.60"), 2),
+            ],
+        )
+        self.assertEqual(report["books"][0]["id"], book.id)
+        self.assertEqual(report["books"][0]["money_to_pay"], Decimal("3.50"))
+        self.assertEqual(report["books"][0]["days_overdue"], 7)
+
+    def test_returned_borrowings_are_excluded(self):
+        borrowing = get_overdue_borrowing(2)
+
+        self.assertEqual(
+            get_outstanding_fees_report()["total"]["borrowings"], 1
+        )
+
+        return_borrowing(borrowing.id)
+
+        self.assertEqual(
+            get_outstanding_fees_report()["total"]["borrowings"], 0
+        )
+
+    def test_report_is_counted_up_to_date(self):
+        get_overdue_borrowing(2)
+
+        report = get_outstanding_fees_report(now().date() + timedelta(days=3))
+
+        self.assertEqual(report["total"]["days_overdue"], 5)
+        self.assertEqual(report["total"]["money_to_pay"], Decimal("0.50"))
+
+    def test_report_is_cached(self):
+        get_overdue_borrowing(2)
+        get_outstanding_fees_report()
+
+        with self.assertNumQueries(0):
+            report = get_outstanding_fees_report()
+
+        self.assertEqual(report["total"]["borrowings"], 1)
+
+    def test_command_prints_report(self):
+        get_overdue_borrowing(2, user=get_sample_user(email="late@user.com"))
+        out = StringIO()
+
+        call_command("fees_report", stdout=out)
+
+        self.assertIn("$0.20 for 1 borrowings", out.getvalue())
+        self.assertIn("late@user.com", out.getvalue())
+
+
+class FeesReportApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_not_staff_user_forbidden(self):
+        user = get_user_model().objects.create_user(
+            username="test_user", password="testpass"
+        )
+        self.client.force_authenticate(user)
+
+        res = self.client.get(FEES_REPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_staff_user_gets_report(self):
+        self.client.force_authenticate(get_sample_user(is_staff=True))
+        get_overdue_borrowing(3)
+
+        res = self.client.get(FEES_REPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["total"]["money_to_pay"], "0.30")
+        self.assertEqual(len(res.data["users"]), 1)
+        self.assertEqual(len(res.data["books"]), 1)
@@ -2,10 +2,13 @@ import datetime
 
 from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
 from django.utils.timezone import now
 
 from books.models import Book
 from borrowings.models import Borrowing
+from library_api.settings import BASE_URL
+from library_api.views import reverse_with_params
 
 SAMPLE_BOOK_DATA = {
     "title": "Test book",
@@ -101,3 +104,37 @@ class BorrowingModelTests(TestCase):
         )
 
         self.assertEqual(str(borrowing), expected_str)
+
+
+class UrlTemplateTests(TestCase):
+    def test_full_absolute_urls_match_reverse(self):
+        book = Book.objects.create(**SAMPLE_BOOK_DATA)
+        user = get_user_model().objects.create_user(
+            username="john_doe", password="testpass"
+        )
+        borrowing = Borrowing.objects.create(user=user, book=book)
+
+        for instance, viewname in (
+            (book, "books:book-detail"),
+            (user, "users:user-detail"),
+            (borrowing, "borrowings:borrowing-detail"),
+        ):
+            expected_url = reverse(viewname, kwargs={"pk": instance.id})
+
+            self.assertEqual(instance.get_absolute_url(), expected_url)
+            self.assertEqual(
+                instance.get_full_absolute_url(), f"{BASE_URL}{expected_url}"
+            )
+
+    def test_reverse_with_params(self):
+        url = reverse_with_params(
+            "users:user-detail",
+            kwargs={"pk": "me"},
+            params={"is_active": "True"},
+        )
+
+        self.assertEqual(
+            url,
+            reverse("users:user-detail", kwargs={"pk": "me"})
+            + "?is_active=True",
+        )
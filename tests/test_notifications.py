@@ -0,0 +1,268 @@
+import io
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from borrowings.models import Notification
+from borrowings.notifications import (
+    build_digests,
+    claim_notifications,
+    deliver_notifications,
+    get_window_start,
+    notify,
+)
+from tests.test_book_api import get_sample_book
+from tests.test_borrowing_api import get_sample_borrowing
+
+
+class TelegramStubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append(
+            (self.path, parse_qs(body.decode("utf-8")))
+        )
+
+        self.send_response(self.server.response_status)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b'{"ok": true}')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TelegramStubServerMixin:
+    """Run a local HTTP server standing in for the Telegram API"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), TelegramStubHandler)
+        thread = threading.Thread(target=cls.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+        cls.enterClassContext(
+            override_settings(
+                TELEGRAM_API_URL=f"http://127.0.0.1:{cls.server.server_port}"
+            )
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.requests = []
+        self.server.response_status = 200
+
+
+class NotificationOutboxTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="test_user",
+            password="testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_borrow_puts_notification_to_outbox(self):
+        book = get_sample_book()
+
+        self.client.get(reverse("books:book-borrow-toggle", args=[book.id]))
+        notification = Notification.objects.get()
+
+        self.assertIn("New borrowing", notification.text)
+        self.assertIsNone(notification.sent_at)
+        self.assertIsNotNone(notification.next_attempt_at)
+
+    def test_return_puts_notification_to_outbox(self):
+        borrowing = get_sample_borrowing(user=self.user)
+
+        self.client.get(
+            reverse("borrowings:borrowing-return-toggle", args=[borrowing.id])
+        )
+        notification = Notification.objects.get()
+
+        self.assertIn(
+            f"Borrowing №{borrowing.id} is returned", notification.text
+        )
+
+    def test_failed_borrow_puts_no_notification_to_outbox(self):
+        book = get_sample_book(total_amount=0)
+
+        res = self.client.get(
+            reverse("books:book-borrow-toggle", args=[book.id])
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Notification.objects.exists())
+
+
+class RunNotifierTests(TelegramStubServerMixin, TestCase):
+    def test_due_notifications_are_delivered(self):
+        notification = notify("Sample text")
+
+        call_command("run_notifier", "--once", stdout=io.StringIO())
+        notification.refresh_from_db()
+        path, data = self.server.requests[0]
+
+        self.assertIsNotNone(notification.sent_at)
+        self.assertIsNone(notification.next_attempt_at)
+        self.assertEqual(notification.attempts, 1)
+        self.assertTrue(path.endswith("/sendMessage"))
+        self.assertTrue(data["text"][0].endswith("Sample text"))
+
+    def test_not_due_notifications_are_not_delivered(self):
+        Notification.objects.create(
+            text="Sample text", next_attempt_at=now() + timedelta(minutes=1)
+        )
+
+        call_command("run_notifier", "--once", stdout=io.StringIO())
+
+        self.assertEqual(self.server.requests, [])
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        self.server.response_status = 500
+        notification = notify("Sample text")
+
+        call_command("run_notifier", "--once", stdout=io.StringIO())
+        notification.refresh_from_db()
+
+        self.assertIsNone(notification.sent_at)
+        self.assertEqual(notification.attempts, 1)
+        self.assertGreater(notification.next_attempt_at, now())
+        self.assertIn("500", notification.last_error)
+
+    @override_settings(NOTIFICATION_MAX_ATTEMPTS=1)
+    def test_delivery_is_given_up_after_max_attempts(self):
+        self.server.response_status = 500
+        notification = notify("Sample text")
+
+        call_command("run_notifier", "--once", stdout=io.StringIO())
+        notification.refresh_from_db()
+
+        self.assertIsNone(notification.sent_at)
+        self.assertIsNone(notification.next_attempt_at)
+
+    def test_claimed_notifications_are_not_delivered_again(self):
+        notification = notify("Sample text")
+
+        claim_notifications(batch_size=50)
+        call_command("run_notifier", "--once", stdout=io.StringIO())
+        notification.refresh_from_db()
+
+        self.assertEqual(self.server.requests, [])
+        self.assertEqual(notification.attempts, 1)
+        self.assertGreater(notification.next_attempt_at, now())
+
+    def test_sent_notifications_are_saved_one_by_one(self):
+        first = notify("First")
+        second = notify("Second")
+
+        with mock.patch(
+            "borrowings.notifications.send_telegram_notification",
+            side_effect=[None, RuntimeError],
+        ):
+            with self.assertRaises(RuntimeError):
+                deliver_notifications(session=None)
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+
+        self.assertIsNotNone(first.sent_at)
+        self.assertIsNone(first.next_attempt_at)
+        # Crashed delivery is retried once the claim expires
+        self.assertIsNone(second.sent_at)
+        self.assertGreater(second.next_attempt_at, now())
+
+
+@override_settings(
+    NOTIFICATION_DIGEST_WINDOW=60, NOTIFICATION_DIGEST_THRESHOLD=1
+)
+class NotificationDigestTests(TelegramStubServerMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="test_user",
+            password="testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+    def borrow_and_return(self, book):
+        self.client.get(reverse("books:book-borrow-toggle", args=[book.id]))
+        borrowing = get_sample_borrowing(book=book, user=self.user)
+        self.client.get(
+            reverse("borrowings:borrowing-return-toggle", args=[borrowing.id])
+        )
+
+    def close_window(self):
+        previous_window = get_window_start(now()) - timedelta(seconds=1)
+        Notification.objects.update(created_at=previous_window)
+
+    def test_events_over_threshold_are_buffered(self):
+        self.borrow_and_return(get_sample_book())
+
+        first, second = Notification.objects.order_by("id")
+
+        self.assertFalse(first.is_buffered)
+        self.assertIsNotNone(first.next_attempt_at)
+        self.assertTrue(second.is_buffered)
+        self.assertIsNone(second.next_attempt_at)
+
+    def test_plain_messages_are_never_buffered(self):
+        notify("First")
+        notification = notify("Second")
+
+        self.assertFalse(notification.is_buffered)
+
+    def test_digest_is_not_built_before_window_closes(self):
+        self.borrow_and_return(get_sample_book())
+
+        self.assertEqual(build_digests(), 0)
+
+    def test_one_digest_is_sent_per_closed_window(self):
+        book = get_sample_book(title="Busy book", daily_fee="1.00")
+        self.borrow_and_return(book)
+        self.borrow_and_return(book)
+        Notification.objects.filter(kind="borrowing_returned").update(
+            payload={
+                "items": [
+                    {
+                        "book_id": book.id,
+                        "book": str(book),
+                        "inventory_change": 1,
+                        "overdue_fee": "2.00",
+                    }
+                ]
+            }
+        )
+        self.close_window()
+
+        call_command("run_notifier", "--once", stdout=io.StringIO())
+        digest = Notification.objects.get(kind="digest")
+        texts = [data["text"][0] for _, data in self.server.requests]
+
+        self.assertEqual(digest.events.count(), 3)
+        self.assertIsNotNone(digest.sent_at)
+        self.assertEqual(len(texts), 2)
+        self.assertIn("Borrowed: 1", digest.text)
+        self.assertIn("Returned: 2", digest.text)
+        self.assertIn("Money to pay overdue: $4.00", digest.text)
+        self.assertIn(
+            "Busy book (Name Surname): borrowed 1, returned 2, copies +1",
+            digest.text,
+        )
@@ -0,0 +1,198 @@
+import json
+from base64 import urlsafe_b64encode
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from borrowings.models import Borrowing
+from tests.test_book_api import BOOK_LIST_URL, get_sample_book
+from tests.test_borrowing_api import BORROWING_LIST_URL, get_sample_borrowing
+from tests.test_user_api import USER_LIST_URL
+
+
+def encode_cursor(position, is_reversed=False):
+    cursor = json.dumps({"p": position, "r": int(is_reversed)})
+    return urlsafe_b64encode(cursor.encode("utf-8")).decode("ascii")
+
+
+def get_all_pages(client, url, params):
+    ids = []
+    res = client.get(url, params)
+
+    while True:
+        ids.extend(item["id"] for item in res.data["results"])
+        if not res.data["next"]:
+            return ids, res
+        res = client.get(res.data["next"])
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="test_admin_user",
+            password="testpass",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_cursor_pagination_walks_all_books_in_order(self):
+        books = [get_sample_book(title=f"Book {i}") for i in range(5)]
+
+        ids, last_page = get_all_pages(
+            self.client,
+            BOOK_LIST_URL,
+            {"pagination": "cursor", "page_size": 2},
+        )
+
+        self.assertEqual(ids, [book.id for book in books])
+        self.assertNotIn("count", last_page.data)
+
+    def test_cursor_pagination_previous_link(self):
+        books = [get_sample_book(title=f"Book {i}") for i in range(5)]
+
+        first_page = self.client.get(
+            BOOK_LIST_URL, {"pagination": "cursor", "page_size": 2}
+        )
+        second_page = self.client.get(first_page.data["next"])
+        previous_page = self.client.get(second_page.data["previous"])
+
+        self.assertIsNone(first_page.data["previous"])
+        self.assertEqual(
+            [book["id"] for book in previous_page.data["results"]],
+            [books[0].id, books[1].id],
+        )
+        self.assertIsNone(previous_page.data["previous"])
+        self.assertIsNotNone(previous_page.data["next"])
+
+    def test_cursor_pagination_orders_borrowings_by_borrow_date_and_id(self):
+        book = get_sample_book()
+        borrowings = [
+            get_sample_borrowing(book=book, user=self.user) for _ in range(3)
+        ]
+        Borrowing.objects.filter(id=borrowings[0].id).update(
+            borrow_date="2030-01-01"
+        )
+
+        ids, _ = get_all_pages(
+            self.client,
+            BORROWING_LIST_URL,
+            {"pagination": "cursor", "page_size": 1},
+        )
+
+        self.assertEqual(
+            ids, [borrowings[1].id, borrowings[2].id, borrowings[0].id]
+        )
+
+    def test_invalid_cursor_returns_not_found(self):
+        res = self.client.get(BOOK_LIST_URL, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_of_wrong_value_types_returns_not_found(self):
+        for url, position in (
+            # ValueError of an id
+            (BOOK_LIST_URL, ["abc"]),
+            (USER_LIST_URL, ["abc"]),
+            (BOOK_LIST_URL, [None]),
+            # TypeError of an id and of a date
+            (BOOK_LIST_URL, [["abc"]]),
+            (BORROWING_LIST_URL, [1, 1]),
+            # ValidationError of a date
+            (BORROWING_LIST_URL, ["x", "y"]),
+        ):
+            with self.subTest(url=url, position=position):
+                res = self.client.get(url, {"cursor": encode_cursor(position)})
+
+                self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_number_pagination_is_default(self):
+        get_sample_book()
+
+        res = self.client.get(BOOK_LIST_URL)
+
+        self.assertEqual(res.data["count"], 1)
+
+        self.assertEqual(res.data["count_type"], "exact")
+
+
+class CountModePaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="test_admin_user",
+            password="testpass",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.user)
+        book = get_sample_book()
+        self.borrowings = [
+            get_sample_borrowing(book=book, user=self.user) for _ in range(3)
+        ]
+
+    def get_list(self, params):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(BORROWING_LIST_URL, params)
+
+        num_count_queries = sum(
+            "COUNT(" in query["sql"].upper() for query in queries
+        )
+        return res, num_count_queries
+
+    def test_count_none_detects_next_page_without_count(self):
+        first_page, num_count_queries = self.get_list(
+            {"count": "none", "page_size": 2}
+        )
+        last_page = self.client.get(first_page.data["next"])
+
+        self.assertEqual(num_count_queries, 0)
+        self.assertIsNone(first_page.data["count"])
+        self.assertEqual(first_page.data["count_type"], "none")
+        self.assertEqual(len(first_page.data["results"]), 2)
+        self.assertEqual(len(last_page.data["results"]), 1)
+        self.assertIsNone(last_page.data["next"])
+        self.assertIsNotNone(last_page.data["previous"])
+
+    def test_count_cached_is_reused(self):
+        first_res, first_num_count_queries = self.get_list({"count": "cached"})
+        get_sample_borrowing(user=self.user)
+        res, num_count_queries = self.get_list({"count": "cached"})
+
+        self.assertEqual(first_num_count_queries, 1)
+        self.assertEqual(num_count_queries, 0)
+        self.assertEqual(res.data["count"], 3)
+        self.assertEqual(res.data["count_type"], "cached")
+        self.assertEqual(len(res.data["results"]), 4)
+
+    def test_count_estimated(self):
+        res, _ = self.get_list({"count": "estimated"})
+
+        if connection.vendor == "postgresql":
+            self.assertEqual(res.data["count_type"], "estimated")
+        else:
+            # No planner estimates on SQLite
+            self.assertEqual(res.data["count_type"], "cached")
+            self.assertEqual(res.data["count"], 3)
+
+    def test_count_none_page_out_of_range_returns_not_found(self):
+        res = self.client.get(BORROWING_LIST_URL, {"count": "none", "page": 5})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_count_modes_of_empty_queryset(self):
+        # Search of no words returns an empty queryset
+        for count_type in ("estimated", "cached"):
+            with self.subTest(count_type=count_type):
+                res = self.client.get(
+                    BOOK_LIST_URL, {"q": "!!!", "count": count_type}
+                )
+
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+                self.assertEqual(res.data["count"], 0)
+                self.assertEqual(res.data["results"], [])
@@ -0,0 +1,170 @@
+from urllib.parse import urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import resolve, reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from borrowings.models import Reservation
+from tests.test_book_api import get_sample_book
+from tests.test_borrowing_api import get_sample_borrowing
+from tests.test_user_api import get_sample_user
+
+
+class QueryBudgetTestCase(TestCase):
+    """
+    assertWithinQueryBudget() requests the endpoint after seeding
+    more and more objects and fails when its action runs more queries
+    than declared with @query_budget at any of the sizes.
+    """
+
+    sizes = (1, 10, 50)
+
+    @staticmethod
+    def get_query_budget(url, method="get"):
+        match = resolve(urlsplit(url).path)
+        # Plain API views have no viewset actions
+        actions = getattr(match.func, "actions", None) or {method: method}
+        view_action = getattr(match.func.cls, actions[method])
+        return view_action.query_budget
+
+    def assertWithinQueryBudget(self, url, seed, params=None):
+        budget = self.get_query_budget(url)
+        params = {"page_size": 100, **(params or {})}
+
+        for size in self.sizes:
+            seed(size)
+            # Do not count responses served from the cache
+            cache.clear()
+
+            res = self.client.get(url, params)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(
+                res.query_count,
+                budget,
+                msg=f"{url} ran {res.query_count} queries with {size} "
+                f"more objects, over the budget of {budget}",
+            )
+
+
+class AdminQueryBudgetTests(QueryBudgetTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_sample_user(is_staff=True)
+        self.client.force_authenticate(self.user)
+
+    @staticmethod
+    def seed_books(size):
+        for _ in range(size):
+            get_sample_book()
+
+    @staticmethod
+    def seed_borrowings(size):
+        for _ in range(size):
+            get_sample_borrowing()
+
+    @staticmethod
+    def seed_users(size):
+        for _ in range(size):
+            get_sample_user()
+
+    def test_book_list(self):
+        self.assertWithinQueryBudget(
+            reverse("books:book-list"), self.seed_books
+        )
+
+    def test_book_list_search(self):
+        self.assertWithinQueryBudget(
+            reverse("books:book-list"), self.seed_books, {"q": "sample"}
+        )
+
+    def test_book_list_cursor_pagination(self):
+        self.assertWithinQueryBudget(
+            reverse("books:book-list"),
+            self.seed_books,
+            {"pagination": "cursor"},
+        )
+
+    def test_book_detail(self):
+        book = get_sample_book()
+
+        self.assertWithinQueryBudget(
+            reverse("books:book-detail", args=[book.id]), self.seed_books
+        )
+
+    def test_borrowing_list(self):
+        self.assertWithinQueryBudget(
+            reverse("borrowings:borrowing-list"), self.seed_borrowings
+        )
+
+    def test_borrowing_detail(self):
+        borrowing = get_sample_borrowing()
+
+        self.assertWithinQueryBudget(
+            reverse("borrowings:borrowing-detail", args=[borrowing.id]),
+            self.seed_borrowings,
+        )
+
+    def test_user_list(self):
+        self.assertWithinQueryBudget(
+            reverse("users:user-list"), self.seed_users, {"search": "user"}
+        )
+
+    def test_user_detail(self):
+        user = get_sample_user()
+
+        def seed(size):
+            for _ in range(size):
+                get_sample_borrowing(user=user)
+
+        self.assertWithinQueryBudget(
+            reverse("users:user-detail", args=[user.id]), seed
+        )
+
+
+class AuthenticatedQueryBudgetTests(QueryBudgetTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="test_user",
+            password="testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+    def seed_own_borrowings(self, size):
+        for _ in range(size):
+            get_sample_borrowing(user=self.user)
+
+    def test_own_borrowing_list(self):
+        self.assertWithinQueryBudget(
+            reverse("borrowings:borrowing-list"),
+            self.seed_own_borrowings,
+            {"is_active": "true"},
+        )
+
+    def test_own_profile(self):
+        self.assertWithinQueryBudget(
+            reverse("users:user-detail", args=["me"]),
+            self.seed_own_borrowings,
+        )
+
+    def test_own_reservation_list(self):
+        def seed(size):
+            for _ in range(size):
+                Reservation.objects.create(
+                    user=self.user, book=get_sample_book(total_amount=0)
+                )
+
+        self.assertWithinQueryBudget(
+            reverse("borrowings:reservation-list"), seed
+        )
+
+    def test_own_dashboard(self):
+        def seed(size):
+            for _ in range(size):
+                get_sample_borrowing(user=self.user)
+
+        self.assertWithinQueryBudget(reverse("users:dashboard"), seed)
@@ -0,0 +1,129 @@
+import re
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.utils.timezone import now
+
+from books.models import Book
+from borrowings.models import Borrowing
+from borrowings.views import annotate_borrowing_is_overdue
+from users.search import search_users
+from users.views import annotate_user_num_borrowings
+
+# Enough users for SQLite to prefer the search index to a table scan
+NUM_USERS = 1000
+NUM_BOOKS = 50
+NUM_BORROWINGS = 2000
+
+
+def get_full_scan_pattern(table: str) -> str:
+    if connection.vendor == "postgresql":
+        return rf"Seq Scan on {table}\b"
+
+    # SQLite reports indexed lookups as SEARCH and full scans as SCAN
+    return rf"\bSCAN (TABLE )?{table}\b"
+
+
+class QueryPlanTests(TestCase):
+    """
+    Hot querysets must be served by indexes on a seeded dataset.
+    A failure means a full table scan is back in the plan.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        today = now().date()
+
+        cls.users = get_user_model().objects.bulk_create(
+            get_user_model()(username=f"user{i}", email=f"user{i}@user.com")
+            for i in range(NUM_USERS)
+        )
+        cls.books = Book.objects.bulk_create(
+            Book(
+                title=f"Sample book {i}",
+                author="Name Surname",
+                cover="H",
+                total_amount=10,
+                inventory=i % 5,
+                daily_fee="0.10",
+            )
+            for i in range(NUM_BOOKS)
+        )
+        # Most of the borrowings are history
+        Borrowing.objects.bulk_create(
+            Borrowing(
+                user=cls.users[i % NUM_USERS],
+                book=cls.books[i % NUM_BOOKS],
+                borrow_date=today - timedelta(weeks=2),
+                expected_return_date=today + timedelta(days=i % 30 - 15),
+                is_active=i % 10 == 0,
+            )
+            for i in range(NUM_BORROWINGS)
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def setUp(self):
+        if connection.vendor == "postgresql":
+            # Seeded tables are small enough for a sequential scan to win
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertNoFullScan(self, queryset, table):
+        plan = queryset.explain()
+
+        self.assertIsNone(
+            re.search(get_full_scan_pattern(table), plan),
+            msg=f"Full scan of {table}:\n{plan}",
+        )
+        return plan
+
+    def test_active_borrowings_of_user(self):
+        queryset = annotate_borrowing_is_overdue(
+            Borrowing.objects.filter(user=self.users[0], is_active=True)
+        )
+
+        plan = self.assertNoFullScan(queryset, "borrowings_borrowing")
+
+        self.assertIn("borrowing_user_active_idx", plan)
+
+    def test_overdue_borrowings(self):
+        tomorrow = now().date() + timedelta(days=1)
+        queryset = Borrowing.objects.filter(
+            is_active=True, expected_return_date__lte=tomorrow
+        )
+
+        plan = self.assertNoFullScan(queryset, "borrowings_borrowing")
+
+        self.assertIn("borrowing_active_due_idx", plan)
+
+    def test_active_borrowings_of_book(self):
+        # Inventory recount in Book.save()
+        queryset = self.books[0].borrowings.filter(is_active=True)
+
+        plan = self.assertNoFullScan(queryset, "borrowings_borrowing")
+
+        self.assertIn("borrowing_book_active_idx", plan)
+
+    def test_not_available_books(self):
+        queryset = Book.objects.filter(inventory__exact=0)
+
+        plan = self.assertNoFullScan(queryset, "books_book")
+
+        self.assertIn("book_inventory_idx", plan)
+
+    def test_user_detail_with_num_borrowings(self):
+        queryset = annotate_user_num_borrowings(
+            get_user_model().objects.filter(pk=self.users[0].pk)
+        )
+
+        self.assertNoFullScan(queryset, "users_user")
+        self.assertNoFullScan(queryset, "borrowings_borrowing")
+
+    def test_user_search(self):
+        queryset = search_users(get_user_model().objects.all(), "user1")
+
+        self.assertNoFullScan(queryset, "users_user")
@@ -0,0 +1,261 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.models import Book
+from borrowings.models import Borrowing, Notification, Reservation
+from borrowings.reservations import expire_holds
+from borrowings.services import borrow_book, return_borrowing
+from tests.test_book_api import get_sample_book
+from tests.test_user_api import get_sample_user
+
+RESERVATION_LIST_URL = reverse("borrowings:reservation-list")
+
+
+def get_reserve_url(book_id):
+    return reverse("books:book-reserve", args=[book_id])
+
+
+def get_cancel_url(reservation_id):
+    return reverse("borrowings:reservation-cancel", args=[reservation_id])
+
+
+class ReservationQueueTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_sample_user()
+        self.client.force_authenticate(self.user)
+
+        self.book = get_sample_book(total_amount=1)
+        self.borrowing = borrow_book(get_sample_user(), self.book.id)
+
+    def reserve(self, user):
+        self.client.force_authenticate(user)
+        res = self.client.post(get_reserve_url(self.book.id))
+        self.client.force_authenticate(self.user)
+        return res
+
+    def test_reserve_book_with_no_copies_left(self):
+        res = self.reserve(self.user)
+        other_res = self.reserve(get_sample_user())
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["status"], "waiting")
+        self.assertEqual(res.data["position"], 1)
+        self.assertEqual(other_res.data["position"], 2)
+
+    def test_reserve_available_book_not_allowed(self):
+        book = get_sample_book()
+
+        res = self.client.post(get_reserve_url(book.id))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_reserve_book_twice_not_allowed(self):
+        self.reserve(self.user)
+
+        res = self.reserve(self.user)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_reserve_not_existing_book(self):
+        res = self.client.post(get_reserve_url(999))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_returned_copy_is_held_for_first_reservation(self):
+        self.reserve(self.user)
+        self.reserve(get_sample_user())
+
+        return_borrowing(self.borrowing.id)
+        self.book.refresh_from_db()
+        first, second = Reservation.objects.order_by("id")
+
+        self.assertEqual(self.book.inventory, 0)
+        self.assertEqual(first.status, "held")
+        self.assertGreater(first.held_until, now())
+        self.assertEqual(second.status, "waiting")
+        self.assertTrue(
+            Notification.objects.filter(kind="reservation_held").exists()
+        )
+
+    def test_held_copy_does_not_change_inventory_in_notifications(self):
+        self.reserve(self.user)
+
+        return_borrowing(self.borrowing.id)
+        borrow_book(self.user, self.book.id)
+        returned, borrowed = Notification.objects.filter(
+            kind__in=("borrowing_returned", "borrowing_created")
+        ).order_by("id")[1:]
+
+        self.assertEqual(returned.payload["items"][0]["inventory_change"], 0)
+        self.assertIn("held for the next reservation", returned.text)
+        self.assertEqual(borrowed.payload["items"][0]["inventory_change"], 0)
+        self.assertIn("held for the user's reservation", borrowed.text)
+
+    def test_held_copy_is_borrowed_only_by_its_user(self):
+        self.reserve(self.user)
+        return_borrowing(self.borrowing.id)
+
+        other_user_res = self.reserve(get_sample_user())
+        self.client.force_authenticate(get_sample_user())
+        other_borrow_res = self.client.get(
+            reverse("books:book-borrow-toggle", args=[self.book.id])
+        )
+        self.client.force_authenticate(self.user)
+        res = self.client.get(
+            reverse("books:book-borrow-toggle", args=[self.book.id])
+        )
+
+        self.assertEqual(other_user_res.data["position"], 1)
+        self.assertEqual(
+            other_borrow_res.status_code, status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            Reservation.objects.get(user=self.user).status, "fulfilled"
+        )
+        self.assertTrue(
+            Borrowing.objects.filter(user=self.user, is_active=True).exists()
+        )
+
+    def test_borrow_without_held_copy_fulfils_waiting_reservation(self):
+        self.reserve(self.user)
+        # A copy added to inventory before it is held for the queue
+        Book.objects.filter(id=self.book.id).update(inventory=1)
+
+        borrowing = borrow_book(self.user, self.book.id)
+        return_borrowing(self.borrowing.id)
+        self.book.refresh_from_db()
+
+        self.assertEqual(borrowing.user, self.user)
+        self.assertEqual(Reservation.objects.get().status, "fulfilled")
+        self.assertEqual(self.book.inventory, 1)
+
+    def test_cancel_held_reservation_passes_copy_on(self):
+        self.reserve(self.user)
+        other_user = get_sample_user()
+        self.reserve(other_user)
+        return_borrowing(self.borrowing.id)
+        reservation = Reservation.objects.get(user=self.user)
+
+        res = self.client.post(get_cancel_url(reservation.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["status"], "cancelled")
+        self.assertEqual(
+            Reservation.objects.get(user=other_user).status, "held"
+        )
+
+    def test_cancel_closed_reservation(self):
+        self.reserve(self.user)
+        reservation = Reservation.objects.get()
+        self.client.post(get_cancel_url(reservation.id))
+
+        res = self.client.post(get_cancel_url(reservation.id))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cancel_not_own_reservation_not_found(self):
+        self.reserve(get_sample_user())
+        reservation = Reservation.objects.get()
+
+        res = self.client.post(get_cancel_url(reservation.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(Reservation.objects.get().status, "waiting")
+
+    def test_expired_hold_goes_back_to_inventory(self):
+        self.reserve(self.user)
+        return_borrowing(self.borrowing.id)
+        Reservation.objects.update(held_until=now() - timedelta(minutes=1))
+
+        self.assertEqual(expire_holds(), 1)
+        self.book.refresh_from_db()
+
+        self.assertEqual(Reservation.objects.get().status, "expired")
+        self.assertEqual(self.book.inventory, 1)
+
+    def test_command_holds_copies_added_to_inventory(self):
+        self.reserve(self.user)
+        self.book.total_amount = 2
+        self.book.save()
+
+        call_command("process_reservations", "--once", stdout=StringIO())
+        self.book.refresh_from_db()
+
+        self.assertEqual(Reservation.objects.get().status, "held")
+        self.assertEqual(self.book.inventory, 0)
+
+    def test_book_save_keeps_held_copies_out_of_inventory(self):
+        self.reserve(self.user)
+        return_borrowing(self.borrowing.id)
+
+        book = Book.objects.get(id=self.book.id)
+        book.save()
+
+        self.assertEqual(book.inventory, 0)
+
+
+class ReservationListApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_sample_user()
+        self.client.force_authenticate(self.user)
+
+        self.book = get_sample_book(total_amount=0)
+        self.other_book = get_sample_book(total_amount=0)
+        self.other_user_reservation = Reservation.objects.create(
+            user=get_sample_user(), book=self.book
+        )
+        self.reservation = Reservation.objects.create(
+            user=self.user, book=self.book
+        )
+        Reservation.objects.create(user=self.user, book=self.other_book)
+
+    def test_list_own_reservations(self):
+        res = self.client.get(RESERVATION_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 2)
+        self.assertEqual(res.data["results"][0]["id"], self.reservation.id)
+        self.assertEqual(res.data["results"][0]["position"], 2)
+
+    def test_filter_reservations_by_book(self):
+        res = self.client.get(RESERVATION_LIST_URL, {"book_id": self.book.id})
+
+        self.assertEqual(
+            [reservation["id"] for reservation in res.data["results"]],
+            [self.reservation.id],
+        )
+
+    def test_staff_user_lists_book_queue(self):
+        self.client.force_authenticate(get_sample_user(is_staff=True))
+
+        res = self.client.get(
+            RESERVATION_LIST_URL,
+            {"book_id": self.book.id, "status": "waiting"},
+        )
+
+        self.assertEqual(
+            [reservation["position"] for reservation in res.data["results"]],
+            [1, 2],
+        )
+
+    def test_retrieve_not_own_reservation_not_found(self):
+        res = self.client.get(
+            reverse(
+                "borrowings:reservation-detail",
+                args=[self.other_user_reservation.id],
+            )
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,119 @@
+import os
+import sqlite3
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from library_api.throttling import (
+    SlidingWindowStore,
+    UserRateThrottle,
+    throttle_store,
+)
+from library_api.views import ApiRootView
+from tests.test_user_api import get_sample_user
+
+API_ROOT_URL = reverse("api_root")
+
+
+class SlidingWindowStoreTests(TestCase):
+    def setUp(self):
+        self.store = SlidingWindowStore(":memory:")
+
+    def test_requests_over_limit_not_allowed(self):
+        allowed = [
+            self.store.hit("key", limit=3, duration=60, now=10)[0]
+            for _ in range(4)
+        ]
+
+        self.assertEqual(allowed, [True, True, True, False])
+
+    def test_previous_window_is_weighted_by_overlap(self):
+        for _ in range(4):
+            self.store.hit("key", limit=4, duration=60, now=10)
+
+        # 3/4 of the previous window still overlap: 4 * 0.75 = 3
+        allowed, count, previous_count, _ = self.store.hit(
+            "key", limit=4, duration=60, now=75
+        )
+        denied = self.store.hit("key", limit=4, duration=60, now=75)[0]
+
+        self.assertTrue(allowed)
+        self.assertEqual((count, previous_count), (1, 4))
+        self.assertFalse(denied)
+
+    def test_old_windows_are_forgotten(self):
+        for _ in range(3):
+            self.store.hit("key", limit=3, duration=60, now=10)
+
+        allowed, count, previous_count, _ = self.store.hit(
+            "key", limit=3, duration=60, now=200
+        )
+
+        self.assertTrue(allowed)
+        self.assertEqual((count, previous_count), (1, 0))
+
+    def test_counters_are_shared_by_stores_of_one_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "throttle.sqlite3")
+            # Stores of different worker processes
+            store = SlidingWindowStore(path)
+            other_store = SlidingWindowStore(path)
+
+            store.hit("key", limit=2, duration=60, now=10)
+            store.hit("key", limit=2, duration=60, now=10)
+            allowed = other_store.hit("key", limit=2, duration=60, now=10)[0]
+
+        self.assertFalse(allowed)
+
+    def test_store_uses_throttle_database_setting(self):
+        store = SlidingWindowStore()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "throttle.sqlite3")
+
+            with override_settings(THROTTLE_DATABASE=path):
+                store.hit("key", limit=2, duration=60, now=10)
+                store.connection.close()
+
+            self.assertTrue(os.path.exists(path))
+
+
+class TwoPerMinuteUserThrottle(UserRateThrottle):
+    rate = "2/min"
+
+
+class ThrottledApiTests(TestCase):
+    def setUp(self):
+        throttle_store.clear()
+        self.user = get_sample_user()
+        self.view = ApiRootView.as_view(
+            throttle_classes=(TwoPerMinuteUserThrottle,)
+        )
+
+    def get(self):
+        request = APIRequestFactory().get(API_ROOT_URL)
+        force_authenticate(request, self.user)
+        return self.view(request)
+
+    def test_user_requests_over_rate_are_throttled(self):
+        statuses = [self.get().status_code for _ in range(2)]
+        res = self.get()
+
+        self.assertEqual(statuses, [status.HTTP_200_OK, status.HTTP_200_OK])
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertGreater(int(res["Retry-After"]), 0)
+
+    def test_requests_are_allowed_when_counters_are_not_available(self):
+        with mock.patch.object(
+            throttle_store,
+            "hit",
+            side_effect=sqlite3.OperationalError("database is locked"),
+        ):
+            with self.assertLogs("library_api.throttling", "ERROR"):
+                statuses = [self.get().status_code for _ in range(3)]
+
+        self.assertEqual(statuses, [status.HTTP_200_OK] * 3)
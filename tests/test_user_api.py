@@ -1,15 +1,24 @@
+import io
 import json
+import os
+import tempfile
+from unittest import mock
 
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 
+from users.importers import UserImport
 from users.models import User
 from users.serializers import (
     UserDetailSerializer,
     UserListSerializer,
+    UserListValuesSerializer,
 )
 from users.views import annotate_user_num_borrowings
 
@@ -39,6 +48,25 @@ def get_annotated_user_instance(user_id: int) -> User:
     return queryset.get(id=user_id)
 
 
+class UserListValuesSerializerTests(TestCase):
+    def test_output_is_identical_to_user_list_serializer(self):
+        get_sample_user()
+        get_sample_user(first_name="", last_name="Ørsted")
+        users = annotate_user_num_borrowings(
+            get_user_model().objects.order_by("id")
+        )
+
+        values_serializer = UserListValuesSerializer(
+            UserListValuesSerializer.get_queryset(users)
+        )
+        serializer = UserListSerializer(users, many=True)
+
+        self.assertEqual(
+            JSONRenderer().render(values_serializer.data),
+            JSONRenderer().render(serializer.data),
+        )
+
+
 class UnauthenticatedUserApiTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -148,7 +176,7 @@ class AdminUserApiTests(TestCase):
         get_sample_user()
 
         res = self.client.get(USER_LIST_URL)
-        users = get_user_model().objects.all()
+        users = annotate_user_num_borrowings(get_user_model().objects.all())
         serializer = UserListSerializer(users, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
@@ -159,15 +187,45 @@ class AdminUserApiTests(TestCase):
         user3 = get_sample_user()
 
         res = self.client.get(USER_LIST_URL, {"search": "Es"})
-        serializer1 = UserListSerializer(self.user, many=False)
-        serializer2 = UserListSerializer(user2, many=False)
-        serializer3 = UserListSerializer(user3, many=False)
+        serializer1 = UserListSerializer(
+            get_annotated_user_instance(self.user.id), many=False
+        )
+        serializer2 = UserListSerializer(
+            get_annotated_user_instance(user2.id), many=False
+        )
+        serializer3 = UserListSerializer(
+            get_annotated_user_instance(user3.id), many=False
+        )
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertIn(serializer1.data, res.json()["results"])
         self.assertIn(serializer2.data, res.json()["results"])
         self.assertNotIn(serializer3.data, res.json()["results"])
 
+    def test_search_user_list_is_ranked(self):
+        substring_match = get_sample_user(username="the_anna")
+        prefix_match = get_sample_user(first_name="Annabel")
+        exact_match = get_sample_user(username="ANNA")
+        get_sample_user(username="bob")
+
+        res = self.client.get(USER_LIST_URL, {"search": "anna"})
+
+        self.assertEqual(
+            [user["id"] for user in res.data["results"]],
+            [exact_match.id, prefix_match.id, substring_match.id],
+        )
+
+    def test_search_user_list_reflects_updated_name(self):
+        user = get_sample_user(last_name="Smith")
+        user.last_name = "Ørsted"
+        user.save()
+
+        res = self.client.get(USER_LIST_URL, {"search": "rsted"})
+        old_name_res = self.client.get(USER_LIST_URL, {"search": "smith"})
+
+        self.assertEqual([row["id"] for row in res.data["results"]], [user.id])
+        self.assertEqual(old_name_res.data["results"], [])
+
     def test_get_other_user_detail(self):
         user = get_sample_user()
 
@@ -230,3 +288,101 @@ class AdminUserApiTests(TestCase):
         res = self.client.delete(USER_DETAIL_2_URL)
 
         self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ImportUsersCommandTests(TestCase):
+    def import_users(self, content, suffix=".csv"):
+        with tempfile.NamedTemporaryFile(
+            "wb" if isinstance(content, bytes) else "w",
+            suffix=suffix,
+            delete=False,
+        ) as file:
+            file.write(content)
+
+        stderr = io.StringIO()
+        call_command(
+            "import_users",
+            file.name,
+            batch_size=2,
+            workers=2,
+            stdout=io.StringIO(),
+            stderr=stderr,
+        )
+        os.remove(file.name)
+        return stderr.getvalue()
+
+    def test_import_users_with_tokens(self):
+        self.import_users(
+            "username,email,password,first_name,last_name\n"
+            + "".join(
+                f"pupil{i},pupil{i}@school.com,pass{i}word,Ann,Lee\n"
+                for i in range(5)
+            )
+        )
+        user = User.objects.get(username="pupil4")
+
+        self.assertEqual(User.objects.count(), 5)
+        self.assertEqual(Token.objects.count(), 5)
+        self.assertTrue(user.check_password("pass4word"))
+        self.assertEqual(user.first_name, "Ann")
+        self.assertTrue(Token.objects.filter(user=user).exists())
+
+    def test_import_users_rejects_invalid_rows(self):
+        get_sample_user(username="taken")
+
+        errors = self.import_users(
+            '{"username": "taken", "email": "a@school.com", '
+            '"password": "secret"}\n'
+            '{"username": "first", "email": "b@school.com", '
+            '"password": "secret"}\n'
+            '{"username": "second", "email": "b@school.com", '
+            '"password": "secret"}\n'
+            '{"username": "short", "email": "c@school.com", '
+            '"password": "123"}\n'
+            "not json\n",
+            suffix=".jsonl",
+        )
+
+        self.assertEqual(
+            list(User.objects.order_by("id").values_list("username")),
+            [("taken",), ("first",)],
+        )
+        self.assertEqual(Token.objects.count(), 1)
+        self.assertEqual(errors.count("Line "), 4)
+        self.assertNotIn("Line 2:", errors)
+
+    def test_import_users_rejects_rows_not_in_utf8(self):
+        errors = self.import_users(
+            b"username,email,password\n"
+            b"first,a@school.com,secret\n"
+            b"\xff\xfe,b@school.com,secret\n"
+            b"third,c@school.com,secret\n"
+        )
+
+        self.assertEqual(User.objects.count(), 2)
+        self.assertEqual(errors.count("Line "), 1)
+        self.assertIn("Line 3:", errors)
+
+    def test_import_users_rejects_users_registered_meanwhile(self):
+        get_sample_user(username="taken")
+        get_sample_user(username="other", email="taken@school.com")
+
+        # Users registered after the duplicates check of the batch
+        with mock.patch.object(
+            UserImport, "reject_duplicates", lambda self, batch: batch
+        ):
+            errors = self.import_users(
+                "username,email,password\n"
+                "first,a@school.com,secret\n"
+                "taken,b@school.com,secret\n"
+                "second,taken@school.com,secret\n"
+                "third,c@school.com,secret\n"
+            )
+
+        self.assertEqual(
+            set(User.objects.values_list("username", flat=True)),
+            {"taken", "other", "first", "third"},
+        )
+        self.assertEqual(Token.objects.count(), 2)
+        self.assertIn("Line 3: {'username'", errors)
+        self.assertIn("Line 4: {'email'", errors)
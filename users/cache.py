@@ -0,0 +1,39 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def get_dashboard_version_key(user_id) -> str:
+    return f"users:dashboard_version:{user_id}"
+
+
+def get_dashboard_version(user_id) -> int:
+    key = get_dashboard_version_key(user_id)
+    version = cache.get(key)
+
+    if version is None:
+        # Start from the current time, so that a counter evicted from
+        # the cache never comes back to a version used before.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+
+    return version
+
+
+def _increment_dashboard_version(user_id):
+    try:
+        cache.incr(get_dashboard_version_key(user_id))
+    except ValueError:
+        get_dashboard_version(user_id)
+
+
+def bump_dashboard_version(user_id):
+    """
+    Invalidate the cached dashboard of the user.
+
+    The version is bumped once more after the commit, so that a dashboard
+    cached by a concurrent request before the commit is not reused.
+    """
+    _increment_dashboard_version(user_id)
+    transaction.on_commit(lambda: _increment_dashboard_version(user_id))
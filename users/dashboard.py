@@ -0,0 +1,65 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.utils.timezone import now
+
+from borrowings.models import Borrowing
+from borrowings.services import CENTS, annotate_borrowing_running_fee
+from borrowings.views import annotate_borrowing_is_overdue
+from library_api.settings import DASHBOARD_CACHE_TIMEOUT
+from users.cache import get_dashboard_version
+from users.serializers import DashboardSerializer
+
+
+def build_dashboard(user, date) -> dict:
+    """
+    Profile of the user with active borrowings, their books and
+    overdue fees on the `date`, fetched with a single query.
+    """
+
+    borrowings = list(
+        annotate_borrowing_running_fee(
+            annotate_borrowing_is_overdue(
+                Borrowing.objects.filter(user=user, is_active=True)
+            ),
+            date,
+        )
+        .select_related("book")
+        .order_by("expected_return_date", "id")
+    )
+
+    # Counters are taken from the borrowings, not from the user,
+    # which may come from the token authentication cache
+    user.num_active_borrowings = len(borrowings)
+    user.num_overdue_borrowings = sum(
+        borrowing.is_overdue for borrowing in borrowings
+    )
+    overdue_fee_total = sum(
+        (borrowing.money_to_pay for borrowing in borrowings), Decimal("0")
+    )
+
+    return DashboardSerializer(
+        {
+            "user": user,
+            "active_borrowings": borrowings,
+            "overdue_fee_total": overdue_fee_total.quantize(CENTS),
+        }
+    ).data
+
+
+def get_dashboard(user) -> dict:
+    """
+    Dashboard of the user, cached until the user borrows or returns
+    a book or the profile changes. Overdue flags and fees are counted
+    for today, so the cached dashboard expires at midnight too.
+    """
+
+    today = now().date()
+    key = f"users:dashboard:{user.id}:{get_dashboard_version(user.id)}:{today}"
+    dashboard = cache.get(key)
+
+    if dashboard is None:
+        dashboard = build_dashboard(user, today)
+        cache.set(key, dashboard, DASHBOARD_CACHE_TIMEOUT)
+
+    return dashboard
@@ -0,0 +1,206 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import ValidationError
+
+from library_api.importers import ImportResult
+from users.serializers import UserImportSerializer
+
+
+def setup_hashing_worker():
+    # Workers started with "spawn" do not inherit configured Django
+    django.setup()
+
+
+def hash_passwords(passwords):
+    return [make_password(password) for password in passwords]
+
+
+def split(items, num_chunks):
+    if not items:
+        return []
+
+    chunk_size = -(-len(items) // num_chunks)
+    return [
+        items[start : start + chunk_size]
+        for start in range(0, len(items), chunk_size)
+    ]
+
+
+class UserImport:
+    """
+    Validate rows with UserImportSerializer rules and insert users
+    with their auth tokens in batches with bulk_create(), bypassing
+    User.save() and signals.
+
+    PBKDF2 hashing dominates the import, so passwords of a batch are
+    hashed across a pool of `workers` processes while the previous
+    batch is being inserted.
+    """
+
+    def __init__(self, pool, workers, batch_size):
+        self.pool = pool
+        self.workers = workers
+        self.batch_size = batch_size
+        self.serializer = UserImportSerializer()
+        self.result = ImportResult()
+        self.usernames = set()
+        self.emails = set()
+
+    def run(self, rows) -> ImportResult:
+        batch = []
+        pending = None
+
+        for line, row in rows:
+            if row is None:
+                self.result.add_error(
+                    line, {"non_field_errors": ["Invalid row."]}
+                )
+                continue
+
+            try:
+                data = self.serializer.run_validation(row)
+            except ValidationError as error:
+                self.result.add_error(line, error.detail)
+                continue
+
+            data["username"] = get_user_model().normalize_username(
+                data["username"]
+            )
+            data["email"] = get_user_model().objects.normalize_email(
+                data.get("email", "")
+            )
+            batch.append((line, data))
+
+            if len(batch) >= self.batch_size:
+                pending = self.flush(batch, pending)
+                batch = []
+
+        pending = self.flush(batch, pending)
+        self.save_batch(*pending)
+
+        return self.result
+
+    def flush(self, batch, pending):
+        """Start hashing the batch and save the previous one meanwhile"""
+
+        batch = self.reject_duplicates(batch)
+        passwords = [data.pop("password") for _, data in batch]
+        hashing = [
+            self.pool.submit(hash_passwords, chunk)
+            for chunk in split(passwords, self.workers)
+        ]
+
+        if pending is not None:
+            self.save_batch(*pending)
+
+        return batch, hashing
+
+    def reject_duplicates(self, batch):
+        if not batch:
+            return batch
+
+        usernames = {data["username"] for _, data in batch}
+        emails = {data["email"] for _, data in batch}
+
+        existing_users = (
+            get_user_model()
+            .objects.filter(username__in=usernames)
+            .values_list("username", flat=True)
+        )
+        existing_emails = (
+            get_user_model()
+            .objects.filter(email__in=emails)
+            .values_list("email", flat=True)
+        )
+        self.usernames.update(existing_users)
+        self.emails.update(existing_emails)
+
+        unique_batch = []
+
+        for line, data in batch:
+            if data["username"] in self.usernames:
+                self.result.add_error(
+                    line,
+                    {
+                        "username": [
+                            "A user with that username already exists."
+                        ]
+                    },
+                )
+                continue
+
+            if data["email"] in self.emails:
+                self.result.add_error(
+                    line,
+                    {"email": ["A user with that email already exists."]},
+                )
+                continue
+
+            self.usernames.add(data["username"])
+            self.emails.add(data["email"])
+            unique_batch.append((line, data))
+
+        return unique_batch
+
+    def save_batch(self, batch, hashing):
+        hashes = [
+            password for future in hashing for password in future.result()
+        ]
+        users = [
+            (line, get_user_model()(**data, password=password))
+            for (line, data), password in zip(batch, hashes)
+        ]
+
+        try:
+            self.insert_users([user for _, user in users])
+        except IntegrityError:
+            # Users registered since the duplicates check collide,
+            # the batch is saved row by row to reject only them
+            for line, user in users:
+                try:
+                    self.insert_users([user])
+                except IntegrityError:
+                    self.reject_taken_user(line, user)
+                else:
+                    self.result.created += 1
+        else:
+            self.result.created += len(users)
+
+    @staticmethod
+    def insert_users(users):
+        with transaction.atomic():
+            get_user_model().objects.bulk_create(users)
+            Token.objects.bulk_create(
+                Token(user=user, key=Token.generate_key()) for user in users
+            )
+
+    def reject_taken_user(self, line, user):
+        if get_user_model().objects.filter(username=user.username).exists():
+            self.result.add_error(
+                line,
+                {"username": ["A user with that username already exists."]},
+            )
+        else:
+            self.result.add_error(
+                line, {"email": ["A user with that email already exists."]}
+            )
+
+
+def import_users(rows, batch_size=1000, workers=None) -> ImportResult:
+    """
+    Import users from (line number, row) pairs, see UserImport.
+    Workers default to the number of CPUs.
+    """
+
+    workers = workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=setup_hashing_worker
+    ) as pool:
+        return UserImport(pool, workers, batch_size).run(rows)
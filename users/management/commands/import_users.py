@@ -0,0 +1,76 @@
+import sys
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from library_api.importers import (
+    IMPORT_FORMATS,
+    get_import_format,
+    open_text,
+    read_rows,
+)
+from users.importers import import_users
+
+
+class Command(BaseCommand):
+    """Django command to stream users from a CSV or JSONL file into db"""
+
+    help = (
+        "Import users (username, email, password, first_name, last_name) "
+        "with auth tokens from a CSV or JSONL file ('-' for stdin)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            help="File format, detected by the file extension by default.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Password hashing processes, the number of CPUs by default.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or get_import_format(path)
+
+        if file_format is None:
+            raise CommandError(
+                "Can not detect file format, use --format option."
+            )
+
+        start = time.perf_counter()
+
+        if path == "-":
+            stream = open_text(sys.stdin.buffer)
+            result = self.import_stream(stream, file_format, options)
+        else:
+            with open(path, "rb") as file:
+                result = self.import_stream(
+                    open_text(file), file_format, options
+                )
+
+        elapsed = time.perf_counter() - start
+
+        for error in result.errors:
+            self.stderr.write(f"Line {error['line']}: {error['errors']}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created: {result.created}, rejected: {result.rejected} "
+                f"in {elapsed:.1f}s "
+                f"({result.created / elapsed:.1f} users/s)"
+            )
+        )
+
+    @staticmethod
+    def import_stream(stream, file_format, options):
+        return import_users(
+            read_rows(stream, file_format),
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+        )
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.2 on 2026-10-18 04:52
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_active_borrowings(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    Borrowing = apps.get_model("borrowings", "Borrowing")
+
+    num_active_borrowings = (
+        Borrowing.objects.filter(user=OuterRef("pk"), is_active=True)
+        .order_by()
+        .values("user")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    User.objects.update(
+        num_active_borrowings=Coalesce(Subquery(num_active_borrowings), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_alter_user_email"),
+        ("borrowings", "0009_reservation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="num_active_borrowings",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(
+            count_active_borrowings, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,98 @@
+import sqlite3
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+from django.db.models.functions import Upper
+
+# Serve `username__icontains`, `first_name__icontains` and
+# `last_name__icontains` lookups, compiled to UPPER(...) LIKE UPPER(...).
+POSTGRES_INDEXES = [
+    GinIndex(
+        OpClass(Upper(field), name="gin_trgm_ops"),
+        name=f"user_{field}_trgm_idx",
+    )
+    for field in ("username", "first_name", "last_name")
+]
+
+SQLITE_CREATE_FTS = [
+    """
+    CREATE VIRTUAL TABLE users_user_fts USING fts5(
+        username, first_name, last_name,
+        content='users_user', content_rowid='id',
+        tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER users_user_fts_insert AFTER INSERT ON users_user BEGIN
+        INSERT INTO users_user_fts(rowid, username, first_name, last_name)
+        VALUES (new.id, new.username, new.first_name, new.last_name);
+    END
+    """,
+    """
+    CREATE TRIGGER users_user_fts_delete AFTER DELETE ON users_user BEGIN
+        INSERT INTO users_user_fts(
+            users_user_fts, rowid, username, first_name, last_name
+        )
+        VALUES ('delete', old.id, old.username, old.first_name, old.last_name);
+    END
+    """,
+    """
+    CREATE TRIGGER users_user_fts_update
+    AFTER UPDATE OF username, first_name, last_name ON users_user BEGIN
+        INSERT INTO users_user_fts(
+            users_user_fts, rowid, username, first_name, last_name
+        )
+        VALUES ('delete', old.id, old.username, old.first_name, old.last_name);
+        INSERT INTO users_user_fts(rowid, username, first_name, last_name)
+        VALUES (new.id, new.username, new.first_name, new.last_name);
+    END
+    """,
+    "INSERT INTO users_user_fts(users_user_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP_FTS = [
+    "DROP TRIGGER IF EXISTS users_user_fts_insert",
+    "DROP TRIGGER IF EXISTS users_user_fts_delete",
+    "DROP TRIGGER IF EXISTS users_user_fts_update",
+    "DROP TABLE IF EXISTS users_user_fts",
+]
+
+
+def create_search_index(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "postgresql":
+        for index in POSTGRES_INDEXES:
+            schema_editor.add_index(User, index)
+
+    # FTS5 trigram tokenizer is available since SQLite 3.34
+    elif vendor == "sqlite" and sqlite3.sqlite_version_info >= (3, 34):
+        for statement in SQLITE_CREATE_FTS:
+            schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "postgresql":
+        for index in POSTGRES_INDEXES:
+            schema_editor.remove_index(User, index)
+
+    elif vendor == "sqlite":
+        for statement in SQLITE_DROP_FTS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0003_user_num_active_borrowings"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -1,18 +1,22 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
-from django.urls import reverse
 
-from library_api.settings import BASE_URL
+from library_api.url_templates import get_url_template
 
 
 class User(AbstractUser):
     email = models.EmailField(unique=True, blank=True)
+    # Kept up to date by Borrowing.save() and the return path,
+    # fixed by `python manage.py reconcile_borrowing_counters`
+    num_active_borrowings = models.PositiveIntegerField(
+        default=0, editable=False
+    )
 
     def __str__(self):
         return self.get_full_name()
 
     def get_absolute_url(self):
-        return reverse("users:user-detail", kwargs={"pk": self.id})
+        return get_url_template("users:user-detail", "pk").path(pk=self.id)
 
     def get_full_absolute_url(self):
-        return f"{BASE_URL}{self.get_absolute_url()}"
+        return get_url_template("users:user-detail", "pk").url(pk=self.id)
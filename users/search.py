@@ -0,0 +1,70 @@
+import sqlite3
+
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+SQLITE_FTS_TABLE = "users_user_fts"
+# FTS5 trigram tokenizer is available since SQLite 3.34
+SQLITE_HAS_TRIGRAM = sqlite3.sqlite_version_info >= (3, 34)
+# Trigram index can only match strings of 3 and more characters
+MIN_TRIGRAM_LENGTH = 3
+
+
+def get_search_rank(query: str):
+    """Exact username match first, then prefix and then substring match"""
+
+    return Case(
+        When(username__iexact=query, then=Value(0)),
+        When(
+            Q(username__istartswith=query)
+            | Q(first_name__istartswith=query)
+            | Q(last_name__istartswith=query),
+            then=Value(1),
+        ),
+        default=Value(2),
+        output_field=IntegerField(),
+    )
+
+
+def search_users(queryset, query: str):
+    """
+    Filter users having the query in username, first or last name
+    (case insensitive) and order them by rank.
+
+    Uses trigram GIN indexes on PostgreSQL and FTS5 trigram shadow
+    table on SQLite for queries of 3 and more characters.
+    """
+
+    query = query.strip()
+
+    if not query:
+        return queryset.none()
+
+    vendor = connections[queryset.db].vendor
+
+    if (
+        vendor == "sqlite"
+        and SQLITE_HAS_TRIGRAM
+        and len(query) >= MIN_TRIGRAM_LENGTH
+    ):
+        fts_query = '"{}"'.format(query.replace('"', '""'))
+        queryset = queryset.filter(
+            id__in=RawSQL(
+                f"SELECT rowid FROM {SQLITE_FTS_TABLE} "
+                f"WHERE {SQLITE_FTS_TABLE} MATCH %s",
+                (fts_query,),
+            )
+        )
+
+    else:
+        # Served by the trigram indexes of UPPER(...) on PostgreSQL
+        queryset = queryset.filter(
+            Q(username__icontains=query)
+            | Q(first_name__icontains=query)
+            | Q(last_name__icontains=query)
+        )
+
+    return queryset.annotate(search_rank=get_search_rank(query)).order_by(
+        "search_rank", "id"
+    )
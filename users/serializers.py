@@ -1,9 +1,13 @@
 from django.contrib.auth import get_user_model
+from django.contrib.auth.validators import UnicodeUsernameValidator
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
+from borrowings.serializers import DashboardBorrowingSerializer
+from library_api.serializers import ValuesListSerializer
 from library_api.settings import BASE_URL
+from library_api.url_templates import get_url_template
 from library_api.views import reverse_with_params
 
 
@@ -31,12 +35,36 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 
+class UserImportSerializer(serializers.ModelSerializer):
+    """
+    UserSerializer rules for imported rows. Uniqueness of usernames
+    and emails is checked per batch by `users.importers`.
+    """
+
+    class Meta:
+        model = get_user_model()
+        fields = ("username", "email", "password", "first_name", "last_name")
+        extra_kwargs = {
+            "username": {"validators": [UnicodeUsernameValidator()]},
+            "email": {"validators": []},
+            "password": {"write_only": True, "min_length": 5},
+        }
+
+
 class UserListSerializer(serializers.ModelSerializer):
+    num_overdue_borrowings = serializers.IntegerField()
     detail_url = serializers.SerializerMethodField()
 
     class Meta:
         model = get_user_model()
-        fields = ("id", "first_name", "last_name", "detail_url")
+        fields = (
+            "id",
+            "first_name",
+            "last_name",
+            "num_active_borrowings",
+            "num_overdue_borrowings",
+            "detail_url",
+        )
 
     @staticmethod
     @extend_schema_field(OpenApiTypes.URI_TPL)
@@ -46,7 +74,6 @@ class UserListSerializer(serializers.ModelSerializer):
 
 class UserDetailSerializer(serializers.ModelSerializer):
     active_borrowings_url = serializers.SerializerMethodField()
-    num_active_borrowings = serializers.IntegerField()
     num_overdue_borrowings = serializers.IntegerField()
 
     class Meta:
@@ -70,3 +97,35 @@ class UserDetailSerializer(serializers.ModelSerializer):
             params={"is_active": "True", "user_id": instance.id},
         )
         return f"{BASE_URL}{user_active_borrowings_list_url}"
+
+
+class UserListValuesSerializer(ValuesListSerializer):
+    """Same output as UserListSerializer, built from values_list()"""
+
+    values = (
+        "id",
+        "first_name",
+        "last_name",
+        "num_active_borrowings",
+        "num_overdue_borrowings",
+    )
+
+    def to_representation(self, row):
+        return {
+            "id": row.id,
+            "first_name": row.first_name,
+            "last_name": row.last_name,
+            "num_active_borrowings": row.num_active_borrowings,
+            "num_overdue_borrowings": row.num_overdue_borrowings,
+            "detail_url": get_url_template("users:user-detail", "pk").url(
+                pk=row.id
+            ),
+        }
+
+
+class DashboardSerializer(serializers.Serializer):
+    user = UserDetailSerializer()
+    active_borrowings = DashboardBorrowingSerializer(many=True)
+    overdue_fee_total = serializers.DecimalField(
+        max_digits=10, decimal_places=2
+    )
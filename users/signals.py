@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from library_api.authentication import invalidate_token
+from users.cache import bump_dashboard_version
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    # Cached users must not keep old `is_staff` / `is_active` flags
+    if created or kwargs["update_fields"] == {"last_login"}:
+        return
+
+    for key in Token.objects.filter(user=instance).values_list(
+        "key", flat=True
+    ):
+        invalidate_token(key)
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_user_dashboard(sender, instance, created, **kwargs):
+    if created or kwargs["update_fields"] == {"last_login"}:
+        return
+
+    bump_dashboard_version(instance.id)
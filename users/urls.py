@@ -1,7 +1,12 @@
 from django.urls import path, include
 from rest_framework import routers
 
-from users.views import CreateUserView, CreateTokenView, UserViewSet
+from users.views import (
+    CreateUserView,
+    CreateTokenView,
+    UserDashboardView,
+    UserViewSet,
+)
 
 router = routers.DefaultRouter()
 router.register("users", UserViewSet, basename="user")
@@ -10,6 +15,7 @@ router.register("users", UserViewSet, basename="user")
 urlpatterns = [
     path("register/", CreateUserView.as_view(), name="register"),
     path("login/", CreateTokenView.as_view(), name="login"),
+    path("me/dashboard/", UserDashboardView.as_view(), name="dashboard"),
     path("", include(router.urls)),
 ]
 
@@ -1,36 +1,46 @@
 from datetime import timedelta
 
 from django.contrib.auth import get_user_model
-from django.db.models import Q, Count
 from django.utils.timezone import now
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import generics, viewsets, mixins
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
 
+from borrowings.counters import count_borrowings
 from library_api.paginators import Pagination
 from library_api.permissions import IsUserAdminOrOwnUserProfileAccessOnly
+from library_api.query_budget import query_budget
+from library_api.views import (
+    AsyncReadModelMixin,
+    ExportModelMixin,
+    ValuesListModelMixin,
+)
+from users.dashboard import get_dashboard
+from users.search import search_users
 from users.serializers import (
+    DashboardSerializer,
     UserSerializer,
     UserDetailSerializer,
     UserListSerializer,
+    UserListValuesSerializer,
 )
 
 
 def annotate_user_num_borrowings(queryset):
+    """
+    Annotate users with the number of overdue borrowings. The number
+    of active borrowings is kept on the user (`num_active_borrowings`).
+    """
+
     tomorrow = now().date() + timedelta(days=1)
 
     queryset = queryset.annotate(
-        num_active_borrowings=Count(
-            "borrowings", filter=Q(borrowings__is_active=True)
-        )
-    )
-    queryset = queryset.annotate(
-        num_overdue_borrowings=Count(
-            "borrowings",
-            filter=Q(borrowings__is_active=True)
-            & Q(borrowings__expected_return_date__lte=tomorrow),
+        num_overdue_borrowings=count_borrowings(
+            expected_return_date__lte=tomorrow
         )
     )
     return queryset
@@ -44,7 +54,24 @@ class CreateTokenView(ObtainAuthToken):
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
 
 
+class UserDashboardView(generics.GenericAPIView):
+    permission_classes = (IsAuthenticated,)
+    serializer_class = DashboardSerializer
+
+    @query_budget(1)
+    def get(self, request):
+        """
+        Profile of the current user with active borrowings, their books,
+        overdue flags and the overdue fee on today, in one request.
+        """
+
+        return Response(get_dashboard(request.user))
+
+
 class UserViewSet(
+    AsyncReadModelMixin,
+    ExportModelMixin,
+    ValuesListModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
@@ -52,6 +79,9 @@ class UserViewSet(
 ):
     permission_classes = (IsUserAdminOrOwnUserProfileAccessOnly,)
     pagination_class = Pagination
+    list_values_serializer_class = UserListValuesSerializer
+    keyset_ordering = ("id",)
+    async_actions = ("retrieve",)
     serializer_class = UserSerializer
     queryset = get_user_model().objects.all()
 
@@ -67,17 +97,13 @@ class UserViewSet(
     def get_queryset(self):
         queryset = get_user_model().objects.all()
 
-        if self.action == "list":
+        if self.action in ("list", "export"):
             search_string = self.request.query_params.get("search", None)
 
             if search_string:
-                queryset = queryset.filter(
-                    Q(username__icontains=search_string)
-                    | Q(first_name__icontains=search_string)
-                    | Q(last_name__icontains=search_string)
-                ).distinct()
+                queryset = search_users(queryset, search_string)
 
-        if self.action == "retrieve":
+        if self.action in ("list", "export", "retrieve"):
             queryset = annotate_user_num_borrowings(queryset)
 
         return queryset
@@ -87,15 +113,25 @@ class UserViewSet(
             self.kwargs["pk"] = self.request.user.pk
         return super(UserViewSet, self).get_object()
 
+    async def aget_object(self):
+        if self.kwargs.get("pk", None) == "me":
+            self.kwargs["pk"] = self.request.user.pk
+        return await super().aget_object()
+
     # Only for documentation purposes
     @extend_schema(
         parameters=[
             OpenApiParameter(
                 name="search",
                 type=OpenApiTypes.STR,
-                description="Filter by part of username, first_name or last_name (case insensitive) (ex. ?search=smit)",
+                description="Filter by part of username, first_name or last_name (case insensitive), results are ordered by exact username match, then prefix match, then substring match (ex. ?search=smit)",
             ),
         ]
     )
+    @query_budget(2)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
+
+    @query_budget(1)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)